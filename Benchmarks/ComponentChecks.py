@@ -0,0 +1,706 @@
+"""
+Zachary Cook
+
+Runs the components of the plugins outside of Cura with stand-ins of Cura and a local
+stand-in of the server, reports their measurements, and checks their results against
+simple reference implementations. Run from the repository directory with:
+python Benchmarks/ComponentChecks.py [--checks NAME ...] [--latency SECONDS]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+from typing import Dict, List, Optional, Tuple
+
+import Stubs
+
+
+# Checks that can be run.
+CHECK_NAMES = ["authorization-policy", "snapshot-worker", "snapshot-store", "remote-configuration", "time-limit-schedule", "cooldown-ledger", "peer-broadcast", "batch-print-logger", "job-mode-export-queue", "user-index"]
+
+
+def readFiles(directory: str) -> Dict[str, bytes]:
+    """Returns the contents of the files in a directory by relative path.
+
+    :param directory: Directory to read.
+    """
+
+    files = {}
+    for parent, _, fileNames in os.walk(directory):
+        for fileName in fileNames:
+            with open(os.path.join(parent, fileName), "rb") as file:
+                files[os.path.relpath(os.path.join(parent, fileName), directory)] = file.read()
+    return files
+
+
+def checkAuthorizationPolicy(environment: Dict) -> List[str]:
+    """Compiles a large authorization policy and compares its lookups to checking every rule.
+
+    :param environment: Stand-ins of Cura and the stand-in server.
+    :return: The failures of the check.
+    """
+
+    from ConstructRIT.Util.AuthorizationPolicy import AuthorizationPolicy, CompiledRule
+
+    # Create a large policy.
+    randomValues = random.Random(0)
+    printers = ["Printer " + str(i) for i in range(5000)]
+    materials = ["material_" + str(i) for i in range(5000)]
+    rules = []
+    for i in range(2000):
+        rules.append({"materials": ["family_" + str(i) + "_*"]})
+    for i in range(1000):
+        rules.append({"printers": ["Printer " + str(i)], "materials": ["pair_material_" + str(i)]})
+    for i in range(500):
+        rules.append({"printers": ["Scheduled Printer " + str(i)], "days": [0, 1, 2, 3, 4], "startHour": 8, "endHour": 17})
+    compileTime = timeit.timeit(lambda: AuthorizationPolicy(printers, materials, rules), number=1)
+    policy = AuthorizationPolicy(printers, materials, rules)
+    print("Compiled " + str(len(printers) + len(materials) + len(rules)) + " entries in " + "{:.1f}".format(compileTime * 1000) + " ms.")
+
+    # Benchmark the lookups against a linear scan.
+    queries = [randomValues.choice(printers + ["Unknown Printer", "Scheduled Printer 3"]) for _ in range(1000)]
+    materialQueries = [randomValues.choice(materials + ["family_1999_pla", "pair_material_10", "unknown"]) for _ in range(1000)]
+    linearTime = timeit.timeit(lambda: [query in printers for query in queries], number=10) / 10000
+    printerTime = timeit.timeit(lambda: [policy.isPrinterAuthorized(query) for query in queries], number=10) / 10000
+    materialTime = timeit.timeit(lambda: [policy.isMaterialAuthorized(query, "Printer 10") for query in materialQueries], number=10) / 10000
+    print("Linear printer lookup: " + "{:.2f}".format(linearTime * 1000000) + " us")
+    print("Policy printer lookup: " + "{:.2f}".format(printerTime * 1000000) + " us")
+    print("Policy material lookup: " + "{:.2f}".format(materialTime * 1000000) + " us")
+
+    # Compare the lookups to checking every rule during and outside of the scheduled hours.
+    allRules = [CompiledRule({"printers": [printer]}) for printer in printers] + [CompiledRule({"materials": [material]}) for material in materials] + [CompiledRule(rule) for rule in rules]
+    printerQueries = queries[:200] + ["Scheduled Printer 3", "Unknown Printer", None]
+    pairQueries = [(material, printer) for material in materialQueries[:100] + ["pair_material_10", "family_5_petg", None] for printer in ("Printer 10", "Printer 11", None)]
+    failures = []
+    for checkTime in (datetime.datetime(2026, 10, 19, 10), datetime.datetime(2026, 10, 18, 10), datetime.datetime(2026, 10, 19, 20)):
+        for printer in printerQueries:
+            expected = any(rule.materials is None and rule.printers.matches(printer) and rule.isActive(checkTime) for rule in allRules)
+            if policy.isPrinterAuthorized(printer, checkTime) != expected:
+                failures.append("Printer " + repr(printer) + " at " + str(checkTime) + " should be " + ("authorized." if expected else "unauthorized."))
+        for material, printer in pairQueries:
+            expected = any(rule.materials is not None and rule.materials.matches(material) and rule.printers.matches(printer) and rule.isActive(checkTime) for rule in allRules)
+            if policy.isMaterialAuthorized(material, printer, checkTime) != expected:
+                failures.append("Material " + repr(material) + " on " + repr(printer) + " at " + str(checkTime) + " should be " + ("authorized." if expected else "unauthorized."))
+    return failures
+
+
+def checkSnapshotWorker(environment: Dict) -> List[str]:
+    """Requests a burst of snapshots from the snapshot worker and checks that they are combined,
+    that the last request is stored when stopping, and that failures are reported.
+
+    :param environment: Stand-ins of Cura and the stand-in server.
+    :return: The failures of the check.
+    """
+
+    from ConstructSettingsSandbox.src.SnapshotWorker import SnapshotWorker
+
+    # Request a burst of snapshots, then one more before stopping.
+    snapshotTimes = []
+    worker = SnapshotWorker(lambda: (snapshotTimes.append(time.monotonic()), time.sleep(0.1)), 0.2)
+    burstStartTime = time.monotonic()
+    for _ in range(50):
+        worker.requestSnapshot()
+        time.sleep(0.01)
+    burstDuration = time.monotonic() - burstStartTime
+    time.sleep(0.5)
+    burstSnapshots = len(snapshotTimes)
+    lastRequestTime = time.monotonic()
+    worker.requestSnapshot()
+    stopped = worker.stop(10)
+    metrics = worker.getMetrics()
+    print("Metrics: " + str(metrics))
+
+    # Request a snapshot that fails.
+    errors = []
+    def failSnapshot():
+        raise IOError("Snapshot failed.")
+    failingWorker = SnapshotWorker(failSnapshot, 0.01, onError=errors.append)
+    failingWorker.requestSnapshot()
+    failingWorker.stop(10)
+
+    # Check the snapshots. The burst may be split if it took longer than the maximum delay.
+    failures = []
+    if burstSnapshots != (1 if burstDuration < worker.maxDelay else 2):
+        failures.append("A burst of 50 requests stored " + str(burstSnapshots) + " snapshots.")
+    if not stopped or metrics["pendingSnapshots"] != 0 or metrics["requestedSnapshots"] != 51:
+        failures.append("Stopping the worker didn't store the pending snapshot.")
+    if len(snapshotTimes) != burstSnapshots + 1 or snapshotTimes[-1] < lastRequestTime:
+        failures.append("The snapshot requested before stopping wasn't stored after the request.")
+    if metrics["completedSnapshots"] != len(snapshotTimes) or metrics["failedSnapshots"] != 0:
+        failures.append("The metrics don't match the stored snapshots.")
+    if len(errors) != 1 or failingWorker.getMetrics()["failedSnapshots"] != 1:
+        failures.append("A failed snapshot wasn't reported.")
+    return failures
+
+
+def checkSnapshotStore(environment: Dict) -> List[str]:
+    """Stores snapshots of settings for several courses and checks that the files are shared,
+    that switching snapshots only writes the changed files, and that a diverged file is
+    restored on startup.
+
+    :param environment: Stand-ins of Cura and the stand-in server.
+    :return: The failures of the check.
+    """
+
+    from ConstructSettingsSandbox.src.SnapshotStore import SnapshotStore
+
+    # Create a settings directory with a realistic amount of profiles and materials.
+    checkDirectory = os.path.join(environment["directory"], "snapshotStore")
+    configDirectory = os.path.join(checkDirectory, "config")
+    for subdirectory, fileCount in (("quality_changes", 300), ("materials", 400), ("definition_changes", 100), ("user", 100)):
+        os.makedirs(os.path.join(configDirectory, subdirectory))
+        for i in range(fileCount):
+            with open(os.path.join(configDirectory, subdirectory, "file_" + str(i) + ".cfg"), "w") as file:
+                file.write("[general]\nversion = 4\nid = " + str(i) + "\n" + ("setting = value\n" * 200))
+
+    # Store snapshots for several courses with small differences, along with full copies.
+    store = SnapshotStore(os.path.join(checkDirectory, "store"))
+    copiesDirectory = os.path.join(checkDirectory, "copies")
+    courseNames = ["course_" + str(i) for i in range(5)]
+    for courseName in courseNames:
+        with open(os.path.join(configDirectory, "cura.cfg"), "w") as file:
+            file.write("[general]\ncourse = " + courseName + "\n")
+        store.saveSnapshot(courseName, configDirectory)
+        shutil.copytree(configDirectory, os.path.join(copiesDirectory, courseName))
+    copiesSize = sum(os.path.getsize(os.path.join(parent, fileName)) for parent, _, fileNames in os.walk(copiesDirectory) for fileName in fileNames)
+    diskUsage = store.getDiskUsage()
+    print("Disk usage of " + str(len(courseNames)) + " snapshots: " + str(diskUsage // 1024) + " KiB (full copies: " + str(copiesSize // 1024) + " KiB)")
+
+    # Benchmark switching between snapshots against replacing the full copy.
+    startTime = time.perf_counter()
+    switchResult = store.restoreSnapshot("course_0", configDirectory)
+    print("Switching snapshots: " + str(switchResult["filesWritten"]) + " files written in " + "{:.1f}".format((time.perf_counter() - startTime) * 1000) + " ms.")
+    switchedFiles = readFiles(configDirectory)
+    startTime = time.perf_counter()
+    shutil.rmtree(configDirectory)
+    shutil.copytree(os.path.join(copiesDirectory, "course_1"), configDirectory)
+    print("Replacing full copy: " + "{:.1f}".format((time.perf_counter() - startTime) * 1000) + " ms.")
+
+    # Benchmark verifying the settings on startup when only one file diverged.
+    store.restoreSnapshot("course_1", configDirectory)
+    restoreResults = []
+    for threads in (1, 4):
+        with open(os.path.join(configDirectory, "materials", "file_0.cfg"), "a") as file:
+            file.write("changed = true\n")
+        result = store.restoreSnapshot("course_1", configDirectory, verify=True, threads=threads)
+        restoreResults.append(result)
+        print("Startup restore with " + str(threads) + " threads: " + str(result["filesHashed"]) + " files verified, " + str(result["filesWritten"]) + " files written in " + "{:.1f}".format(result["duration"] * 1000) + " ms.")
+
+    # Check the snapshots.
+    failures = []
+    if diskUsage * 2 > copiesSize:
+        failures.append("The snapshots use " + str(diskUsage // 1024) + " KiB, which is over half of the full copies.")
+    if switchResult["filesWritten"] != 1 or switchedFiles != readFiles(os.path.join(copiesDirectory, "course_0")):
+        failures.append("Switching snapshots didn't write only the changed file or didn't match the stored settings.")
+    if any(result["filesWritten"] != 1 for result in restoreResults) or readFiles(configDirectory) != readFiles(os.path.join(copiesDirectory, "course_1")):
+        failures.append("Restoring on startup didn't replace only the diverged file.")
+    return failures
+
+
+def checkRemoteConfiguration(environment: Dict) -> List[str]:
+    """Fetches a configuration from the stand-in server and checks that it is applied, that
+    unchanged configurations aren't downloaded again, and that starting with a fresh stored
+    configuration doesn't send a request.
+
+    :param environment: Stand-ins of Cura and the stand-in server.
+    :return: The failures of the check.
+    """
+
+    from ConstructRIT import Configuration
+    from ConstructRIT.Util.RemoteConfiguration import RemoteConfiguration
+
+    # Serve a configuration, including a value that can only be set locally.
+    server = environment["server"]
+    serverHost = Configuration.current.SERVER_HOST
+    server.setConfiguration({"PRINT_COST_PER_GRAM": 0.04, "SERVER_HOST": "http://127.0.0.1:9"})
+    remoteConfiguration = RemoteConfiguration()
+    try:
+        # Benchmark the fetches.
+        startTime = time.perf_counter()
+        changed = remoteConfiguration.refresh()
+        print("Initial fetch: " + "{:.2f}".format((time.perf_counter() - startTime) * 1000) + " ms (cost per gram " + str(Configuration.current.PRINT_COST_PER_GRAM) + ").")
+        appliedConfiguration = Configuration.current
+        startTime = time.perf_counter()
+        unchanged = not remoteConfiguration.refresh()
+        print("Unchanged fetch (304): " + "{:.2f}".format((time.perf_counter() - startTime) * 1000) + " ms.")
+
+        # Benchmark the startup cost with a fresh stored configuration.
+        startRequests = server.getRequestCount()
+        startTime = time.perf_counter()
+        Configuration.reload()
+        remoteConfiguration.start()
+        print("Startup with fresh stored configuration: " + "{:.2f}".format((time.perf_counter() - startTime) * 1000) + " ms.")
+        time.sleep(0.1)
+        startupRequests = server.getRequestCount() - startRequests
+        startupConfiguration = Configuration.current
+    finally:
+        # Stop serving the configuration and remove the stored configuration.
+        remoteConfiguration.stop()
+        server.setConfiguration(None)
+        if os.path.exists(Configuration.remoteFile):
+            os.remove(Configuration.remoteFile)
+        Configuration.reload()
+
+    # Check the configuration.
+    failures = []
+    if not changed or appliedConfiguration.PRINT_COST_PER_GRAM != 0.04 or startupConfiguration.PRINT_COST_PER_GRAM != 0.04:
+        failures.append("The fetched configuration wasn't applied.")
+    if appliedConfiguration.SERVER_HOST != serverHost:
+        failures.append("The fetched configuration replaced a value that can only be set locally.")
+    if not unchanged:
+        failures.append("An unchanged configuration was applied again.")
+    if startupRequests != 0:
+        failures.append("Starting with a fresh stored configuration sent " + str(startupRequests) + " requests.")
+    return failures
+
+
+def checkTimeLimitSchedule(environment: Dict) -> List[str]:
+    """Compares the compiled print time limit schedule to scanning the limits for every
+    minute of a week with a holiday, and benchmarks the cached lookups.
+
+    :param environment: Stand-ins of Cura and the stand-in server.
+    :return: The failures of the check.
+    """
+
+    from ConstructRIT import Configuration
+    from ConstructRIT.Util.AuthorizationPolicy import NameMatcher
+    from ConstructPaymentWindow.src.TimeLimitSchedule import MINUTES_PER_DAY, TimeLimitSchedule
+
+    # Limit printers, weekends, and holidays before the configured limits.
+    limits = [
+        {"printHoursLimit": 2, "startHour": 8, "endHour": 17, "printers": ["Prusa*"]},
+        {"printHoursLimit": 24, "startHour": 0, "endHour": 24, "holidays": True},
+        {"printHoursLimit": 8, "startHour": 10.5, "endHour": 16, "days": [5, 6]},
+    ] + list(Configuration.current.PRINTER_TIME_LIMITS)
+    holidays = ["2026-10-21"]
+    def getExpectedLimit(printer: Optional[str], time: datetime.datetime) -> Tuple[Optional[float], Optional[float]]:
+        currentHour = time.hour + (time.minute / 60.0)
+        for limit in limits:
+            if limit["startHour"] <= currentHour < limit["endHour"] and (limit.get("days") is None or time.weekday() in limit["days"]) \
+                    and (limit.get("holidays") is None or limit["holidays"] == (time.date().isoformat() in holidays)) and NameMatcher(limit.get("printers")).matches(printer):
+                return limit["printHoursLimit"], limit["endHour"]
+        return None, None
+
+    # Compare the schedule to scanning the limits for every minute of a week, reading the limits as the clock advances.
+    currentTime = [datetime.datetime(2026, 10, 19)]
+    schedule = TimeLimitSchedule(limits, holidays, lambda: currentTime[0])
+    failures = []
+    for printer in (None, "Prusa i3 Mk3/Mk3s", "Ultimaker S5"):
+        for minute in range(7 * MINUTES_PER_DAY):
+            currentTime[0] = datetime.datetime(2026, 10, 19) + datetime.timedelta(minutes=minute)
+            expectedLimit = getExpectedLimit(printer, currentTime[0])
+            if schedule.getCurrentTimeLimit(printer) != expectedLimit:
+                failures.append("The limit of " + repr(printer) + " at " + str(currentTime[0]) + " should be " + str(expectedLimit) + ".")
+                break
+
+    # Compare when the limit next changes to scanning the following minutes.
+    for startTime in (datetime.datetime(2026, 10, 19, 9, 30), datetime.datetime(2026, 10, 20, 23, 59), datetime.datetime(2026, 10, 24, 10)):
+        currentTime[0] = startTime
+        expectedChange = startTime.replace(second=0) + datetime.timedelta(minutes=1)
+        while getExpectedLimit(None, expectedChange) == getExpectedLimit(None, startTime):
+            expectedChange += datetime.timedelta(minutes=1)
+        if schedule.getNextChange() != expectedChange:
+            failures.append("The limit after " + str(startTime) + " should change at " + str(expectedChange) + ".")
+
+    # Benchmark the cached lookups.
+    currentTime[0] = datetime.datetime(2026, 10, 19, 9, 30)
+    lookupTime = timeit.timeit(lambda: schedule.getCurrentTimeLimit(), number=100000) / 100000
+    print("Compared the limits of 3 printers for every minute of a week.")
+    print("Cached lookup: " + "{:.2f}".format(lookupTime * 1000000) + " us (including the clock). Next change at " + str(schedule.getNextChange()) + ".")
+    return failures
+
+
+def checkCooldownLedger(environment: Dict) -> List[str]:
+    """Checks the cooldown of a user with a print on the stand-in server, and checks that
+    repeated checks don't send requests and that the ledger stays bounded.
+
+    :param environment: Stand-ins of Cura and the stand-in server.
+    :return: The failures of the check.
+    """
+
+    from ConstructRIT import Configuration
+    from ConstructRIT.Util import Http
+    from ConstructRIT.Util.CooldownLedger import CooldownLedger, getCooldownSeconds
+
+    # Log a print of a user on the server.
+    server = environment["server"]
+    server.addUser("000000034", "cooldown@rit.edu", "Cooldown User")
+    printTime = time.time()
+    Http.LogPrint("cooldown@rit.edu", "test.gcode", "PLA", 50, "Personal project", None, True)
+
+    # Benchmark checking the cooldown from the server and from the ledger.
+    ledger = CooldownLedger()
+    startTime = time.perf_counter()
+    cooldownEnd = ledger.getCooldownEnd("cooldown@rit.edu")
+    print("Check with a miss (server): " + "{:.2f}".format((time.perf_counter() - startTime) * 1000) + " ms.")
+    startRequests = server.getRequestCount()
+    startTime = time.perf_counter()
+    for _ in range(10000):
+        ledger.getCooldownEnd("cooldown@rit.edu")
+    print("Check with a hit (ledger): " + "{:.2f}".format((time.perf_counter() - startTime) / 10000 * 1000000) + " us.")
+    hitRequests = server.getRequestCount() - startRequests
+
+    # Record more users than the ledger stores.
+    maxUsers = Configuration.current.PRINT_COOLDOWN_MAX_USERS
+    for i in range(maxUsers * 2):
+        ledger.recordUserPrint("user_" + str(i), 10)
+    print("Entries after recording " + str(maxUsers * 2) + " users: " + str(len(ledger.entries)) + ".")
+
+    # Check the cooldown. The server stores the time it received the print.
+    failures = []
+    expectedEnd = printTime + getCooldownSeconds(50)
+    if cooldownEnd is None or abs(cooldownEnd - expectedEnd) > 5:
+        failures.append("The cooldown should end at " + str(expectedEnd) + ", not " + str(cooldownEnd) + ".")
+    if hitRequests != 0:
+        failures.append("Checking the cooldown from the ledger sent " + str(hitRequests) + " requests.")
+    if len(ledger.entries) > maxUsers:
+        failures.append("The ledger stored " + str(len(ledger.entries)) + " users, which is over " + str(maxUsers) + ".")
+    if ledger.isCoolingDown("other@rit.edu"):
+        failures.append("A user without prints is cooling down.")
+    return failures
+
+
+def checkPeerBroadcast(environment: Dict) -> List[str]:
+    """Announces a print from one kiosk to several kiosks on the loopback interface, and checks
+    that the cooldown is known without the server and that invalid announcements are rejected.
+
+    :param environment: Stand-ins of Cura and the stand-in server.
+    :return: The failures of the check.
+    """
+
+    from ConstructRIT import Configuration
+    from ConstructRIT.Util.CooldownLedger import CooldownLedger, getUserKey
+    from ConstructRIT.Util.PeerBroadcast import PeerBroadcast
+
+    # Start several kiosks on the loopback interface that can't reach the server.
+    def fetchLastPrint(email):
+        raise IOError("Server should not be used.")
+    group, port = Configuration.current.PEER_BROADCAST_GROUP, Configuration.current.PEER_BROADCAST_PORT
+    peers = []
+    try:
+        for _ in range(4):
+            peer = PeerBroadcast(CooldownLedger(fetchLastPrint), "secret", group, port, interface="127.0.0.1")
+            peer.start()
+            peers.append(peer)
+
+        # Log a print on the first kiosk and wait for the other kiosks to receive it.
+        startTime = time.perf_counter()
+        peers[0].ledger.recordPrint("peer@rit.edu", 50)
+        while any(peer.statistics["accepted"] == 0 for peer in peers[1:]) and time.perf_counter() - startTime < 2:
+            time.sleep(0.0001)
+        receivedCount = sum(1 for peer in peers[1:] if peer.statistics["accepted"] > 0)
+        print("Announcement received by " + str(receivedCount) + " of " + str(len(peers) - 1) + " kiosks in " + "{:.2f}".format((time.perf_counter() - startTime) * 1000) + " ms.")
+
+        # Check the cooldown on another kiosk without the server.
+        startTime = time.perf_counter()
+        try:
+            coolingDown = peers[1].ledger.isCoolingDown("peer@rit.edu")
+        except IOError:
+            coolingDown = None
+        print("Cooldown check on another kiosk: " + str(coolingDown) + " in " + "{:.2f}".format((time.perf_counter() - startTime) * 1000000) + " us.")
+
+        # Create valid, forged, and old announcements, and replay the valid announcement.
+        announcement = peers[0].createAnnouncement(getUserKey("other@rit.edu"), 10, time.time())
+        forged = PeerBroadcast(peers[0].ledger, "wrong", group, port).createAnnouncement(getUserKey("other@rit.edu"), 10, time.time())
+        old = PeerBroadcast(peers[0].ledger, "secret", group, port, clock=lambda: time.time() - 3600).createAnnouncement(getUserKey("other@rit.edu"), 10, time.time())
+        results = {
+            "valid": peers[2].handleAnnouncement(announcement),
+            "replayed": peers[2].handleAnnouncement(announcement),
+            "forged": peers[2].handleAnnouncement(forged),
+            "old": peers[2].handleAnnouncement(old),
+        }
+        print("Announcements accepted: " + str(results))
+    finally:
+        for peer in peers:
+            peer.stop()
+
+    # Check the announcements.
+    failures = []
+    if receivedCount != len(peers) - 1:
+        failures.append("The announcement was received by " + str(receivedCount) + " of " + str(len(peers) - 1) + " kiosks.")
+    if coolingDown is not True:
+        failures.append("The kiosks that received the announcement don't know the user is cooling down.")
+    if results != {"valid": True, "replayed": False, "forged": False, "old": False}:
+        failures.append("Only the valid announcement should be accepted.")
+    return failures
+
+
+def setServerHost(host: str) -> None:
+    """Changes the host of the server in the environment file and reloads the configuration.
+
+    :param host: Host of the server.
+    """
+
+    from ConstructRIT import Configuration
+    with open(Configuration.environmentFile, "w") as file:
+        file.write(json.dumps({"SERVER_HOST": host}))
+    Configuration.reload()
+
+
+def checkBatchPrintLogger(environment: Dict) -> List[str]:
+    """Logs prints individually, in batches, and pipelined, and checks that every print is
+    logged once with the expected amount of requests, including after the server is unreachable.
+
+    :param environment: Stand-ins of Cura and the stand-in server.
+    :return: The failures of the check.
+    """
+
+    from ConstructRIT.Util import Http
+    from ConstructRIT.Util.BatchPrintLogger import BatchPrintLogger
+
+    # Benchmark logging prints individually.
+    server = environment["server"]
+    server.addUser("000000037", "batch@rit.edu", "Batch User")
+    exports = 100
+    startTime = time.perf_counter()
+    startRequests = server.getRequestCount()
+    for i in range(exports):
+        Http.LogPrint("batch@rit.edu", "individual_" + str(i) + ".gcode", "PLA", 20, "Job Mode", None, False)
+    print("Individual: " + str(exports) + " prints in " + "{:.1f}".format((time.perf_counter() - startTime) * 1000) + " ms with " + str(server.getRequestCount() - startRequests) + " requests.")
+
+    # Benchmark logging prints in batches and pipelined.
+    failures = []
+    for supportsBulk in (True, False):
+        modeName = "Bulk" if supportsBulk else "Pipelined"
+        server.supportsBulkPrints = supportsBulk
+        logger = BatchPrintLogger("batch@rit.edu", batchSize=25)
+        try:
+            startTime = time.perf_counter()
+            startRequests = server.getRequestCount()
+            recordIds = [logger.addPrint(modeName + "_" + str(i) + ".gcode", "PLA", 20, "Job Mode", None, False) for i in range(exports)]
+            logger.flush()
+            requests = server.getRequestCount() - startRequests
+        finally:
+            logger.close()
+        logged = sum(1 for recordId in recordIds if logger.getAcknowledgement(recordId))
+        print(modeName + ": " + str(logged) + " prints in " + "{:.1f}".format((time.perf_counter() - startTime) * 1000) + " ms with " + str(requests) + " requests.")
+
+        # Check that each print was logged once. The first batch is tried in bulk before pipelining.
+        expectedRequests = 1 + (exports // 25 if supportsBulk else 1 + exports)
+        if logged != exports or requests != expectedRequests:
+            failures.append(modeName + " logged " + str(logged) + " of " + str(exports) + " prints with " + str(requests) + " requests instead of " + str(expectedRequests) + ".")
+
+    # Flush while the server is unreachable, then flush again once it is reachable.
+    server.supportsBulkPrints = False
+    serverHost = server.getUrl()
+    logger = BatchPrintLogger("batch@rit.edu", batchSize=25)
+    try:
+        recordIds = [logger.addPrint("retried_" + str(i) + ".gcode", "PLA", 20, "Job Mode", None, False) for i in range(exports)]
+        logger.getHashedId()
+        setServerHost("http://127.0.0.1:9")
+        try:
+            logger.flush()
+            unreachableFlushFailed = False
+        except Exception:
+            unreachableFlushFailed = True
+        finally:
+            setServerHost(serverHost)
+        logger.flush()
+    finally:
+        logger.close()
+    loggedNames = [printData["fileName"] for printData in server.prints if printData["fileName"].startswith("retried_")]
+    if not unreachableFlushFailed or len(loggedNames) != exports or len(set(loggedNames)) != exports or not all(logger.getAcknowledgement(recordId) for recordId in recordIds):
+        failures.append("Flushing after the server was unreachable logged " + str(len(set(loggedNames))) + " of " + str(exports) + " prints with " + str(len(loggedNames) - len(set(loggedNames))) + " duplicates.")
+    server.supportsBulkPrints = True
+    return failures
+
+
+def checkJobModeExportQueue(environment: Dict) -> List[str]:
+    """Exports a batch of prints through the job mode export queue and compares it to logging
+    each export, checking that the exports are written in order and that only the valid
+    exports are logged.
+
+    :param environment: Stand-ins of Cura and the stand-in server.
+    :return: The failures of the check.
+    """
+
+    from ConstructRIT.Util import Http
+    from ConstructRIT.Util.BatchPrintLogger import BatchPrintLogger
+    from ConstructPaymentWindow.src.JobModeExportQueue import JobModeExportQueue
+
+    # Create a synthetic batch of exports, including one that can't be written.
+    server = environment["server"]
+    server.addUser("000000038", "queue@rit.edu", "Queue User")
+    exportDirectory = os.path.join(environment["directory"], "exports")
+    os.makedirs(exportDirectory)
+    exportCount = 100
+    exports = [{
+        "printLocation": os.path.join(exportDirectory, "print_" + str(i) + ".gcode"),
+        "printName": "print_" + str(i) + ".gcode",
+        "machineName": "Prusa i3 Mk3/Mk3s",
+        "printWeight": 20,
+        "printTimeHours": 2.0,
+        "printMaterial": "PLA",
+        "printVolume": "",
+    } for i in range(exportCount)]
+    invalidExport = dict(exports[0], printLocation=os.path.join(exportDirectory, "missing", "invalid.gcode"), printName="invalid.gcode")
+    writtenLocations = []
+    def writeExport(printLocation):
+        with open(printLocation, "w") as file:
+            file.write(";gcode\n")
+        writtenLocations.append(printLocation)
+
+    # Benchmark exporting with a request to log each print, as done by the payment window.
+    startTime = time.perf_counter()
+    for exportInformation in exports:
+        Http.LogPrint("queue@rit.edu", exportInformation["printName"], exportInformation["printMaterial"], exportInformation["printWeight"], "Job Mode", None, False)
+        writeExport(exportInformation["printLocation"])
+    duration = time.perf_counter() - startTime
+    print("Logging each export: " + "{:,.0f}".format(exportCount / duration * 60) + " exports per minute (excluding the window).")
+
+    # Benchmark exporting with the queue.
+    writtenLocations.clear()
+    startPrints = len(server.prints)
+    printLogger = BatchPrintLogger("queue@rit.edu")
+    exportQueue = JobModeExportQueue(printLogger)
+    exportQueue.start()
+    startTime = time.perf_counter()
+    try:
+        for exportInformation in exports[:exportCount // 2] + [invalidExport] + exports[exportCount // 2:]:
+            exportQueue.addExport(exportInformation, writeExport)
+        exportQueue.stop(60)
+        printLogger.flush()
+    finally:
+        printLogger.close()
+    duration = time.perf_counter() - startTime
+    progress = exportQueue.getProgress()
+    loggedNames = [printData["fileName"] for printData in server.prints[startPrints:]]
+    print("Export queue: " + "{:,.0f}".format(exportCount / duration * 60) + " exports per minute. Progress: " + str(progress) + ".")
+
+    # Check the exports.
+    failures = []
+    if writtenLocations != [exportInformation["printLocation"] for exportInformation in exports]:
+        failures.append("The queue didn't write every valid export in order.")
+    if progress != {"queued": exportCount + 1, "exported": exportCount, "failed": 1, "remaining": 0}:
+        failures.append("The progress should have " + str(exportCount) + " exported and 1 failed export.")
+    if sorted(loggedNames) != sorted(exportInformation["printName"] for exportInformation in exports):
+        failures.append("The queue logged " + str(len(loggedNames)) + " prints instead of each valid export once.")
+    return failures
+
+
+def checkUserIndex(environment: Dict) -> List[str]:
+    """Syncs the user index from the stand-in server with many registered users and checks the
+    synced registrations, the changes, and the registration checks while the server is unreachable.
+
+    :param environment: Stand-ins of Cura and the stand-in server.
+    :return: The failures of the check.
+    """
+
+    from ConstructRIT.Util.UserIndex import UserIndex
+
+    # Register the users on the server, which also has the users of the other checks.
+    server = environment["server"]
+    userCount = environment["arguments"].index_users
+    hashedIds = {}
+    for i in range(userCount):
+        hashedIds["user" + str(i) + "@rit.edu"] = server.addUser(str(200000000 + i), "user" + str(i) + "@rit.edu", "User " + str(i))
+    userIndex = UserIndex(os.path.join(environment["directory"], "userIndex.sqlite3"))
+
+    # Benchmark the initial sync and a sync with a few changes.
+    startTime = time.perf_counter()
+    userIndex.sync()
+    initialCount = userIndex.getCount()
+    serverCount = len(server.users)
+    print("Initial sync of " + str(initialCount) + " users: " + "{:.0f}".format((time.perf_counter() - startTime) * 1000) + " ms, " + "{:.1f}".format(os.path.getsize(userIndex.path) / 1024 / 1024) + " MB.")
+    hashedIds["new@rit.edu"] = server.addUser("300000000", "new@rit.edu", "New User")
+    server.removeUser("200000000")
+    del hashedIds["user0@rit.edu"]
+    startTime = time.perf_counter()
+    changeCount = userIndex.sync()
+    print("Delta sync of " + str(changeCount) + " changes: " + "{:.2f}".format((time.perf_counter() - startTime) * 1000) + " ms.")
+
+    # Benchmark the registration checks while the server is unreachable.
+    checkedEmails = ["user" + str(i) + "@rit.edu" for i in range(1, min(userCount, 10001))] + ["new@rit.edu"]
+    serverHost = server.getUrl()
+    setServerHost("http://127.0.0.1:9")
+    try:
+        startTime = time.perf_counter()
+        checkedIds = [userIndex.getUniversityIdHash(email) for email in checkedEmails]
+        print("Offline registration check: " + "{:.1f}".format((time.perf_counter() - startTime) / len(checkedEmails) * 1000000) + " us per check, " + str(userIndex.hits) + " found in the index.")
+    finally:
+        setServerHost(serverHost)
+
+    # Check the index.
+    failures = []
+    if initialCount != serverCount or userIndex.getCount() != len(server.users):
+        failures.append("The index has " + str(userIndex.getCount()) + " users instead of " + str(len(server.users)) + ".")
+    if changeCount != 2 or userIndex.lookup("user0@rit.edu") is not None:
+        failures.append("The delta sync didn't add the new user and remove the removed user.")
+    if checkedIds != [hashedIds[email] for email in checkedEmails]:
+        failures.append("The registration checks while the server is unreachable don't match the server.")
+    return failures
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """Runs the component checks from the command line.
+
+    :param arguments: Command line arguments. If None, the process arguments are used.
+    :return: The exit code, which is 1 if a check failed.
+    """
+
+    # Parse the arguments.
+    parser = argparse.ArgumentParser(description="Checks the components of the plugins outside of Cura.")
+    parser.add_argument("--checks", nargs="+", choices=CHECK_NAMES, default=CHECK_NAMES, help="Checks to run.")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds the stand-in server waits before each response.")
+    parser.add_argument("--index-users", type=int, default=100000, help="Registered users synced to the user index.")
+    arguments = parser.parse_args(arguments)
+
+    # Set up the stand-ins of Cura.
+    directory = tempfile.mkdtemp()
+    environment = Stubs.install(os.path.join(directory, "settings"))
+    environment["directory"] = directory
+    environment["arguments"] = arguments
+
+    # Start the stand-in server and use it as the server. The configuration files are stored in the check directory.
+    from ConstructRIT import Configuration
+    from ConstructRIT.Util.StandInServer import StandInServer
+    server = StandInServer(latency=arguments.latency)
+    environment["server"] = server
+    Configuration.environmentFile = os.path.join(directory, "environment.json")
+    Configuration.remoteFile = os.path.join(directory, "remoteConfiguration.json")
+    Configuration.overrideFile = os.path.join(directory, "configuration.json")
+    with open(Configuration.environmentFile, "w") as file:
+        file.write(json.dumps({"SERVER_HOST": server.start()}))
+    with open(Configuration.overrideFile, "w") as file:
+        file.write(json.dumps({"REMOTE_CONFIGURATION_ENABLED": False, "PEER_BROADCAST_ENABLED": False}))
+    Configuration.reload()
+
+    # Run the checks.
+    checks = {
+        "authorization-policy": checkAuthorizationPolicy,
+        "snapshot-worker": checkSnapshotWorker,
+        "snapshot-store": checkSnapshotStore,
+        "remote-configuration": checkRemoteConfiguration,
+        "time-limit-schedule": checkTimeLimitSchedule,
+        "cooldown-ledger": checkCooldownLedger,
+        "peer-broadcast": checkPeerBroadcast,
+        "batch-print-logger": checkBatchPrintLogger,
+        "job-mode-export-queue": checkJobModeExportQueue,
+        "user-index": checkUserIndex,
+    }
+    failures = []
+    try:
+        for name in arguments.checks:
+            print("Checking " + name + ":")
+            startTime = time.perf_counter()
+            failures += [name + ": " + failure for failure in checks[name](environment)]
+            print("Checked " + name + " in " + "{:.2f}".format(time.perf_counter() - startTime) + " s.")
+    finally:
+        server.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # Print the failures.
+    for failure in failures:
+        print("Failed: " + failure)
+    return 1 if len(failures) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
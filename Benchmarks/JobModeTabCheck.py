@@ -0,0 +1,145 @@
+"""
+Zachary Cook
+
+Renames the job mode tab offscreen with a QML engine showing a stage model, and checks
+that only the name of the job mode tab's delegate changes instead of every stage tab
+being rebuilt, and that a rebuilt tab uses the new name. Run from the repository directory with:
+python Benchmarks/JobModeTabCheck.py [--renames N] [--rename-budget MS]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import Stubs
+from PyQt5 import QtQml, QtQuick, QtWidgets
+from RunBenchmarks import getPercentile
+
+
+# Id of the job mode stage.
+PLUGIN_ID = "ConstructJobMode"
+
+# Stage tabs shown by the QML engine, which has the stage model as a child of the root object like Cura.
+STAGE_TABS_QML = b"""
+import QtQuick 2.0
+Row {
+    Repeater {
+        model: stageModel
+        Text { objectName: "tab_" + model.id; text: model.name }
+    }
+}
+"""
+
+
+def getTabs(rootObject: QtQuick.QQuickItem) -> Dict[str, QtQuick.QQuickItem]:
+    """Returns the delegates of the stage tabs by stage id.
+
+    :param rootObject: Root object of the stage tabs.
+    """
+
+    tabs = {}
+    for item in rootObject.childItems():
+        if item.objectName().startswith("tab_"):
+            tabs[item.objectName()[len("tab_"):]] = item
+    return tabs
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """Runs the job mode tab check from the command line.
+
+    :param arguments: Command line arguments. If None, the process arguments are used.
+    :return: The exit code, which is 1 if the tabs are rebuilt, have the wrong names, or renaming is over budget.
+    """
+
+    # Parse the arguments.
+    parser = argparse.ArgumentParser(description="Checks that renaming the job mode tab only updates its delegate.")
+    parser.add_argument("--renames", type=int, default=200, help="Amount of times to rename the tab.")
+    parser.add_argument("--rename-budget", type=float, default=5.0, help="Maximum 95th percentile milliseconds to rename the tab.")
+    arguments = parser.parse_args(arguments)
+
+    # Set up the stand-ins of Cura with a server address that refuses connections immediately.
+    directory = tempfile.mkdtemp()
+    environment = Stubs.install(os.path.join(directory, "settings"))
+    from ConstructRIT import Configuration
+    Configuration.environmentFile = os.path.join(directory, "environment.json")
+    Configuration.remoteFile = os.path.join(directory, "remoteConfiguration.json")
+    Configuration.overrideFile = os.path.join(directory, "configuration.json")
+    with open(Configuration.environmentFile, "w") as file:
+        file.write(json.dumps({"SERVER_HOST": "http://127.0.0.1:9"}))
+    with open(Configuration.overrideFile, "w") as file:
+        file.write(json.dumps({"REMOTE_CONFIGURATION_ENABLED": False, "PEER_BROADCAST_ENABLED": False, "PRE_IMPORT_ENABLED": False, "USER_INDEX_ENABLED": False}))
+    Configuration.reload()
+
+    # Create the job mode stage.
+    import ConstructJobMode
+    stage = ConstructJobMode.register(environment["app"])["stage"]
+    stage.setPluginId(PLUGIN_ID)
+
+    # Show the stage tabs with the stage model created from the metadata of the stages.
+    def getStageItems() -> List[Dict]:
+        return [{"id": "PrepareStage", "name": "Prepare"}, {"id": PLUGIN_ID, "name": ConstructJobMode.getMetaData()["stage"]["name"]}, {"id": "MonitorStage", "name": "Monitor"}]
+    engine = QtQml.QQmlApplicationEngine()
+    stageModel = Stubs.StageModel()
+    stageModel.setItems(getStageItems())
+    engine.rootContext().setContextProperty("stageModel", stageModel)
+    engine.loadData(STAGE_TABS_QML)
+    rootObject = engine.rootObjects()[0]
+    stageModel.setParent(rootObject)
+    environment["app"]._qml_engine = engine
+    QtWidgets.QApplication.processEvents()
+
+    # Count the times the stage model is reset, which rebuilds every stage tab.
+    resets = []
+    stageModel.modelReset.connect(lambda: resets.append(True))
+    tabsBefore = getTabs(rootObject)
+
+    # Rename the tab by changing the state of the stage, as activating and deactivating job mode does.
+    durations = []
+    try:
+        for i in range(arguments.renames):
+            startTime = time.perf_counter()
+            stage.jobModeState = "Job Mode: User " + str(i)
+            QtWidgets.QApplication.processEvents()
+            durations.append(time.perf_counter() - startTime)
+        resetsWhileRenaming = len(resets)
+        tabsAfter = getTabs(rootObject)
+        lastName = "Job Mode: User " + str(arguments.renames - 1)
+        renamedTab = tabsAfter[PLUGIN_ID].property("text")
+
+        # Rebuild the stage tabs from the metadata, as Cura does when the stages change.
+        stageModel.setItems(getStageItems())
+        QtWidgets.QApplication.processEvents()
+        rebuiltTab = getTabs(rootObject)[PLUGIN_ID].property("text")
+    finally:
+        environment["app"]._qml_engine = None
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # Print the measurements and check them.
+    durations.sort()
+    renameP95 = getPercentile(durations, 95) * 1000
+    print("Job mode tab renamed: " + str(arguments.renames) + " times, " + "{:.3f}".format(getPercentile(durations, 50) * 1000) + " ms p50, " + "{:.3f}".format(renameP95) + " ms p95 (budget " + "{:.1f}".format(arguments.rename_budget) + " ms p95)")
+    print("Stage model resets while renaming: " + str(resetsWhileRenaming))
+    print("Tab name after renaming: " + repr(renamedTab) + ", after rebuilding: " + repr(rebuiltTab))
+    failures = []
+    if resetsWhileRenaming > 0:
+        failures.append("Renaming the tab rebuilt every stage tab.")
+    if any(tabsAfter.get(stageId) is not tab for stageId, tab in tabsBefore.items()):
+        failures.append("Renaming the tab recreated the tab delegates.")
+    if renamedTab != lastName or tabsAfter["PrepareStage"].property("text") != "Prepare":
+        failures.append("The tab delegate doesn't show the new name.")
+    if rebuiltTab != lastName:
+        failures.append("The rebuilt tab delegate doesn't show the new name.")
+    if renameP95 > arguments.rename_budget:
+        failures.append("Renaming the tab is over budget.")
+    for failure in failures:
+        print("Failed: " + failure)
+    return 1 if len(failures) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
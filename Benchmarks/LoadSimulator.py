@@ -0,0 +1,259 @@
+"""
+Zachary Cook
+
+Simulates kiosks swiping and exporting at once against a local stand-in of the server
+using the requests of ConstructRIT.Util.Http, and reports the requests sent per export,
+the tail latency, and the error rates as the amount of kiosks grows. Run from the
+repository directory with:
+python Benchmarks/LoadSimulator.py [--kiosks 1 5 10 20 40] [--duration SECONDS] [--latency SECONDS] [--error-rate FRACTION]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.realpath(os.path.join(__file__, "..", "..", "ConstructCore")))
+from ConstructRIT import Configuration
+from ConstructRIT.Util import Http, Tracing
+from ConstructRIT.Util.CooldownLedger import CooldownLedger
+from ConstructRIT.Util.StandInServer import StandInServer
+
+
+# Paths of the requests sent by exports, and the fraction of each operation done by the kiosks.
+EXPORT_PATHS = ["GET /user/find", "GET /print/last", "POST /print/add"]
+DEFAULT_MIX = {
+    "export": 0.7,
+    "importSwipe": 0.2,
+    "labManagerSwipe": 0.1,
+}
+
+
+class Kiosk:
+    """Simulated kiosk that repeatedly swipes or exports with the requests the windows send.
+    """
+
+    def __init__(self, userCount: int, mix: Dict[str, float], thinkTime: float, seed: int):
+        """Creates the kiosk.
+
+        :param userCount: Amount of users that use the kiosk.
+        :param mix: Fraction of each operation done by the kiosk.
+        :param thinkTime: Average seconds between operations.
+        :param seed: Seed of the random operations.
+        """
+
+        self.userCount = userCount
+        self.operations = list(mix.keys())
+        self.weights = list(mix.values())
+        self.thinkTime = thinkTime
+        self.random = random.Random(seed)
+        self.ledger = CooldownLedger()
+        self.results = []
+
+    def export(self, userIndex: int) -> str:
+        """Exports a print the way the payment window does.
+
+        :param userIndex: Index of the user exporting.
+        :return: The result of the export.
+        """
+
+        # Check the registration.
+        email = "user" + str(userIndex) + "@rit.edu"
+        if Http.getUniversityIdHash(email) is None:
+            return "failed"
+
+        # Check the cooldown of the user.
+        if self.ledger.isCoolingDown(email):
+            return "blocked"
+
+        # Log the print.
+        if not Http.LogPrint(email, "print.gcode", "PLA", 20, "Personal project", "", True):
+            return "failed"
+        self.ledger.recordPrint(email, 20)
+        return "completed"
+
+    def importSwipe(self, userIndex: int) -> str:
+        """Swipes to import the information of a user.
+
+        :param userIndex: Index of the user swiping.
+        :return: The result of the swipe.
+        """
+
+        return "completed" if Http.getLastPrintInformation(str(200000000 + userIndex)) is not None else "failed"
+
+    def labManagerSwipe(self, userIndex: int) -> str:
+        """Swipes to authenticate a lab manager.
+
+        :param userIndex: Index of the user swiping.
+        :return: The result of the swipe.
+        """
+
+        return "completed" if Http.isAuthorized("100000000") else "failed"
+
+    def run(self, endTime: float) -> None:
+        """Does operations until the end time.
+
+        :param endTime: Time of time.perf_counter to stop at.
+        """
+
+        while time.perf_counter() < endTime:
+            operation = self.random.choices(self.operations, self.weights)[0]
+            startTime = time.perf_counter()
+            try:
+                result = getattr(self, operation)(self.random.randrange(self.userCount))
+            except (IOError, ValueError):
+                result = "error"
+            self.results.append((operation, result, time.perf_counter() - startTime))
+            time.sleep(self.random.expovariate(1 / self.thinkTime) if self.thinkTime > 0 else 0)
+
+
+def getPercentile(sortedValues: List[float], percentile: float) -> Optional[float]:
+    """Returns a percentile of sorted values using the nearest rank.
+
+    :param sortedValues: Values to get the percentile of.
+    :param percentile: Percentile between 0 and 100.
+    """
+
+    if len(sortedValues) == 0:
+        return None
+    index = max(0, min(len(sortedValues) - 1, int(round(percentile / 100 * len(sortedValues) + 0.5)) - 1))
+    return sortedValues[index]
+
+
+def runLevel(server: StandInServer, kioskCount: int, duration: float, userCount: int, mix: Dict[str, float], thinkTime: float) -> Dict:
+    """Runs kiosks at once and returns the measurements.
+
+    :param server: Stand-in server the kiosks use.
+    :param kioskCount: Amount of kiosks.
+    :param duration: Seconds to run the kiosks for.
+    :param userCount: Amount of users of the kiosks.
+    :param mix: Fraction of each operation done by the kiosks.
+    :param thinkTime: Average seconds between operations of each kiosk.
+    """
+
+    # Run the kiosks.
+    with server.lock:
+        server.requestCounts = {}
+        server.errorCounts = {}
+    kiosks = [Kiosk(userCount, mix, thinkTime, kioskCount * 1000 + i) for i in range(kioskCount)]
+    endTime = time.perf_counter() + duration
+    threads = [threading.Thread(target=kiosk.run, args=[endTime], name="Kiosk" + str(i)) for i, kiosk in enumerate(kiosks)]
+    startTime = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    totalDuration = time.perf_counter() - startTime
+
+    # Calculate the measurements.
+    results = [result for kiosk in kiosks for result in kiosk.results]
+    exportLatencies = sorted(latency for operation, result, latency in results if operation == "export" and result == "completed")
+    swipeLatencies = sorted(latency for operation, result, latency in results if operation != "export" and result == "completed")
+    with server.lock:
+        requestCounts = dict(server.requestCounts)
+        errorCount = sum(server.errorCounts.values())
+    requestCount = sum(requestCounts.values())
+    exportCount = sum(1 for operation, _, _ in results if operation == "export")
+
+    # Import swipes also get the last print once the user is found, which is when the swipe completes.
+    importPrintRequests = sum(1 for operation, result, _ in results if operation == "importSwipe" and result == "completed")
+    exportRequests = sum(requestCounts.get(path, 0) for path in EXPORT_PATHS) - importPrintRequests
+    return {
+        "kiosks": kioskCount,
+        "operations": len(results),
+        "operationsPerSecond": len(results) / totalDuration,
+        "exports": exportCount,
+        "requestsPerExport": exportRequests / exportCount if exportCount > 0 else None,
+        "exportP50": getPercentile(exportLatencies, 50),
+        "exportP99": getPercentile(exportLatencies, 99),
+        "swipeP99": getPercentile(swipeLatencies, 99),
+        "requestErrorRate": errorCount / requestCount if requestCount > 0 else 0.0,
+        "failedOperationRate": sum(1 for _, result, _ in results if result in ("failed", "error")) / len(results) if len(results) > 0 else 0.0,
+        "blockedExports": sum(1 for operation, result, _ in results if operation == "export" and result == "blocked"),
+    }
+
+
+def formatMilliseconds(value: Optional[float]) -> str:
+    """Returns seconds formatted as milliseconds.
+
+    :param value: Seconds to format.
+    """
+
+    return "-" if value is None else "{:.1f}".format(value * 1000)
+
+
+def printResults(levels: List[Dict]) -> None:
+    """Prints the measurements of each amount of kiosks.
+
+    :param levels: Measurements of each amount of kiosks.
+    """
+
+    print("Kiosks  Ops/s  Exports  Req/export  Export p50 (ms)  Export p99 (ms)  Swipe p99 (ms)  Request errors  Failed ops  Blocked")
+    for level in levels:
+        print(str(level["kiosks"]).rjust(6) + "  " +
+              "{:.0f}".format(level["operationsPerSecond"]).rjust(5) + "  " +
+              str(level["exports"]).rjust(7) + "  " +
+              ("-" if level["requestsPerExport"] is None else "{:.2f}".format(level["requestsPerExport"])).rjust(10) + "  " +
+              formatMilliseconds(level["exportP50"]).rjust(15) + "  " +
+              formatMilliseconds(level["exportP99"]).rjust(15) + "  " +
+              formatMilliseconds(level["swipeP99"]).rjust(14) + "  " +
+              "{:.1%}".format(level["requestErrorRate"]).rjust(14) + "  " +
+              "{:.1%}".format(level["failedOperationRate"]).rjust(10) + "  " +
+              str(level["blockedExports"]).rjust(7))
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    """Runs the load simulation from the command line.
+
+    :param arguments: Command line arguments. If None, the process arguments are used.
+    """
+
+    # Parse the arguments.
+    parser = argparse.ArgumentParser(description="Simulates kiosks using a local stand-in of the server at once.")
+    parser.add_argument("--kiosks", type=int, nargs="+", default=[1, 5, 10, 20, 40], help="Amounts of kiosks to simulate.")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to simulate each amount of kiosks.")
+    parser.add_argument("--users", type=int, default=5000, help="Amount of registered users.")
+    parser.add_argument("--think-time", type=float, default=0.05, help="Average seconds between the operations of a kiosk.")
+    parser.add_argument("--mix", type=json.loads, default=DEFAULT_MIX, help="Fraction of each operation as JSON, such as " + json.dumps(DEFAULT_MIX) + ".")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds the server waits before each response.")
+    parser.add_argument("--latency-jitter", type=float, default=0.01, help="Maximum random seconds added to each response.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an internal server error.")
+    parser.add_argument("--output", help="File to save the measurements to as JSON.")
+    arguments = parser.parse_args(arguments)
+
+    # Start the stand-in server with the users and use it as the server.
+    server = StandInServer(arguments.latency, arguments.latency_jitter, arguments.error_rate, seed=0)
+    server.addUser("100000000", "labmanager@rit.edu", "Lab Manager", ["LabManager"])
+    for i in range(arguments.users):
+        server.addUser(str(200000000 + i), "user" + str(i) + "@rit.edu", "User " + str(i))
+    directory = tempfile.mkdtemp()
+    Configuration.environmentFile = os.path.join(directory, "environment.json")
+    Configuration.overrideFile = os.path.join(directory, "configuration.json")
+    with open(Configuration.environmentFile, "w") as file:
+        file.write(json.dumps({"SERVER_HOST": server.start()}))
+    Configuration.reload()
+    Tracing.traceFile = os.path.join(directory, "Traces", "traces.jsonl")
+
+    # Run each amount of kiosks.
+    levels = []
+    try:
+        for kioskCount in arguments.kiosks:
+            levels.append(runLevel(server, kioskCount, arguments.duration, arguments.users, arguments.mix, arguments.think_time))
+    finally:
+        server.stop()
+        Tracing.flush()
+        shutil.rmtree(directory, ignore_errors=True)
+    printResults(levels)
+    if arguments.output is not None:
+        with open(arguments.output, "w") as file:
+            file.write(json.dumps(levels, indent=4))
+
+
+if __name__ == '__main__':
+    main()
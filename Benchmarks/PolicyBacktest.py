@@ -0,0 +1,73 @@
+"""
+Zachary Cook
+
+Evaluates variants of the print time limits and cooldown over a log of past prints, and
+checks a sample of the prints of each variant against the checks of the payment window.
+The log is a CSV or JSONL file with hashedId, timeStamp, weight, and optionally printHours
+and printer. Run from the repository directory with:
+python Benchmarks/PolicyBacktest.py [prints.csv] [--variants variants.json] [--verify-samples N]
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+import Stubs
+
+
+def printResults(results: List[Dict]) -> None:
+    """Prints the results of the variants.
+
+    :param results: Results of the variants.
+    """
+
+    for result in results:
+        print(result["name"] + ": " + str(result["blocked"]) + " of " + str(result["prints"]) + " prints blocked (" + str(result["timeLimitBlocked"]) + " by time limits, " + str(result["cooldownBlocked"]) + " by cooldown) in " + "{:.1f}".format(result["duration"] * 1000) + " ms.")
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """Runs the backtest from the command line.
+
+    :param arguments: Command line arguments. If None, the process arguments are used.
+    :return: The exit code, which is 1 if the backtest differs from the checks of the payment window.
+    """
+
+    # Parse the arguments.
+    parser = argparse.ArgumentParser(description="Evaluates variants of the print time limits and cooldown over a print log.")
+    parser.add_argument("log", nargs="?", help="CSV or JSONL print log. If not given, a synthetic log is used.")
+    parser.add_argument("--variants", help="JSON file with a list of variants, each with a name and configuration values to replace.")
+    parser.add_argument("--synthetic-size", type=int, default=300000, help="Prints in the synthetic log.")
+    parser.add_argument("--verify-samples", type=int, default=2000, help="Prints of each variant to compare to the checks of the payment window. If 0, the variants aren't verified.")
+    arguments = parser.parse_args(arguments)
+
+    # Add the plugins to the path. The configuration of the kiosk is used as the current variant.
+    Stubs.install()
+    from ConstructPaymentWindow.src.PolicyBacktest import PrintLog, createSyntheticRecords, evaluateVariant, loadPrintLog, verifyAgainstScalar
+
+    # Load the log and the variants.
+    startTime = time.perf_counter()
+    printLog = loadPrintLog(arguments.log) if arguments.log is not None else PrintLog(createSyntheticRecords(arguments.synthetic_size))
+    print("Loaded " + str(printLog.size) + " prints in " + "{:.2f}".format(time.perf_counter() - startTime) + " s.")
+    variants = [{"name": "Current"}]
+    if arguments.variants is not None:
+        with open(arguments.variants) as file:
+            variants += json.loads(file.read())
+
+    # Evaluate and verify the variants.
+    printResults([evaluateVariant(printLog, variant) for variant in variants])
+    failures = []
+    if arguments.verify_samples > 0:
+        for variant in variants:
+            try:
+                print("Verified " + str(verifyAgainstScalar(printLog, variant, arguments.verify_samples)) + " prints of " + variant.get("name", "Current") + " against the checks of the payment window.")
+            except AssertionError as error:
+                failures.append(variant.get("name", "Current") + ": " + str(error))
+    for failure in failures:
+        print("Failed: " + failure)
+    return 1 if len(failures) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
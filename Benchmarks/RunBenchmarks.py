@@ -0,0 +1,325 @@
+"""
+Zachary Cook
+
+Runs the plugins outside of Cura with stand-ins of Cura and a local stand-in of the
+server, and records the latency and throughput of exporting, swiping to authenticate,
+and saving the sandbox settings. Run from the repository directory with:
+python Benchmarks/RunBenchmarks.py [--iterations N] [--baseline FILE] [--save-baseline FILE]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import Stubs
+from PyQt5 import QtTest, QtWidgets
+
+
+# Scenarios that can be run.
+SCENARIO_NAMES = ["export", "swipe-auth", "sandbox-save"]
+
+# University id and email of the lab manager used for swiping.
+LAB_MANAGER_ID = "100000000"
+LAB_MANAGER_EMAIL = "labmanager@rit.edu"
+
+
+def waitFor(condition: Callable[[], bool], timeout: float = 10.0) -> None:
+    """Processes the Qt events until a condition is true.
+
+    :param condition: Function that returns if the wait is complete.
+    :param timeout: Maximum seconds to wait.
+    """
+
+    endTime = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > endTime:
+            raise TimeoutError("Timed out waiting for the benchmark step.")
+        QtWidgets.QApplication.processEvents()
+        time.sleep(0.0005)
+
+
+def getPercentile(sortedValues: List[float], percentile: float) -> float:
+    """Returns a percentile of sorted values using the nearest rank.
+
+    :param sortedValues: Values to get the percentile of.
+    :param percentile: Percentile between 0 and 100.
+    """
+
+    index = max(0, min(len(sortedValues) - 1, int(round(percentile / 100 * len(sortedValues) + 0.5)) - 1))
+    return sortedValues[index]
+
+
+def summarizeLatencies(latencies: List[float], duration: float) -> Dict:
+    """Returns the latency percentiles and throughput of a measurement.
+
+    :param latencies: Seconds each operation took.
+    :param duration: Total seconds of the measurement.
+    """
+
+    sortedLatencies = sorted(latencies)
+    return {
+        "count": len(latencies),
+        "p50": getPercentile(sortedLatencies, 50),
+        "p95": getPercentile(sortedLatencies, 95),
+        "max": sortedLatencies[-1],
+        "perMinute": len(latencies) / duration * 60 if duration > 0 else 0.0,
+    }
+
+
+def createSettings(directory: str, fileCount: int = 200, fileSize: int = 4096) -> None:
+    """Creates a synthetic Cura settings directory.
+
+    :param directory: Directory to create the settings in.
+    :param fileCount: Amount of settings files to create.
+    :param fileSize: Size of each settings file.
+    """
+
+    subdirectories = ["definition_changes", "extruders", "machine_instances", "quality_changes", "user", "variants"]
+    for subdirectory in subdirectories:
+        os.makedirs(os.path.join(directory, subdirectory), exist_ok=True)
+    with open(os.path.join(directory, "cura.cfg"), "w") as file:
+        file.write("[general]\nversion = 7\n")
+    for i in range(fileCount):
+        with open(os.path.join(directory, subdirectories[i % len(subdirectories)], "settings_" + str(i) + ".inst.cfg"), "w") as file:
+            file.write(("setting_" + str(i) + " = " + str(i) + "\n") * (fileSize // 16))
+
+
+def runExport(environment: Dict, iterations: int) -> Dict[str, Dict]:
+    """Exports prints through the wrapped output device by filling and submitting the payment window.
+
+    :param environment: Applications, server, and directories of the benchmark.
+    :param iterations: Amount of exports.
+    """
+
+    from ConstructRIT import Configuration
+    from ConstructRIT.UI import WindowRegistry
+    from ConstructPaymentWindow.src.PaymentWindow import PaymentWindow
+
+    # Add a user for each export so the exports aren't blocked by the cooldown.
+    for i in range(iterations):
+        environment["server"].addUser(str(200000000 + i), "export" + str(i) + "@rit.edu", "Export User " + str(i))
+    writtenFiles = []
+    Stubs.OutputDevice.onWritten = writtenFiles.append
+    outputDevice = environment["app"].getOutputDeviceManager().getOutputDevices()[0]
+
+    # Run the exports.
+    openLatencies, exportLatencies = [], []
+    drivenWindows = []
+    startTime = time.perf_counter()
+    for i in range(iterations):
+        # Start the export and wait for the payment window.
+        exportStartTime = time.perf_counter()
+        printLocation = os.path.join(environment["directory"], "export_" + str(i) + ".gcode")
+        outputDevice._performWrite(printLocation)
+        windows = []
+        def findWindow():
+            windows.extend(window for window in WindowRegistry.getRegistry().getOpenWindows(PaymentWindow) if window.isVisible() and window not in drivenWindows)
+            return len(windows) > 0
+        waitFor(findWindow)
+        openLatencies.append(time.perf_counter() - exportStartTime)
+
+        # Fill in and submit the payment window, and wait for the print to be written.
+        window = windows[0]
+        drivenWindows.append(window)
+        window.emailField.setText("export" + str(i))
+        window.printPurposeField.setCurrentText(Configuration.NORMAL_PRINT_PURPOSES[0])
+        window.submitButton.click()
+        waitFor(lambda: printLocation in writtenFiles)
+        exportLatencies.append(time.perf_counter() - exportStartTime)
+    duration = time.perf_counter() - startTime
+
+    # Wait for the windows to close.
+    waitFor(lambda: len(WindowRegistry.getRegistry().getOpenWindows(PaymentWindow)) == 0)
+    Stubs.OutputDevice.onWritten = None
+    return {
+        "export (window open)": summarizeLatencies(openLatencies, duration),
+        "export (written)": summarizeLatencies(exportLatencies, duration),
+    }
+
+
+def runSwipeAuthentication(environment: Dict, iterations: int) -> Dict[str, Dict]:
+    """Opens lab manager authentication requests and swipes the lab manager's id.
+
+    :param environment: Applications, server, and directories of the benchmark.
+    :param iterations: Amount of authentications.
+    """
+
+    from ConstructRIT.UI.Swipe.LabManagerAuthenticationWindow import LabManagerAuthenticationWindow
+    from ConstructRIT.UI.Swipe.SwipePrompt import getSwipePrompt
+
+    readyLatencies, acceptLatencies = [], []
+    prompt = getSwipePrompt()
+    startTime = time.perf_counter()
+    for _ in range(iterations):
+        # Open the prompt and wait for it to be shown.
+        openStartTime = time.perf_counter()
+        request = LabManagerAuthenticationWindow()
+        waitFor(lambda: prompt.isVisible() and prompt.request is request)
+        readyLatencies.append(time.perf_counter() - openStartTime)
+
+        # Swipe the id and wait for it to be accepted.
+        authenticated = []
+        request.onAuthenticated.connect(lambda: authenticated.append(True))
+        swipeStartTime = time.perf_counter()
+        QtTest.QTest.keyClicks(prompt, ";" + LAB_MANAGER_ID + "=0000?")
+        waitFor(lambda: prompt.swipeLabel.text() == "Authorization accepted.")
+        acceptLatencies.append(time.perf_counter() - swipeStartTime)
+        waitFor(lambda: len(authenticated) > 0 and not prompt.isVisible())
+    duration = time.perf_counter() - startTime
+    return {
+        "swipe-auth (prompt ready)": summarizeLatencies(readyLatencies, duration),
+        "swipe-auth (accepted)": summarizeLatencies(acceptLatencies, duration),
+    }
+
+
+def runSandboxSave(environment: Dict, iterations: int) -> Dict[str, Dict]:
+    """Saves the preferences with the settings sandbox storing the changed settings.
+
+    :param environment: Applications, server, and directories of the benchmark.
+    :param iterations: Amount of saves.
+    """
+
+    from ConstructSettingsSandbox.src.SandboxPlugin import SandboxPlugin
+    from ConstructSettingsSandbox.src.State import State
+
+    # Create the plugin with saving the settings enabled.
+    state = State(os.path.join(environment["directory"], "sandboxState.json"))
+    state.setCanSaveSettings(True)
+    plugin = SandboxPlugin(os.path.join(environment["directory"], "SandboxStore"), state)
+    settingsDirectory = Stubs.Resources.getConfigStoragePath()
+
+    # Change a setting and save the preferences.
+    callLatencies, storeLatencies = [], []
+    startTime = time.perf_counter()
+    try:
+        for i in range(iterations):
+            with open(os.path.join(settingsDirectory, "cura.cfg"), "a") as file:
+                file.write("benchmark_" + str(i) + " = True\n")
+            saveStartTime = time.perf_counter()
+            environment["app"].savePreferences()
+            callLatencies.append(time.perf_counter() - saveStartTime)
+            plugin.snapshotWorker.flush()
+            storeLatencies.append(time.perf_counter() - saveStartTime)
+    finally:
+        plugin.stopSnapshotWorker()
+    duration = time.perf_counter() - startTime
+    return {
+        "sandbox-save (call)": summarizeLatencies(callLatencies, duration),
+        "sandbox-save (stored)": summarizeLatencies(storeLatencies, duration),
+    }
+
+
+def compareBaseline(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Returns the measurements that are slower than the baseline.
+
+    :param results: Results of the benchmark.
+    :param baseline: Results of a previous benchmark.
+    :param tolerance: Fraction the median latency can increase by before it is a regression.
+    """
+
+    regressions = []
+    for name, result in results.items():
+        if name in baseline.keys() and result["p50"] > baseline[name]["p50"] * (1 + tolerance):
+            regressions.append(name + ": median " + "{:.1f}".format(result["p50"] * 1000) + " ms vs baseline " + "{:.1f}".format(baseline[name]["p50"] * 1000) + " ms")
+    return regressions
+
+
+def printResults(results: Dict[str, Dict]) -> None:
+    """Prints the results of the benchmark.
+
+    :param results: Results of the benchmark.
+    """
+
+    nameWidth = max(len(name) for name in results.keys())
+    print("Name".ljust(nameWidth) + "  " + "Count".rjust(6) + "  " + "p50 (ms)".rjust(10) + "  " + "p95 (ms)".rjust(10) + "  " + "max (ms)".rjust(10) + "  " + "Per minute".rjust(11))
+    for name, result in results.items():
+        print(name.ljust(nameWidth) + "  " + str(result["count"]).rjust(6) + "  " + "{:.1f}".format(result["p50"] * 1000).rjust(10) + "  " + "{:.1f}".format(result["p95"] * 1000).rjust(10) + "  " + "{:.1f}".format(result["max"] * 1000).rjust(10) + "  " + "{:,.0f}".format(result["perMinute"]).rjust(11))
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """Runs the benchmarks from the command line.
+
+    :param arguments: Command line arguments. If None, the process arguments are used.
+    :return: The exit code, which is 1 if a measurement regressed from the baseline.
+    """
+
+    # Parse the arguments.
+    parser = argparse.ArgumentParser(description="Benchmarks the plugins outside of Cura.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIO_NAMES, default=SCENARIO_NAMES, help="Scenarios to run.")
+    parser.add_argument("--iterations", type=int, default=20, help="Amount of times to run each scenario.")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds the stand-in server waits before each response.")
+    parser.add_argument("--baseline", help="Results file to compare the results to.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Fraction the median latency can increase by before it is a regression.")
+    parser.add_argument("--save-baseline", help="File to save the results to.")
+    arguments = parser.parse_args(arguments)
+
+    # Set up the stand-ins of Cura and the settings.
+    directory = tempfile.mkdtemp()
+    settingsDirectory = os.path.join(directory, "settings")
+    createSettings(settingsDirectory)
+    environment = Stubs.install(settingsDirectory)
+    environment["directory"] = directory
+
+    # Start the stand-in server and use it as the server. Traces and configuration files are stored in the benchmark directory.
+    from ConstructRIT import Configuration
+    from ConstructRIT.Util import Tracing
+    from ConstructRIT.Util.StandInServer import StandInServer
+    server = StandInServer(latency=arguments.latency)
+    server.addUser(LAB_MANAGER_ID, LAB_MANAGER_EMAIL, "Lab Manager", ["LabManager"])
+    environment["server"] = server
+    Configuration.environmentFile = os.path.join(directory, "environment.json")
+    Configuration.remoteFile = os.path.join(directory, "remoteConfiguration.json")
+    Configuration.overrideFile = os.path.join(directory, "configuration.json")
+    with open(Configuration.environmentFile, "w") as file:
+        file.write(json.dumps({"SERVER_HOST": server.start()}))
+    with open(Configuration.overrideFile, "w") as file:
+        file.write(json.dumps({"REMOTE_CONFIGURATION_ENABLED": False, "PEER_BROADCAST_ENABLED": False}))
+    Configuration.reload()
+    Tracing.traceFile = os.path.join(directory, "Traces", "traces.jsonl")
+    from ConstructRIT.Util import UserIndex
+    UserIndex.indexFile = os.path.join(directory, "userIndex.sqlite3")
+
+    # Register the plugins and finish initializing.
+    import ConstructCore
+    import ConstructPaymentWindow
+    ConstructCore.register(environment["app"])
+    ConstructPaymentWindow.register(environment["app"])
+    environment["app"].initializationFinished.emit()
+
+    # Run the scenarios.
+    scenarios = {
+        "export": runExport,
+        "swipe-auth": runSwipeAuthentication,
+        "sandbox-save": runSandboxSave,
+    }
+    results = {}
+    try:
+        for name in arguments.scenarios:
+            results.update(scenarios[name](environment, arguments.iterations))
+    finally:
+        server.stop()
+        Tracing.flush()
+    printResults(results)
+
+    # Save and compare the results.
+    if arguments.save_baseline is not None:
+        with open(arguments.save_baseline, "w") as file:
+            file.write(json.dumps(results, indent=4))
+    exitCode = 0
+    if arguments.baseline is not None:
+        with open(arguments.baseline) as file:
+            regressions = compareBaseline(results, json.loads(file.read()), arguments.tolerance)
+        for regression in regressions:
+            print("Regression: " + regression)
+        exitCode = 1 if len(regressions) > 0 else 0
+    shutil.rmtree(directory, ignore_errors=True)
+    return exitCode
+
+
+if __name__ == '__main__':
+    sys.exit(main())
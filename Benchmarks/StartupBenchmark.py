@@ -0,0 +1,158 @@
+"""
+Zachary Cook
+
+Measures loading the plugins with stand-ins of Cura in new processes, reports the
+slowest plugins and imports, and fails if the startup is over budget. The plugins are
+copied to a temporary directory so the files they store aren't added to the repository.
+Run from the repository directory with:
+python Benchmarks/StartupBenchmark.py [--runs N] [--budget MS] [--plugin-budget MS] [--disable-pre-import]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+
+# Plugins in the order Cura loads them.
+PLUGIN_IDS = ["ConstructCore", "ConstructJobMode", "ConstructPaymentWindow", "ConstructPrinterAuthorization", "ConstructSettingsSandbox"]
+
+
+def copyPlugins(directory: str, preImport: bool = True) -> None:
+    """Copies the plugins without their stored files.
+
+    :param directory: Directory to copy the plugins to.
+    :param preImport: Whether the plugins import modules in the background after starting.
+    """
+
+    repositoryDirectory = os.path.realpath(os.path.join(__file__, "..", ".."))
+    for pluginId in PLUGIN_IDS:
+        shutil.copytree(os.path.join(repositoryDirectory, pluginId), os.path.join(directory, pluginId), ignore=shutil.ignore_patterns("__pycache__", "SandboxStore", "SandboxedSettings*", "Traces", "state.json", "remoteConfiguration.json", "userIndex.sqlite3*"))
+
+    # Use a server address that refuses connections immediately.
+    with open(os.path.join(directory, "ConstructCore", "environment.json"), "w") as file:
+        file.write(json.dumps({"SERVER_HOST": "http://127.0.0.1:9"}))
+    with open(os.path.join(directory, "ConstructCore", "configuration.json"), "w") as file:
+        file.write(json.dumps({"PRE_IMPORT_ENABLED": preImport}))
+
+
+def runStartup(pluginDirectory: str, settingsDirectory: str, reportSize: int, idleSeconds: float) -> Dict:
+    """Loads the plugins in the current process, exports a print after waiting, and returns the measurements.
+
+    :param pluginDirectory: Directory containing the plugins.
+    :param settingsDirectory: Directory of the Cura settings.
+    :param reportSize: Amount of slowest imports to return.
+    :param idleSeconds: Seconds to wait after starting before exporting.
+    """
+
+    import Stubs
+    from PyQt5 import QtWidgets
+    from RunBenchmarks import waitFor
+    environment = Stubs.install(settingsDirectory, pluginDirectory)
+
+    # Load the plugins and finish initializing.
+    startTime = time.perf_counter()
+    for pluginId in PLUGIN_IDS:
+        environment["pluginRegistry"].loadPlugin(pluginId)
+    environment["app"].initializationFinished.emit()
+    duration = time.perf_counter() - startTime
+
+    # Wait as a user would before exporting, and time the first export until the payment window opens.
+    time.sleep(idleSeconds)
+    outputDevice = environment["app"].getOutputDeviceManager().getOutputDevices()[0]
+    clickStartTime = time.perf_counter()
+    outputDevice._performWrite(os.path.join(os.path.dirname(settingsDirectory), "firstExport.gcode"))
+    waitFor(lambda: any(type(widget).__name__ == "PaymentWindow" and widget.isVisible() for widget in QtWidgets.QApplication.topLevelWidgets()))
+    firstClick = time.perf_counter() - clickStartTime
+
+    # Stop the sandbox's background saving and return the measurements.
+    from ConstructRIT.Util import StartupProfiler
+    for registered in environment["pluginRegistry"].plugins.values():
+        if hasattr(registered.get("extension"), "stopSnapshotWorker"):
+            registered["extension"].stopSnapshotWorker()
+    profiler = StartupProfiler.getProfiler()
+    return {
+        "total": duration,
+        "firstClick": firstClick,
+        "plugins": {name: times["total"] for name, times in profiler.plugins.items()},
+        "imports": profiler.getTopImports(reportSize),
+    }
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """Runs the startup benchmark from the command line.
+
+    :param arguments: Command line arguments. If None, the process arguments are used.
+    :return: The exit code, which is 1 if the startup is over budget.
+    """
+
+    # Parse the arguments.
+    parser = argparse.ArgumentParser(description="Measures loading the plugins outside of Cura.")
+    parser.add_argument("--runs", type=int, default=5, help="Amount of measured runs, after a run that compiles the plugins.")
+    parser.add_argument("--budget", type=float, default=1000.0, help="Maximum median milliseconds to load all the plugins.")
+    parser.add_argument("--plugin-budget", type=float, default=500.0, help="Maximum median milliseconds to load each plugin.")
+    parser.add_argument("--first-click-budget", type=float, default=250.0, help="Maximum median milliseconds for the payment window to open on the first export.")
+    parser.add_argument("--idle", type=float, default=1.0, help="Seconds to wait after starting before the first export.")
+    parser.add_argument("--disable-pre-import", action="store_true", help="Don't import modules in the background after starting.")
+    parser.add_argument("--report-size", type=int, default=10, help="Amount of slowest imports to report.")
+    parser.add_argument("--child", nargs=2, metavar=("PLUGINS", "SETTINGS"), help=argparse.SUPPRESS)
+    arguments = parser.parse_args(arguments)
+
+    # Run the startup and print the measurements if this is a measured process.
+    if arguments.child is not None:
+        print(json.dumps(runStartup(arguments.child[0], arguments.child[1], arguments.report_size, arguments.idle)))
+        sys.stdout.flush()
+        os._exit(0)
+
+    # Copy the plugins and create the settings.
+    from RunBenchmarks import createSettings
+    directory = tempfile.mkdtemp()
+    pluginDirectory = os.path.join(directory, "plugins")
+    settingsDirectory = os.path.join(directory, "settings")
+    copyPlugins(pluginDirectory, not arguments.disable_pre_import)
+    createSettings(settingsDirectory)
+
+    # Run the startup in new processes. The first run compiles the plugins and stores the sandbox settings.
+    runs = []
+    try:
+        for i in range(arguments.runs + 1):
+            output = subprocess.run([sys.executable, os.path.realpath(__file__), "--child", pluginDirectory, settingsDirectory, "--report-size", str(arguments.report_size), "--idle", str(arguments.idle)], stdout=subprocess.PIPE, check=True).stdout
+            if i > 0:
+                runs.append(json.loads(output.decode("UTF-8").strip().splitlines()[-1]))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # Print the median times.
+    total = statistics.median(run["total"] for run in runs)
+    firstClick = statistics.median(run["firstClick"] for run in runs)
+    pluginTimes = {pluginId: statistics.median(run["plugins"].get(pluginId, 0.0) for run in runs) for pluginId in PLUGIN_IDS}
+    print("Loading all plugins: " + "{:.1f}".format(total * 1000) + " ms (median of " + str(len(runs)) + " runs, budget " + "{:.0f}".format(arguments.budget) + " ms)")
+    for pluginId, duration in sorted(pluginTimes.items(), key=lambda entry: entry[1], reverse=True):
+        print("  " + pluginId.ljust(32) + "{:.1f}".format(duration * 1000).rjust(8) + " ms")
+    print("First export until the payment window opens: " + "{:.1f}".format(firstClick * 1000) + " ms (budget " + "{:.0f}".format(arguments.first_click_budget) + " ms, pre-import " + ("disabled" if arguments.disable_pre_import else "enabled") + ")")
+    print("Slowest imports (last run):")
+    for entry in runs[-1]["imports"]:
+        print("  " + entry["name"].ljust(56) + "{:.1f}".format(entry["self"] * 1000).rjust(8) + " ms self" + "{:.1f}".format(entry["total"] * 1000).rjust(10) + " ms total")
+
+    # Check the budgets.
+    overBudget = []
+    if total * 1000 > arguments.budget:
+        overBudget.append("All plugins")
+    for pluginId, duration in pluginTimes.items():
+        if duration * 1000 > arguments.plugin_budget:
+            overBudget.append(pluginId)
+    if firstClick * 1000 > arguments.first_click_budget:
+        overBudget.append("First export")
+    for name in overBudget:
+        print("Over budget: " + name)
+    return 1 if len(overBudget) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,395 @@
+"""
+Zachary Cook
+
+Lightweight stand-ins of the Cura and Uranium classes used by the plugins
+for running the plugins outside of Cura. Qt is run offscreen.
+"""
+
+import importlib
+import os
+import sys
+import tempfile
+import types
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5 import QtCore, QtWidgets
+
+
+# Directory of the plugins.
+repositoryDirectory = os.path.realpath(os.path.join(__file__, "..", ".."))
+
+
+class Logger:
+    """Stand-in of UM.Logger.Logger that stores the messages.
+    """
+
+    messages = []
+
+    @classmethod
+    def log(cls, level: str, message: str, *args) -> None:
+        cls.messages.append((level, message % args if len(args) > 0 else message))
+
+    @classmethod
+    def logException(cls, level: str, message: str, *args) -> None:
+        cls.log(level, message, *args)
+
+    @classmethod
+    def error(cls, message) -> None:
+        cls.log("e", str(message))
+
+
+class PluginObject:
+    """Stand-in of UM.PluginObject.PluginObject.
+    """
+
+    pluginId = None
+
+    def setPluginId(self, pluginId: str) -> None:
+        self.pluginId = pluginId
+
+    def getPluginId(self) -> Optional[str]:
+        return self.pluginId
+
+
+class PluginRegistry:
+    """Stand-in of UM.PluginRegistry.PluginRegistry that loads the plugins from the path.
+    """
+
+    types = {}
+    instance = None
+
+    def __init__(self, application):
+        self.application = application
+        self.plugins = {}
+
+    @classmethod
+    def getInstance(cls) -> Optional["PluginRegistry"]:
+        return cls.instance
+
+    @classmethod
+    def addType(cls, name: str, function: Callable) -> None:
+        cls.types[name] = function
+
+    def loadPlugin(self, pluginId: str) -> None:
+        registered = importlib.import_module(pluginId).register(self.application)
+        for pluginObject in registered.values():
+            if hasattr(pluginObject, "setPluginId"):
+                pluginObject.setPluginId(pluginId)
+        self.plugins[pluginId] = registered
+
+    def getPluginPath(self, pluginId: str) -> str:
+        return os.path.dirname(importlib.import_module(pluginId).__file__)
+
+
+class Extension:
+    """Stand-in of UM.Extension.Extension that stores the menu items.
+    """
+
+    def __init__(self):
+        self.menuName = None
+        self.menuItems = {}
+
+    def setMenuName(self, name: str) -> None:
+        self.menuName = name
+
+    def addMenuItem(self, name: str, function: Callable) -> None:
+        self.menuItems[name] = function
+
+
+class Resources:
+    """Stand-in of UM.Resources.Resources with configurable settings and data directories.
+    """
+
+    configStoragePath = None
+    dataStoragePath = None
+
+    @classmethod
+    def getConfigStoragePath(cls) -> str:
+        return cls.configStoragePath
+
+    @classmethod
+    def getDataStoragePath(cls) -> str:
+        return cls.dataStoragePath
+
+
+class Duration(int):
+    """Stand-in of the durations of the print information.
+    """
+
+    pass
+
+
+class PrintInformation:
+    """Stand-in of cura.UI.PrintInformation.PrintInformation.
+    """
+
+    def __init__(self, weight: float = 20.0, printTimeSeconds: int = 3600):
+        self._material_weights = {"default": [weight]}
+        self._current_print_time = {"default": Duration(printTimeSeconds)}
+
+
+class Material:
+    """Stand-in of the material container of an extruder.
+    """
+
+    def __init__(self, name: str, baseFile: str):
+        self.name = name
+        self.baseFile = baseFile
+
+    def getName(self) -> str:
+        return self.name
+
+    def getMetaDataEntry(self, name: str) -> Optional[str]:
+        return self.baseFile if name == "base_file" else None
+
+
+class Extruder:
+    """Stand-in of an extruder stack.
+    """
+
+    def __init__(self, material: Material):
+        self.material = material
+
+
+class GlobalContainerStack:
+    """Stand-in of the global container stack of a machine.
+    """
+
+    def __init__(self, name: str, materials: List[Material]):
+        self.name = name
+        self.extruderList = [Extruder(material) for material in materials]
+        self.extruders = {str(i): extruder for i, extruder in enumerate(self.extruderList)}
+
+    def getName(self) -> str:
+        return self.name
+
+
+class MachineManager(QtCore.QObject):
+    """Stand-in of cura.Settings.MachineManager.MachineManager.
+    """
+
+    globalContainerChanged = QtCore.pyqtSignal()
+    activeMaterialChanged = QtCore.pyqtSignal()
+
+    def __init__(self, machineName: str = "Prusa i3 Mk3/Mk3s", materialName: str = "PLA"):
+        super().__init__()
+        self._global_container_stack = GlobalContainerStack(machineName, [Material(materialName, "generic_pla")])
+        self.machineHistory = []
+
+    def setActiveMachine(self, machineName: str) -> None:
+        self.machineHistory.append(machineName)
+        self._global_container_stack = GlobalContainerStack(machineName, [extruder.material for extruder in self._global_container_stack.extruderList])
+        self.globalContainerChanged.emit()
+
+    def setMaterialById(self, extruderIndex: int, baseFile: str) -> None:
+        self._global_container_stack.extruderList[extruderIndex].material = Material(baseFile, baseFile)
+        self.activeMaterialChanged.emit()
+
+
+class OutputDevice:
+    """Stand-in of a local file output device. Written files are reported to the listener.
+    """
+
+    onWritten = None
+
+    def _performWrite(self, file_name: str, *args, **kwargs) -> None:
+        with open(file_name, "w") as file:
+            file.write(";gcode\n")
+        if OutputDevice.onWritten is not None:
+            OutputDevice.onWritten(file_name)
+
+
+class OutputDeviceManager(QtCore.QObject):
+    """Stand-in of UM.OutputDevice.OutputDeviceManager.OutputDeviceManager.
+    """
+
+    outputDevicesChanged = QtCore.pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self.outputDevices = [OutputDevice()]
+
+    def getOutputDevices(self) -> List[OutputDevice]:
+        return self.outputDevices
+
+
+class Backend(QtCore.QObject):
+    """Stand-in of cura.CuraEngineBackend.CuraEngineBackend.CuraEngineBackend.
+    """
+
+    backendStateChange = QtCore.pyqtSignal(object)
+
+
+class BoundingBoxValue(float):
+    """Stand-in of the numpy values of the scene bounding box.
+    """
+
+    def item(self) -> float:
+        return float(self)
+
+
+class BoundingBox:
+    """Stand-in of the scene bounding box.
+    """
+
+    def __init__(self, width: float, depth: float, height: float):
+        self.width = BoundingBoxValue(width)
+        self.depth = BoundingBoxValue(depth)
+        self.height = BoundingBoxValue(height)
+
+
+class StageModel(QtCore.QAbstractListModel):
+    """Stand-in of UM.Qt.Bindings.StageModel.StageModel with the id and name of each stage.
+    """
+
+    roles = {QtCore.Qt.UserRole + 1: b"id", QtCore.Qt.UserRole + 2: b"name"}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.items = []
+
+    def setItems(self, items: List[Dict]) -> None:
+        self.beginResetModel()
+        self.items = [dict(item) for item in items]
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.items)
+
+    def roleNames(self) -> Dict[int, bytes]:
+        return self.roles
+
+    def data(self, index: QtCore.QModelIndex, role: int):
+        if not index.isValid() or role not in self.roles.keys():
+            return None
+        return self.items[index.row()].get(self.roles[role].decode())
+
+    def find(self, key: str, value) -> int:
+        for index, item in enumerate(self.items):
+            if item.get(key) == value:
+                return index
+        return -1
+
+    def setProperty(self, index: int, name: str, value) -> None:
+        self.items[index][name] = value
+        role = [role for role, roleName in self.roles.items() if roleName.decode() == name][0]
+        self.dataChanged.emit(self.index(index), self.index(index), [role])
+
+
+class CuraStage(QtCore.QObject, PluginObject):
+    """Stand-in of cura.Stages.CuraStage.CuraStage.
+    """
+
+    def __init__(self, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.displayComponents = {}
+
+    def addDisplayComponent(self, name: str, source) -> None:
+        self.displayComponents[name] = source
+
+
+class Application(QtCore.QObject):
+    """Stand-in of UM.Application.Application.
+    """
+
+    initializationFinished = QtCore.pyqtSignal()
+    applicationShuttingDown = QtCore.pyqtSignal()
+    engineCreatedSignal = QtCore.pyqtSignal()
+    instance = None
+    _qml_engine = None
+
+    @classmethod
+    def getInstance(cls) -> Optional["Application"]:
+        return Application.instance
+
+    def savePreferences(self) -> None:
+        self.preferencesSaved += 1
+
+
+class CuraApplication(Application):
+    """Stand-in of cura.CuraApplication.CuraApplication.
+    """
+
+    def __init__(self):
+        super().__init__()
+        Application.instance = self
+        self.preferencesSaved = 0
+        self.printInformation = PrintInformation()
+        self.machineManager = MachineManager()
+        self.outputDeviceManager = OutputDeviceManager()
+        self.backend = Backend()
+        self._scene_bounding_box = BoundingBox(29.1, 25.4, 3.0)
+
+    def getPrintInformation(self) -> PrintInformation:
+        return self.printInformation
+
+    def getMachineManager(self) -> MachineManager:
+        return self.machineManager
+
+    def getOutputDeviceManager(self) -> OutputDeviceManager:
+        return self.outputDeviceManager
+
+    def getBackend(self) -> Backend:
+        return self.backend
+
+    def getPluginRegistry(self) -> PluginRegistry:
+        return PluginRegistry.getInstance()
+
+
+def createModule(name: str, **attributes) -> types.ModuleType:
+    """Adds a module with attributes to the loaded modules.
+
+    :param name: Full name of the module.
+    :param attributes: Attributes of the module.
+    """
+
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+
+def install(configStoragePath: Optional[str] = None, pluginDirectory: str = repositoryDirectory) -> Dict:
+    """Installs the stand-ins as the UM and cura modules, adds the plugins to the
+    path, and creates the Qt application.
+
+    :param configStoragePath: Directory returned as the Cura settings directory. The Cura data
+    directory is the "data" directory next to it, or the temporary directory of the system if None.
+    :param pluginDirectory: Directory containing the plugins.
+    :return: The Qt application, the Cura application, and the plugin registry.
+    """
+
+    # Add the stand-in modules.
+    Resources.configStoragePath = configStoragePath
+    Resources.dataStoragePath = tempfile.gettempdir() if configStoragePath is None else os.path.join(os.path.dirname(configStoragePath), "data")
+    createModule("UM")
+    createModule("UM.Logger", Logger=Logger)
+    createModule("UM.PluginObject", PluginObject=PluginObject)
+    createModule("UM.PluginRegistry", PluginRegistry=PluginRegistry)
+    createModule("UM.Extension", Extension=Extension)
+    createModule("UM.Resources", Resources=Resources)
+    createModule("UM.Application", Application=Application)
+    createModule("UM.Qt")
+    createModule("UM.Qt.Bindings")
+    createModule("UM.Qt.Bindings.StageModel", StageModel=StageModel)
+    createModule("cura")
+    createModule("cura.CuraApplication", CuraApplication=CuraApplication)
+    createModule("cura.Stages")
+    createModule("cura.Stages.CuraStage", CuraStage=CuraStage)
+
+    # Add the plugins and the ConstructRIT module to the path.
+    for path in (pluginDirectory, os.path.join(pluginDirectory, "ConstructCore")):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    # Store the Qt messages with the log instead of printing them, and create the applications.
+    QtCore.qInstallMessageHandler(lambda messageType, context, message: Logger.log("d", message))
+    qtApplication = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    app = CuraApplication.getInstance() or CuraApplication()
+    PluginRegistry.instance = PluginRegistry.instance or PluginRegistry(app)
+    return {
+        "qtApplication": qtApplication,
+        "app": app,
+        "pluginRegistry": PluginRegistry.instance,
+    }
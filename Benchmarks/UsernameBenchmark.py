@@ -0,0 +1,192 @@
+"""
+Zachary Cook
+
+Measures the memory of the username index and the latency of validating and completing
+usernames as each key is typed, in the index and in the payment window offscreen.
+Run from the repository directory with:
+python Benchmarks/UsernameBenchmark.py [--usernames N] [--keystroke-budget MS]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+import Stubs
+from PyQt5 import QtCore, QtTest, QtWidgets
+
+
+def createUsernames(count: int, seed: int = 0) -> List[str]:
+    """Returns unique usernames in the format of RIT usernames, such as "abc1234".
+
+    :param count: Amount of usernames to create.
+    :param seed: Seed of the random usernames.
+    """
+
+    randomGenerator = random.Random(seed)
+    usernames = set()
+    while len(usernames) < count:
+        usernames.add("".join(randomGenerator.choice(string.ascii_lowercase) for _ in range(randomGenerator.randint(2, 4))) + str(randomGenerator.randint(1000, 9999)))
+    return list(usernames)
+
+
+def getPercentiles(durations: List[float]) -> Dict[str, float]:
+    """Returns the median, 95th percentile, and maximum of durations in milliseconds.
+
+    :param durations: Durations in seconds.
+    """
+
+    durations = sorted(durations)
+    return {
+        "p50": statistics.median(durations) * 1000,
+        "p95": durations[int(len(durations) * 0.95)] * 1000,
+        "max": durations[-1] * 1000,
+    }
+
+
+def measureIndex(usernames: List[str], typedUsernames: List[str], completionSize: int) -> Dict:
+    """Builds the username index and times validating and completing each prefix of usernames.
+
+    :param usernames: Usernames to index.
+    :param typedUsernames: Usernames to type.
+    :param completionSize: Maximum usernames to complete.
+    """
+
+    from ConstructRIT.Util import Usernames
+
+    # Time building the index.
+    startTime = time.perf_counter()
+    usernameIndex = Usernames.UsernameIndex(usernames)
+    buildTime = time.perf_counter() - startTime
+
+    # Measure the memory of the index and of a sorted list of new copies of the usernames for comparison.
+    tracemalloc.start()
+    usernameIndex = Usernames.UsernameIndex(usernames)
+    indexMemory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracemalloc.start()
+    sortedUsernames = sorted(username.encode("ascii").decode("ascii") for username in usernames)
+    listMemory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sortedUsernames
+
+    # Time each keystroke.
+    durations = []
+    for username in typedUsernames:
+        for length in range(1, len(username) + 1):
+            prefix = username[:length]
+            startTime = time.perf_counter()
+            if Usernames.isEmailPrefix(prefix):
+                usernameIndex.getCompletions(prefix, completionSize)
+            Usernames.normalizeEmail(prefix)
+            durations.append(time.perf_counter() - startTime)
+    return {
+        "index": usernameIndex,
+        "buildTime": buildTime,
+        "indexMemory": indexMemory,
+        "listMemory": listMemory,
+        "keystrokes": durations,
+    }
+
+
+def measureWindow(usernameIndex, typedUsernames: List[str], directory: str) -> List[float]:
+    """Times typing usernames into the email field of the payment window, including updating the completions.
+
+    :param usernameIndex: Username index to complete from.
+    :param typedUsernames: Usernames to type.
+    :param directory: Directory to export the print to.
+    """
+
+    from ConstructRIT.Util import UserIndex
+    from ConstructPaymentWindow.src.PaymentWindow import PaymentWindow
+
+    # Open the payment window with the index.
+    UserIndex.getIndex().usernameIndex = usernameIndex
+    window = PaymentWindow(os.path.join(directory, "print.gcode"))
+    window.onCompleted.connect(lambda data: None)
+    QtWidgets.QApplication.processEvents()
+
+    # Type each username and time each keystroke until the events are handled.
+    durations = []
+    for username in typedUsernames:
+        window.emailField.clear()
+        for character in username:
+            startTime = time.perf_counter()
+            QtTest.QTest.keyClick(window.emailField, character)
+            QtWidgets.QApplication.processEvents()
+            durations.append(time.perf_counter() - startTime)
+        QtTest.QTest.keyClick(window.emailField, QtCore.Qt.Key_Escape)
+    window.cancelButton.click()
+    return durations
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """Runs the username benchmark from the command line.
+
+    :param arguments: Command line arguments. If None, the process arguments are used.
+    :return: The exit code, which is 1 if a keystroke is over budget.
+    """
+
+    # Parse the arguments.
+    parser = argparse.ArgumentParser(description="Measures completing usernames as they are typed.")
+    parser.add_argument("--usernames", type=int, default=100000, help="Amount of usernames in the index.")
+    parser.add_argument("--typed", type=int, default=200, help="Amount of usernames to type.")
+    parser.add_argument("--keystroke-budget", type=float, default=1.0, help="Maximum 95th percentile milliseconds to validate and complete a keystroke in the index.")
+    parser.add_argument("--window-keystroke-budget", type=float, default=16.0, help="Maximum 95th percentile milliseconds for a keystroke in the payment window.")
+    arguments = parser.parse_args(arguments)
+
+    # Set up the stand-ins of Cura with manually entering emails enabled.
+    directory = tempfile.mkdtemp()
+    environment = Stubs.install(os.path.join(directory, "settings"))
+    from ConstructRIT import Configuration
+    from ConstructRIT.Util import UserIndex
+    Configuration.environmentFile = os.path.join(directory, "environment.json")
+    Configuration.remoteFile = os.path.join(directory, "remoteConfiguration.json")
+    Configuration.overrideFile = os.path.join(directory, "configuration.json")
+    with open(Configuration.environmentFile, "w") as file:
+        file.write(json.dumps({"SERVER_HOST": "http://127.0.0.1:9"}))
+    with open(Configuration.overrideFile, "w") as file:
+        file.write(json.dumps({"REMOTE_CONFIGURATION_ENABLED": False, "PEER_BROADCAST_ENABLED": False, "PRE_IMPORT_ENABLED": False, "DISABLE_MANUALLY_ENTERING_EMAIL": False}))
+    Configuration.reload()
+    UserIndex.indexFile = os.path.join(directory, "userIndex.sqlite3")
+    import ConstructCore
+    ConstructCore.register(environment["app"])
+
+    # Measure the index and the payment window.
+    usernames = createUsernames(arguments.usernames)
+    typedUsernames = random.Random(1).sample(usernames, arguments.typed)
+    try:
+        indexResults = measureIndex(usernames, typedUsernames, Configuration.EMAIL_COMPLETION_SIZE)
+        windowDurations = measureWindow(indexResults["index"], typedUsernames, directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # Print the measurements.
+    keystrokes = getPercentiles(indexResults["keystrokes"])
+    windowKeystrokes = getPercentiles(windowDurations)
+    print("Usernames: " + "{:,}".format(len(indexResults["index"])) + ", built in " + "{:.0f}".format(indexResults["buildTime"] * 1000) + " ms")
+    print("Memory: " + "{:.2f}".format(indexResults["indexMemory"] / 1024 / 1024) + " MB index, " + "{:.2f}".format(indexResults["listMemory"] / 1024 / 1024) + " MB as a sorted list of strings")
+    print("Index keystroke: " + "{:.3f}".format(keystrokes["p50"]) + " ms p50, " + "{:.3f}".format(keystrokes["p95"]) + " ms p95, " + "{:.3f}".format(keystrokes["max"]) + " ms max (budget " + "{:.1f}".format(arguments.keystroke_budget) + " ms p95)")
+    print("Payment window keystroke: " + "{:.2f}".format(windowKeystrokes["p50"]) + " ms p50, " + "{:.2f}".format(windowKeystrokes["p95"]) + " ms p95, " + "{:.2f}".format(windowKeystrokes["max"]) + " ms max (budget " + "{:.0f}".format(arguments.window_keystroke_budget) + " ms p95)")
+
+    # Check the budgets.
+    overBudget = []
+    if keystrokes["p95"] > arguments.keystroke_budget:
+        overBudget.append("Index keystroke")
+    if windowKeystrokes["p95"] > arguments.window_keystroke_budget:
+        overBudget.append("Payment window keystroke")
+    for name in overBudget:
+        print("Over budget: " + name)
+    return 1 if len(overBudget) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
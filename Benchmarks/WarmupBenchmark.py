@@ -0,0 +1,128 @@
+"""
+Zachary Cook
+
+Measures the time to the first byte of the first request of an export, with and without
+warming the connection to the server when slicing finishes. The stand-in server is reached
+through "localhost" with simulated latency for resolving the host and for connecting.
+Run from the repository directory with:
+python Benchmarks/WarmupBenchmark.py [--runs N] [--dns-latency MS] [--connect-latency MS]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+import Stubs
+from RunBenchmarks import getPercentile, waitFor
+
+
+# Email of the user exporting.
+USER_EMAIL = "user@rit.edu"
+
+
+def measureFirstRequest(app, warm: bool, idleSeconds: float) -> float:
+    """Closes the connections to the server and clears the DNS cache, optionally simulates slicing
+    finishing, and returns the seconds until the first byte of the first request of an export.
+
+    :param app: Stand-in of the Cura application.
+    :param warm: Whether to simulate slicing finishing before exporting.
+    :param idleSeconds: Seconds between slicing finishing and exporting.
+    """
+
+    from ConstructRIT.Util import ConnectionWarmer, Http, HttpSession
+
+    # Start without any connections or cached addresses.
+    connectionWarmer = app.ConstructRIT.connectionWarmer
+    connectionWarmer.stop()
+    Http.resetSession()
+    HttpSession.getDnsCache().clear()
+
+    # Finish slicing and wait for the connection to be opened.
+    if warm:
+        pingCount = connectionWarmer.pingCount
+        app.getBackend().backendStateChange.emit(ConnectionWarmer.BACKEND_STATE_DONE)
+        waitFor(lambda: connectionWarmer.pingCount > pingCount)
+
+    # Send the first request of the export. The elapsed time of the response is until the headers are received.
+    time.sleep(idleSeconds)
+    response = Http.request("GET", "/user/find?email=" + USER_EMAIL)
+    response.raise_for_status()
+    return response.elapsed.total_seconds()
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """Runs the warm-up benchmark from the command line.
+
+    :param arguments: Command line arguments. If None, the process arguments are used.
+    :return: The exit code, which is 1 if warming the connection doesn't reduce the median time to the first byte.
+    """
+
+    # Parse the arguments.
+    parser = argparse.ArgumentParser(description="Measures the first request of an export with and without warming the connection.")
+    parser.add_argument("--runs", type=int, default=10, help="Amount of exports measured with and without warming.")
+    parser.add_argument("--dns-latency", type=float, default=20.0, help="Simulated milliseconds to resolve the server.")
+    parser.add_argument("--connect-latency", type=float, default=50.0, help="Simulated milliseconds for the TCP and TLS handshakes of a new connection.")
+    parser.add_argument("--idle", type=float, default=1.0, help="Seconds between slicing finishing and exporting.")
+    arguments = parser.parse_args(arguments)
+
+    # Start the stand-in server and use it as the server through "localhost".
+    directory = tempfile.mkdtemp()
+    environment = Stubs.install(os.path.join(directory, "settings"))
+    from ConstructRIT import Configuration
+    from ConstructRIT.Util import HttpSession
+    from ConstructRIT.Util.StandInServer import StandInServer
+    server = StandInServer(connectLatency=arguments.connect_latency / 1000)
+    server.addUser("200000000", USER_EMAIL, "User")
+    Configuration.environmentFile = os.path.join(directory, "environment.json")
+    Configuration.remoteFile = os.path.join(directory, "remoteConfiguration.json")
+    Configuration.overrideFile = os.path.join(directory, "configuration.json")
+    with open(Configuration.environmentFile, "w") as file:
+        file.write(json.dumps({"SERVER_HOST": server.start().replace("127.0.0.1", "localhost")}))
+    with open(Configuration.overrideFile, "w") as file:
+        file.write(json.dumps({"REMOTE_CONFIGURATION_ENABLED": False, "PEER_BROADCAST_ENABLED": False, "PRE_IMPORT_ENABLED": False, "USER_INDEX_ENABLED": False, "CONNECTION_WARMING_ENABLED": True}))
+    Configuration.reload()
+
+    # Simulate the latency of resolving the server, only connecting to the address the server listens on.
+    def resolve(host: str, port: int, *args):
+        time.sleep(arguments.dns_latency / 1000)
+        return [result for result in socket.getaddrinfo(host, port, *args) if result[0] == socket.AF_INET]
+    HttpSession.getDnsCache().resolve = resolve
+
+    # Register the core plugin and finish initializing, which connects the connection warmer.
+    import ConstructCore
+    ConstructCore.register(environment["app"])
+    environment["app"].initializationFinished.emit()
+
+    # Measure the exports, alternating between warming and not warming.
+    coldTimes = []
+    warmTimes = []
+    try:
+        for i in range(arguments.runs):
+            coldTimes.append(measureFirstRequest(environment["app"], False, arguments.idle))
+            warmTimes.append(measureFirstRequest(environment["app"], True, arguments.idle))
+    finally:
+        environment["app"].ConstructRIT.connectionWarmer.stop()
+        server.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # Print the measurements.
+    coldMedian = statistics.median(coldTimes)
+    warmMedian = statistics.median(warmTimes)
+    print("Time to the first byte of the first export request (" + str(arguments.runs) + " runs, " + "{:.0f}".format(arguments.dns_latency) + " ms DNS, " + "{:.0f}".format(arguments.connect_latency) + " ms connecting):")
+    print("  Without warm-up: " + "{:.1f}".format(coldMedian * 1000) + " ms p50, " + "{:.1f}".format(getPercentile(sorted(coldTimes), 95) * 1000) + " ms p95")
+    print("  With warm-up:    " + "{:.1f}".format(warmMedian * 1000) + " ms p50, " + "{:.1f}".format(getPercentile(sorted(warmTimes), 95) * 1000) + " ms p95")
+    if warmMedian >= coldMedian:
+        print("Warming the connection didn't reduce the time to the first byte.")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
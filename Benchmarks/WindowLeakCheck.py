@@ -0,0 +1,177 @@
+"""
+Zachary Cook
+
+Opens and closes the windows of the plugins offscreen and checks that the closed
+windows, their widgets, and their threads are freed and that the memory used stays
+bounded. Run from the repository directory with:
+python Benchmarks/WindowLeakCheck.py [--windows N] [--memory-budget KB]
+"""
+
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import Stubs
+from PyQt5 import QtCore, QtWidgets
+from RunBenchmarks import waitFor
+
+
+def getWindowCycles(directory: str) -> List[Callable[[int], None]]:
+    """Returns functions that open and close a window of each type the plugins use.
+
+    :param directory: Directory to export the prints to.
+    """
+
+    from ConstructRIT.UI.Swipe.LabManagerAuthenticationWindow import LabManagerAuthenticationWindow
+    from ConstructRIT.UI.Swipe.SwipePrompt import getSwipePrompt
+    from ConstructPaymentWindow.src.ImportUserDataWindow import ImportUserDataWindow
+    from ConstructPaymentWindow.src.PaymentWindow import PaymentWindow
+    from ConstructSettingsSandbox.src.SandboxConfirmWindow import SandboxConfirmWindow
+
+    def cyclePaymentWindow(index: int) -> None:
+        window = PaymentWindow(os.path.join(directory, "print_" + str(index) + ".gcode"))
+        window.onCompleted.connect(lambda data: None)
+        QtWidgets.QApplication.processEvents()
+        window.cancelButton.click()
+
+    def cycleSwipePrompt(index: int) -> None:
+        # Lose the focus so the focus timer is running when the request is cancelled.
+        request = LabManagerAuthenticationWindow() if index % 2 == 0 else ImportUserDataWindow()
+        request.onCancelled.connect(lambda: None)
+        QtWidgets.QApplication.processEvents()
+        prompt = getSwipePrompt()
+        prompt.focusOutEvent(None)
+        prompt.switchMode()
+        prompt.close()
+
+    def cycleConfirmWindow(index: int) -> None:
+        window = SandboxConfirmWindow("Confirm", "Check for leaks?")
+        window.onConfirmed.connect(lambda: None)
+        QtWidgets.QApplication.processEvents()
+        window.closeThreaded()
+
+    return [cyclePaymentWindow, cycleSwipePrompt, cycleConfirmWindow]
+
+
+def cycleWindows(cycles: List[Callable[[int], None]], count: int) -> None:
+    """Opens and closes windows and waits for them to be deleted.
+
+    :param cycles: Functions that open and close a window.
+    :param count: Amount of windows to open and close.
+    """
+
+    for i in range(count):
+        cycles[i % len(cycles)](i)
+        waitFor(lambda: len(getOpenWindows()) == 0)
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    gc.collect()
+
+
+def getOpenWindows() -> List[QtCore.QObject]:
+    """Returns the open windows except the swipe prompt, which is hidden to be reused.
+    """
+
+    from ConstructRIT.UI import WindowRegistry
+    from ConstructRIT.UI.Swipe.SwipePrompt import SwipePrompt
+    return [window for window in WindowRegistry.getRegistry().getOpenWindows() if not (isinstance(window, SwipePrompt) and not window.isVisible())]
+
+
+def measure() -> Dict[str, int]:
+    """Returns the memory, widgets, threads, windows, and swipe requests currently used.
+    """
+
+    from ConstructRIT.UI import WindowRegistry
+    from ConstructRIT.UI.Swipe.SwipePrompt import SwipeRequest
+
+    # Clear the messages stored by the stand-in logger, such as the warnings of the offscreen Qt platform.
+    del Stubs.Logger.messages[:]
+    gc.collect()
+    swipeRequests = sum(1 for value in gc.get_objects() if isinstance(value, SwipeRequest))
+    registry = WindowRegistry.getRegistry()
+    return {
+        "memory": tracemalloc.get_traced_memory()[0],
+        "widgets": len(QtWidgets.QApplication.allWidgets()),
+        "threads": threading.active_count(),
+        "openWindows": len(getOpenWindows()),
+        "leakedWindows": len(registry.getLeakedWindows()),
+        "swipeRequests": swipeRequests,
+    }
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """Runs the leak check from the command line.
+
+    :param arguments: Command line arguments. If None, the process arguments are used.
+    :return: The exit code, which is 1 if windows, widgets, threads, or memory leaked.
+    """
+
+    # Parse the arguments.
+    parser = argparse.ArgumentParser(description="Checks that closed windows are freed.")
+    parser.add_argument("--windows", type=int, default=1000, help="Amount of windows to open and close.")
+    parser.add_argument("--warmup", type=int, default=60, help="Amount of windows to open and close before measuring.")
+    parser.add_argument("--memory-budget", type=float, default=64.0, help="Maximum kilobytes the memory used can grow by.")
+    parser.add_argument("--thread-budget", type=int, default=0, help="Maximum amount the running threads can grow by.")
+    arguments = parser.parse_args(arguments)
+
+    # Set up the stand-ins of Cura with a server address that refuses connections immediately.
+    directory = tempfile.mkdtemp()
+    environment = Stubs.install(os.path.join(directory, "settings"))
+    from ConstructRIT import Configuration
+    Configuration.environmentFile = os.path.join(directory, "environment.json")
+    Configuration.remoteFile = os.path.join(directory, "remoteConfiguration.json")
+    Configuration.overrideFile = os.path.join(directory, "configuration.json")
+    with open(Configuration.environmentFile, "w") as file:
+        file.write(json.dumps({"SERVER_HOST": "http://127.0.0.1:9"}))
+    with open(Configuration.overrideFile, "w") as file:
+        file.write(json.dumps({"REMOTE_CONFIGURATION_ENABLED": False, "PEER_BROADCAST_ENABLED": False, "PRE_IMPORT_ENABLED": False, "USER_INDEX_ENABLED": False}))
+    Configuration.reload()
+
+    # Register the core plugin, which the windows use the state of.
+    import ConstructCore
+    ConstructCore.register(environment["app"])
+    environment["app"].initializationFinished.emit()
+
+    # Open and close the windows, measuring after the caches used by the windows are filled.
+    try:
+        cycles = getWindowCycles(directory)
+        cycleWindows(cycles, arguments.warmup)
+        tracemalloc.start()
+        before = measure()
+        cycleWindows(cycles, arguments.windows)
+        after = measure()
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # Print the measurements and check them.
+    memoryGrowth = (after["memory"] - before["memory"]) / 1024
+    print("Windows opened and closed: " + str(arguments.windows))
+    print("Memory growth: " + "{:.1f}".format(memoryGrowth) + " KB (budget " + "{:.0f}".format(arguments.memory_budget) + " KB)")
+    print("Widgets: " + str(before["widgets"]) + " before, " + str(after["widgets"]) + " after")
+    print("Threads: " + str(before["threads"]) + " before, " + str(after["threads"]) + " after")
+    print("Windows still open: " + str(after["openWindows"]) + ", closed windows still referenced: " + str(after["leakedWindows"]) + ", swipe requests still referenced: " + str(after["swipeRequests"]))
+    failures = []
+    if memoryGrowth > arguments.memory_budget:
+        failures.append("Memory grew by more than the budget.")
+    if after["widgets"] > before["widgets"]:
+        failures.append("Widgets of closed windows weren't deleted.")
+    if after["threads"] - before["threads"] > arguments.thread_budget:
+        failures.append("Threads grew by more than the budget.")
+    if after["openWindows"] > 0 or after["leakedWindows"] > 0:
+        failures.append("Closed windows weren't freed.")
+    if after["swipeRequests"] > 0:
+        failures.append("Finished swipe requests weren't freed.")
+    for failure in failures:
+        print("Leak: " + failure)
+    return 1 if len(failures) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
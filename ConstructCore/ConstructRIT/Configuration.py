@@ -27,12 +27,18 @@ NORMAL_PRINT_PURPOSES = ["Class/academic project", "Personal project", "Senior D
 # the payment is ignored.
 IGNORED_PAYMENT_ADDITIONAL_PRINT_PURPOSES = ["Test Print", "Internal Print", "Reprint", "Job Mode"]
 
-# The limits for print times.
+# The limits for print times. The first limit that covers the current hour is used.
+# Limits can optionally be limited to "days" (0 is Monday), to "printers" (exact names,
+# glob patterns, or regular expressions prefixed with "re:"), and to only holidays or
+# only non-holidays with "holidays" set to true or false.
 PRINTER_TIME_LIMITS = [
     {"printHoursLimit": 5, "startHour": 8, "endHour": 17},
     {"printHoursLimit": 12, "startHour": -1, "endHour": 25},
 ]
 
+# Dates ("YYYY-MM-DD") that are holidays for the print time limits.
+PRINTER_TIME_LIMIT_HOLIDAYS = []
+
 # Printer names that don't require lab manager authentication to use.
 AUTO_AUTHORIZED_PRINTERS = [
     "FlashForge Creator Pro", "Artillery Sidewinder X1", "Prusa i3 Mk3/Mk3s",
@@ -43,12 +49,42 @@ AUTO_AUTHORIZED_MATERIALS = [
     "generic_pla_175",
 ]
 
+# Additional rules for printers and materials that don't require lab manager
+# authentication to use. Names can be exact, glob patterns (such as "generic_pla*"),
+# or regular expressions when prefixed with "re:". Rules with only "printers" authorize
+# printers. Rules with "materials" authorize the materials on the given "printers", or
+# on any printer if no printers are given. Rules can optionally be limited to "days"
+# (0 is Monday) and to the hours between "startHour" and "endHour". If "startHour" is after
+# "endHour", the hours cross midnight and the hours after midnight belong to the day before.
+# Example: {"printers": ["Prusa*"], "materials": ["generic_petg*"], "days": [0, 1, 2, 3, 4], "startHour": 8, "endHour": 17}
+AUTHORIZATION_RULES = []
+
 # Max file name size for a given printer.
 # If no max length is given, the file name is not truncated.
 MAX_FILE_NAME_LENGTHS = {
     "FlashForge Creator Pro": 31
 }
 
+# Seconds to wait after settings are saved before storing them to the settings
+# sandbox. Saves within this time are combined into a single update.
+SANDBOX_SAVE_DELAY_SECONDS = 2.0
+
+# Names of the stored settings (such as for different courses) that can be switched
+# to from the settings sandbox menu. Settings that don't exist yet are created from
+# the current settings when switched to.
+SANDBOX_SNAPSHOT_NAMES = []
+
+# If true, restored sandbox settings are hardlinked to the stored settings when the file
+# system can't clone them. Only safe if Cura replaces settings files instead of modifying them.
+SANDBOX_RESTORE_WITH_HARDLINKS = False
+
+# If true, all settings files are hashed when restoring the sandbox settings on
+# startup instead of assuming files with unchanged sizes and modified times match.
+SANDBOX_VERIFY_ON_RESTORE = True
+
+# Threads used for hashing settings files when restoring the sandbox settings.
+SANDBOX_HASH_THREADS = 4
+
 # Names of the removable media that are whitelisted.
 # If the list is empty, no whitelisting is done.
 # All removable drive names must be lower case.
@@ -59,19 +95,324 @@ REMOVABLE_DRIVE_WHITELIST = [
 
 
 
-# Read the environment file and determine the bindings.
+# Seconds between checking the configuration files for changes.
+CONFIGURATION_WATCH_INTERVAL_SECONDS = 2.0
+
+# If true, the configuration is fetched from the server and stored for starting
+# offline. Values in the local configuration.json file still take priority.
+REMOTE_CONFIGURATION_ENABLED = True
+
+# Seconds a fetched configuration is used before checking the server for changes.
+REMOTE_CONFIGURATION_REFRESH_SECONDS = 900.0
+
+# Time a user must wait after a print before printing again, which is
+# base + (perGram * ln(weight)) minutes. This prevents using multiple printers at once.
+PRINT_COOLDOWN_BASE_MINUTES = 8.0
+PRINT_COOLDOWN_MINUTES_PER_LOG_GRAM = 8.0
+
+# Seconds the last print fetched from the server is used to check the cooldown
+# of a user who isn't cooling down, and the maximum users to store the last print of.
+PRINT_COOLDOWN_SEED_SECONDS = 60.0
+PRINT_COOLDOWN_MAX_USERS = 1000
+
+# If true, prints are announced to the other kiosks on the local network so the
+# cooldowns are checked without the server. Announcements are signed with the
+# secret, and broadcasting is disabled if the secret isn't set.
+PEER_BROADCAST_ENABLED = True
+PEER_BROADCAST_SECRET = "{ENV/PEER_BROADCAST_SECRET}"
+
+# Multicast group and port used for announcing prints.
+PEER_BROADCAST_GROUP = "239.255.67.82"
+PEER_BROADCAST_PORT = 50682
+
+# Maximum seconds between sending and receiving an announcement before it is ignored.
+PEER_BROADCAST_MAX_AGE_SECONDS = 30.0
+
+# Maximum prints to log in one request in job mode. If the server doesn't support
+# logging multiple prints, up to the pipeline threads of requests are sent at once.
+PRINT_LOG_BATCH_SIZE = 25
+PRINT_LOG_PIPELINE_THREADS = 4
+
+# If true, the latency of exports, procedure steps, and requests is recorded to
+# rotating trace files. The maximum size of each file and the amount of older files to keep.
+TRACING_ENABLED = True
+TRACE_FILE_MAX_BYTES = 5 * 1024 * 1024
+TRACE_FILE_BACKUPS = 10
+
+# If true, the time spent importing modules and loading each plugin is logged
+# when Cura finishes starting, with the amount of slowest imports to include.
+STARTUP_PROFILE_ENABLED = True
+STARTUP_PROFILE_REPORT_SIZE = 10
+
+# If true, modules that are imported when first used (such as for the first export)
+# are imported in the background once Cura finishes starting.
+PRE_IMPORT_ENABLED = True
+
+# Seconds before a swipe prompt (such as for authenticating a lab manager) is
+# cancelled if no id is accepted. If 0, prompts are open until cancelled or unfocused.
+SWIPE_PROMPT_TIMEOUT_SECONDS = 0.0
+
+# If true, registered emails are stored in a local index that is synced from the server
+# so registrations are checked without the server, such as during outages.
+USER_INDEX_ENABLED = True
+
+# Seconds between fetching the registrations changed on the server.
+USER_INDEX_SYNC_SECONDS = 300.0
+
+# Maximum seconds since the index was synced, or a registration was confirmed by the server,
+# for the index to be used without the server. Older registrations are checked with the server.
+USER_INDEX_MAX_STALENESS_SECONDS = 7 * 24 * 60 * 60.0
+
+# Maximum usernames of the known users suggested while typing an email.
+EMAIL_COMPLETION_SIZE = 8
+
+# If true, a connection to the server is opened when slicing finishes or a removable drive is
+# added, so the first request of an export doesn't wait to resolve the server and connect.
+CONNECTION_WARMING_ENABLED = True
+
+# Seconds the server keeps idle connections open. The pings that keep a warmed connection
+# open are sent shortly before the server would close it.
+SERVER_KEEP_ALIVE_SECONDS = 5.0
+
+# Maximum pings sent each time the connection is warmed, including the one that opens it.
+# The connection is kept open for about this many keep-alive periods of the server.
+CONNECTION_WARM_MAX_PINGS = 4
+
+# Seconds the resolved address of the server is reused. If 0, the server is resolved for each connection.
+DNS_CACHE_SECONDS = 60.0
+
+
+
+# Store the defaults before anything else is defined.
+defaults = {name: value for name, value in globals().items() if name.isupper()}
+
 import json
 import os
+import re
 import sys
-bindings = {}
+import tempfile
+import threading
+from types import MappingProxyType, ModuleType
+from typing import Any, Dict, List, Optional
+
+# Remove the values from the module so they are read from the current snapshot.
+for name in defaults.keys():
+    del globals()[name]
+del name
+
+
+def getDataPath(name: str) -> str:
+    """Returns the path of a file the plugins write while running. The files are stored in
+    Cura's data directory instead of with the plugins, or in the temporary directory of the
+    system when running outside of Cura.
+
+    :param name: Name of the file or directory.
+    """
+
+    try:
+        from UM.Resources import Resources
+        dataDirectory = Resources.getDataStoragePath()
+    except ImportError:
+        dataDirectory = tempfile.gettempdir()
+    return os.path.join(dataDirectory, "ConstructRIT", name)
+
+
+# Files the configuration is loaded from. The environment file contains the bindings
+# for "{ENV/...}" values, the remote file contains the last configuration fetched from
+# the server, and the override file contains local replacements for the defaults.
 environmentFile = os.path.realpath(os.path.join(__file__, "..", "..", "environment.json"))
-if os.path.exists(environmentFile):
-    with open(environmentFile) as file:
-        bindings = json.loads(file.read())
-
-# Replace the configuration bindings.
-module = sys.modules[__name__]
-for attribute in dir(module):
-    if not attribute.startswith("__") and isinstance(getattr(module, attribute), str):
-        for binding in bindings.keys():
-            setattr(module, attribute, getattr(module, attribute).replace("{ENV/" + binding + "}", bindings[binding]))
+remoteFile = getDataPath("remoteConfiguration.json")
+overrideFile = os.path.realpath(os.path.join(__file__, "..", "..", "configuration.json"))
+
+# Values that can't be replaced by the configuration fetched from the server.
+localOnlyNames = ["SERVER_HOST", "REMOTE_CONFIGURATION_ENABLED", "PEER_BROADCAST_SECRET"]
+bindingPattern = re.compile(r"\{ENV/([^}]*)\}")
+
+
+class ConfigurationSnapshot:
+    """Immutable snapshot of the configuration. Lists are stored as tuples and
+    dictionaries are stored as read-only mappings.
+    """
+
+    def __init__(self, values: Dict[str, Any]):
+        """Creates the snapshot.
+
+        :param values: Values of the configuration.
+        """
+
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Prevents changing the snapshot.
+        """
+
+        raise AttributeError("Configuration snapshots can't be changed.")
+
+    def __delattr__(self, name: str) -> None:
+        """Prevents changing the snapshot.
+        """
+
+        raise AttributeError("Configuration snapshots can't be changed.")
+
+    def getValues(self) -> Dict[str, Any]:
+        """Returns the values of the configuration.
+        """
+
+        return dict(self.__dict__)
+
+
+class ConfigurationModule(ModuleType):
+    """Module of the configuration. The values are read from the current snapshot, so
+    replacing the snapshot changes all of the values at once for every thread. Reading
+    a module value calls __getattr__, so frequently called code reads the values from
+    Configuration.current instead.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        """Returns a value of the current configuration.
+
+        :param name: Name of the value.
+        """
+
+        if name in defaults.keys() and current is not None:
+            return getattr(current, name)
+        raise AttributeError("module " + repr(self.__name__) + " has no attribute " + repr(name))
+
+
+def readJson(path: str) -> Dict:
+    """Reads a JSON file. Returns an empty dictionary if the file doesn't exist.
+
+    :param path: Path of the file to read.
+    """
+
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.loads(file.read())
+
+
+def convertValue(name: str, value: Any, bindings: Dict[str, str]) -> Any:
+    """Returns a configuration value with the bindings resolved and the lists and dictionaries made read-only.
+    Raises a TypeError if the value's type doesn't match the default's type.
+
+    :param name: Name of the configuration value.
+    :param value: Value to convert.
+    :param bindings: Bindings to replace in strings.
+    """
+
+    # Check the type against the default.
+    default = defaults[name]
+    if isinstance(default, bool) or not isinstance(default, (int, float)):
+        validType = isinstance(value, type(default)) or (isinstance(default, list) and isinstance(value, tuple))
+    else:
+        validType = isinstance(value, (int, float)) and not isinstance(value, bool)
+    if not validType:
+        raise TypeError("Configuration value " + name + " must be a " + type(default).__name__ + ".")
+
+    # Convert the value.
+    return freezeValue(value, bindings)
+
+
+def freezeValue(value: Any, bindings: Dict[str, str]) -> Any:
+    """Returns a value with the bindings resolved and the lists and dictionaries made read-only.
+
+    :param value: Value to convert.
+    :param bindings: Bindings to replace in strings.
+    """
+
+    if isinstance(value, str):
+        return bindingPattern.sub(lambda match: bindings.get(match.group(1), match.group(0)), value)
+    if isinstance(value, (list, tuple)):
+        return tuple(freezeValue(entry, bindings) for entry in value)
+    if isinstance(value, dict):
+        return MappingProxyType({key: freezeValue(entry, bindings) for key, entry in value.items()})
+    return value
+
+
+def loadSnapshot() -> ConfigurationSnapshot:
+    """Loads a snapshot of the configuration from the defaults and configuration files.
+    """
+
+    # Read the bindings and create the defaults.
+    bindings = readJson(environmentFile)
+    values = {}
+    for name in defaults.keys():
+        values[name] = convertValue(name, defaults[name], bindings)
+
+    # Add the configuration fetched from the server. Invalid values are ignored so
+    # a bad configuration from the server can't prevent loading.
+    try:
+        remoteValues = readJson(remoteFile).get("configuration") or {}
+    except (OSError, ValueError):
+        remoteValues = {}
+    for name, value in remoteValues.items():
+        if name in defaults.keys() and name not in localOnlyNames:
+            try:
+                values[name] = convertValue(name, value, bindings)
+            except TypeError:
+                pass
+
+    # Add the local overrides.
+    for name, value in readJson(overrideFile).items():
+        if name in defaults.keys():
+            values[name] = convertValue(name, value, bindings)
+
+    # Return the snapshot.
+    return ConfigurationSnapshot(values)
+
+
+# Current snapshot of the configuration.
+current = None
+lastReloadError = None
+reloadLock = threading.Lock()
+watcher = None
+
+
+def applySnapshot(snapshot: ConfigurationSnapshot) -> None:
+    """Sets the current configuration. The module values are read from the snapshot, so
+    they change at once. Code that reads multiple values that must be consistent with each
+    other should still read them from the same snapshot (Configuration.current).
+
+    :param snapshot: Snapshot to use.
+    """
+
+    global current
+    current = snapshot
+
+
+def reload() -> bool:
+    """Reloads the configuration files. If loading fails, the current configuration is kept.
+
+    :return: Whether the configuration was reloaded.
+    """
+
+    global lastReloadError
+    with reloadLock:
+        try:
+            snapshot = loadSnapshot()
+        except (OSError, ValueError, TypeError) as error:
+            lastReloadError = error
+            return False
+        lastReloadError = None
+        applySnapshot(snapshot)
+        return True
+
+
+def startWatching(paths: Optional[List[str]] = None) -> None:
+    """Starts reloading the configuration when the configuration files change.
+
+    :param paths: Additional files to watch.
+    """
+
+    global watcher
+    from .Util.FileWatcher import FileWatcher
+    if watcher is None:
+        watcher = FileWatcher([environmentFile, overrideFile] + (paths or []), reload, current.CONFIGURATION_WATCH_INTERVAL_SECONDS)
+        watcher.start()
+
+
+# Read the module values from the current snapshot and load the initial configuration.
+sys.modules[__name__].__class__ = ConfigurationModule
+if not reload():
+    raise lastReloadError
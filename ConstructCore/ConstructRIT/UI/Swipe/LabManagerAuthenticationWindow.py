@@ -1,25 +1,25 @@
 """
 Zachary Cook
 
-Swipe window used to authenticate lab managers.
+Swipe request used to authenticate lab managers.
 """
 
 import threading
 import time
 from PyQt5 import QtWidgets,QtCore
-from .SwipeWindow import SwipeWindow
+from .SwipePrompt import SwipeRequest
 from ...Util import Http
 
 
 
-class LabManagerAuthenticationWindow(SwipeWindow):
-    """Window for authenticating lab manager ids.
+class LabManagerAuthenticationWindow(SwipeRequest):
+    """Swipe request for authenticating lab manager ids.
     """
 
     onAuthenticated = QtCore.pyqtSignal()
 
     def __init__(self):
-        """Creates the lab manager authentication window.
+        """Creates the lab manager authentication request and shows the swipe prompt.
         """
 
         super().__init__("Authenticate")
@@ -50,8 +50,8 @@ class LabManagerAuthenticationWindow(SwipeWindow):
             self.setLabelText("Authorization accepted.")
             self.cancelled = True
             time.sleep(0.5)
-            self.closeThreaded()
             self.onAuthenticated.emit()
+            self.closeThreaded()
         else:
             self.setLabelText("Authorization failed.")
             self.buffer.unlock()
@@ -69,7 +69,7 @@ if __name__ == '__main__':
     # Create an app.
     app = QtWidgets.QApplication([])
 
-    # Create a window.
+    # Create a request.
     swipeWindow = LabManagerAuthenticationWindow()
 
     # Connect the test events.
@@ -0,0 +1,403 @@
+"""
+Zachary Cook
+
+Prompt for swiping or entering university ids. The prompt is built once and
+shown for each swipe request instead of creating a window for each request.
+"""
+
+import re
+import threading
+from typing import Optional
+from PyQt5 import QtWidgets,QtCore
+from ..ThreadedMainWindow import ThreadedMainWindow, ThreadedOperation
+from ... import Configuration
+
+
+# Text of the labels when a mode is shown.
+SWIPE_MODE_TEXT = "Swipe your university id."
+MANUAL_MODE_TEXT = "Enter your university id."
+
+
+class LockableBuffer:
+    """Lockable buffer class for storing the key presses.
+    Can be locked to ignore presses
+    """
+
+    def __init__(self, maxSize: int):
+        """Creates a Lockable Buffer object.
+
+        :param maxSize: Maximum size of the buffer.
+        """
+
+        self.maxSize = maxSize
+        self.buffer = []
+        self.locked = False
+
+    def append(self, string: str) -> None:
+        """Adds a new character or string to the buffer.
+
+        :param string: String to add to the buffer.
+        """
+
+        # Add the string if the buffer is not locked.
+        if not self.locked:
+            self.buffer.append(string)
+
+        # Remove the first string if it is too long.
+        if len(self.buffer) > self.maxSize:
+            self.buffer.pop(0)
+
+    def lock(self) -> None:
+        """Locks the buffer.
+        """
+
+        self.locked = True
+
+    def unlock(self) -> None:
+        """Unlocks the buffer.
+        """
+
+        self.locked = False
+
+    def clear(self) -> None:
+        """Clears the buffer.
+        """
+
+        self.buffer = []
+
+    def isLocked(self) -> bool:
+        """Returns if the buffer is locked.
+        """
+
+        return self.locked
+
+    def getBufferString(self) -> str:
+        """Returns the buffer concatenated a string.
+        """
+
+        # Create the string.
+        finalString = ""
+        for string in self.buffer:
+            finalString += string
+
+        # Return the string.
+        return finalString
+
+
+class SwipeRequest(QtCore.QObject):
+    """Request for a university id. Creating the request shows the swipe prompt
+    for it, and subclasses handle the ids entered.
+    """
+
+    onIdEntered = QtCore.pyqtSignal(str)
+    onCancelled = QtCore.pyqtSignal()
+
+    def __init__(self, title: str, timeout: Optional[float] = None):
+        """Creates the request and shows the swipe prompt for it. Must be called from the main thread.
+
+        :param title: Title of the prompt.
+        :param timeout: Seconds before the request is cancelled. If None, the configured timeout is used.
+        """
+
+        super().__init__()
+
+        # Store the request properties.
+        self.title = title
+        self.timeout = Configuration.SWIPE_PROMPT_TIMEOUT_SECONDS if timeout is None else timeout
+        self.buffer = LockableBuffer(16)
+        self.cancelled = False
+
+        # Show the prompt.
+        getSwipePrompt().open(self)
+
+    def setLabelText(self, text: str) -> None:
+        """Sets the label text of the prompt if it is still showing the request.
+
+        :param text: Message to set for the text.
+        """
+
+        getSwipePrompt().setRequestLabelText(self, text)
+
+    def closeThreaded(self) -> None:
+        """Closes the prompt if it is still showing the request. The request is
+        cancelled unless it was marked as cancelled before closing.
+        """
+
+        prompt = getSwipePrompt()
+        prompt.runThreadedOperation(prompt.closeRequest, self)
+
+
+class SwipePrompt(ThreadedMainWindow):
+    """Window for swiping or entering university ids for the current request.
+    """
+
+    def __init__(self, initialSizeX: int = 300, initialSizeY: int = 40):
+        """Creates the prompt without showing it.
+
+        :param initialSizeX: Initial width of the window.
+        :param initialSizeY: Initial height of the window.
+        """
+
+        super().__init__()
+        self.request = None
+        self.manualMode = False
+
+        # Set the window properties.
+        screenSize = QtWidgets.QDesktopWidget().screenGeometry(-1)
+        self.setGeometry(int((screenSize.width() - initialSizeX)/2), int((screenSize.height() - initialSizeY)/2), initialSizeX, initialSizeY)
+        self.setWindowFlags(QtCore.Qt.WindowStaysOnTopHint)
+
+        # Create the pages of the modes.
+        self.pages = QtWidgets.QStackedWidget()
+        self.setCentralWidget(self.pages)
+        self.pages.focusOutEvent = self.focusOutEvent
+        self.initializeSwipePage()
+        self.initializeManualPage()
+
+        # Create the timers for closing the prompt after the focus is lost and after the request times out.
+        self.focusLostTimer = QtCore.QTimer(self)
+        self.focusLostTimer.setSingleShot(True)
+        self.focusLostTimer.setInterval(250)
+        self.focusLostTimer.timeout.connect(self.focusLost)
+        self.timeoutTimer = QtCore.QTimer(self)
+        self.timeoutTimer.setSingleShot(True)
+        self.timeoutTimer.timeout.connect(lambda: self.closeRequest(self.request))
+
+    def initializeSwipePage(self) -> None:
+        """Creates the page of the swipe mode.
+        """
+
+        # Create the layouts.
+        page = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout()
+        buttonLayout = QtWidgets.QHBoxLayout()
+
+        # Create the elements.
+        self.swipeLabel = QtWidgets.QLabel(SWIPE_MODE_TEXT)
+        self.swipeLabel.setStyleSheet("QLabel {font-weight: 700; font-size: 14px}")
+        self.swipeLabel.setAlignment(QtCore.Qt.AlignCenter)
+        manualModeButton = QtWidgets.QPushButton("Manually enter")
+        manualModeButton.setStyleSheet("QPushButton {font-size: 14px}")
+        manualModeButton.setFixedSize(120,26)
+
+        # Add the elements.
+        layout.addWidget(self.swipeLabel)
+        buttonLayout.addWidget(manualModeButton)
+        layout.addLayout(buttonLayout)
+        page.setLayout(layout)
+        self.pages.addWidget(page)
+
+        # Connect the events.
+        manualModeButton.clicked.connect(self.switchMode)
+
+    def initializeManualPage(self) -> None:
+        """Creates the page of the manual mode.
+        """
+
+        # Create the layouts.
+        page = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout()
+        inputLayout = QtWidgets.QHBoxLayout()
+        buttonLayout = QtWidgets.QHBoxLayout()
+
+        # Create the elements.
+        self.manualLabel = QtWidgets.QLabel(MANUAL_MODE_TEXT)
+        self.manualLabel.setStyleSheet("QLabel {font-weight: 700; font-size: 14px}")
+        self.manualLabel.setAlignment(QtCore.Qt.AlignCenter)
+        swipeModeButton = QtWidgets.QPushButton("Swipe Id")
+        swipeModeButton.setStyleSheet("QPushButton {font-size: 14px}")
+        swipeModeButton.setFixedSize(120,26)
+        self.inputText = QtWidgets.QLineEdit()
+        self.inputText.setStyleSheet("QLineEdit {font-size: 14px}")
+        enterButton = QtWidgets.QPushButton("Enter")
+        enterButton.setStyleSheet("QPushButton {font-size: 14px}")
+        enterButton.setFixedSize(80,26)
+
+        # Add the elements.
+        layout.addWidget(self.manualLabel)
+        buttonLayout.addWidget(swipeModeButton)
+        inputLayout.addWidget(self.inputText)
+        inputLayout.addWidget(enterButton)
+        layout.addLayout(inputLayout)
+        layout.addLayout(buttonLayout)
+        page.setLayout(layout)
+        self.pages.addWidget(page)
+
+        # Connect the events.
+        swipeModeButton.clicked.connect(self.switchMode)
+        enterButton.clicked.connect(lambda: self.handleUniversityId(self.inputText.text()))
+
+    def open(self, request: SwipeRequest) -> None:
+        """Shows the prompt for a request. The request being shown is cancelled.
+
+        :param request: Request to show the prompt for.
+        """
+
+        # Cancel the current request and target the new request.
+        self.closeRequest(self.request)
+        self.request = request
+        self.setWindowTitle(request.title)
+        self.showMode(False)
+        self.inputText.clear()
+        if request.timeout > 0:
+            self.timeoutTimer.start(int(request.timeout * 1000))
+
+        # Show the window.
+        self.raise_()
+        self.activateWindow()
+        self.show()
+        self.pages.setFocus()
+
+    def closeRequest(self, request: Optional[SwipeRequest]) -> None:
+        """Hides the prompt if it is showing a request. The request is cancelled
+        unless it was marked as cancelled before closing.
+
+        :param request: Request to close the prompt for.
+        """
+
+        # Return if the prompt was re-targeted.
+        if request is None or self.request is not request:
+            return
+
+        # Hide the prompt.
+        self.request = None
+        self.focusLostTimer.stop()
+        self.timeoutTimer.stop()
+        self.hide()
+
+        # Ignore ids swiped after closing, and invoke the cancelled event.
+        request.buffer.lock()
+        if not request.cancelled:
+            request.cancelled = True
+            request.onCancelled.emit()
+
+    def closeEvent(self, event) -> None:
+        """Handles the window being closed. The prompt is hidden to be reused instead of being closed.
+        """
+
+        event.ignore()
+        self.closeRequest(self.request)
+
+    def focusOutEvent(self, event) -> None:
+        """Handles the window being unfocused.
+        """
+
+        # Check the focus after a delay since focus is lost when changing modes.
+        if not self.manualMode and self.request is not None:
+            self.focusLostTimer.start()
+
+    def focusLost(self) -> None:
+        """Closes the prompt if the focus wasn't regained.
+        """
+
+        if not self.manualMode:
+            self.closeRequest(self.request)
+
+    def keyPressEvent(self, event) -> None:
+        """Handles a key press.
+        """
+
+        # Add the character if it has a valid byte code.
+        if self.request is not None and event.key() < 128:
+            buffer = self.request.buffer
+            buffer.append(chr(event.key()))
+
+            # Register the swipe if the id is complete.
+            bufferString = buffer.getBufferString()
+            if len(bufferString) == 16 and bufferString[0] == ";" and bufferString[10] == "=" and bufferString[15] == "?":
+                self.handleUniversityId(bufferString)
+
+    def showMode(self, manualMode: bool) -> None:
+        """Shows the page of a mode with the initial text.
+
+        :param manualMode: Whether to show the manual mode.
+        """
+
+        self.manualMode = manualMode
+        if manualMode:
+            self.manualLabel.setText(MANUAL_MODE_TEXT)
+            self.pages.setCurrentIndex(1)
+            self.inputText.setFocus()
+        else:
+            self.swipeLabel.setText(SWIPE_MODE_TEXT)
+            self.pages.setCurrentIndex(0)
+            self.pages.setFocus()
+
+    def switchMode(self) -> None:
+        """Switches the mode between swipe and manual.
+        """
+
+        self.showMode(not self.manualMode)
+
+    def handleUniversityId(self, idString: str) -> None:
+        """Processes a string as a university id.
+
+        :param idString: University id to process.
+        """
+
+        # Get the ids.
+        numbers = re.findall(r"\d+", idString)
+
+        # Emit the event if a valid number is found, or show an error.
+        if self.request is None:
+            return
+        if len(numbers) > 0 and len(numbers[0]) == 9:
+            self.request.onIdEntered.emit(numbers[0])
+        elif self.manualMode:
+            self.setLabelText("Id is not valid. Expected 9 digits.")
+
+    def setLabelText(self, text: str) -> None:
+        """Sets the label text of the current mode.
+
+        :param text: Message to set for the text.
+        """
+
+        (self.manualLabel if self.manualMode else self.swipeLabel).setText(text)
+
+    @ThreadedOperation
+    def setRequestLabelText(self, request: SwipeRequest, text: str) -> None:
+        """Sets the label text if the prompt is showing a request.
+
+        :param request: Request setting the text.
+        :param text: Message to set for the text.
+        """
+
+        if self.request is request:
+            self.setLabelText(text)
+
+
+# Prompt shared by the plugins.
+_swipePrompt = None
+_swipePromptLock = threading.Lock()
+
+
+def getSwipePrompt() -> SwipePrompt:
+    """Returns the prompt shared by the plugins, creating it if it doesn't exist.
+    Must be called from the main thread the first time.
+    """
+
+    global _swipePrompt
+    with _swipePromptLock:
+        if _swipePrompt is None:
+            _swipePrompt = SwipePrompt()
+        return _swipePrompt
+
+
+
+if __name__ == '__main__':
+    # Create an app.
+    app = QtWidgets.QApplication([])
+
+    # Create a request.
+    swipeRequest = SwipeRequest("Enter Id")
+
+    # Connect the test events.
+    def onEnter(id):
+        print("ID: " + id)
+    def onCancel():
+        print("CANCEL")
+    swipeRequest.onIdEntered.connect(onEnter)
+    swipeRequest.onCancelled.connect(onCancel)
+
+    # Run the app.
+    app.exec()
@@ -6,6 +6,7 @@ Extends QMainWindow to improve threading.
 
 from typing import Callable, Dict
 from PyQt5 import QtWidgets, QtCore
+from . import WindowRegistry
 
 
 class ThreadedMainWindow(QtWidgets.QMainWindow):
@@ -19,17 +20,18 @@ class ThreadedMainWindow(QtWidgets.QMainWindow):
         """
 
         super().__init__()
-        self.selfReference = self
+        WindowRegistry.getRegistry().register(self)
 
         # Connect the event.
         self.runThreadedOperationEvent.connect(self.performOperation)
 
-    def close(self) -> None:
-        """Closes the window in a thread.
+    def closeEvent(self, event) -> None:
+        """Handles the window being closed.
         """
 
-        self.selfReference = None
-        super().close()
+        # Release the window so it is deleted.
+        event.accept()
+        WindowRegistry.getRegistry().release(self)
 
     def closeThreaded(self) -> None:
         """Closes the window in a thread.
@@ -43,10 +45,17 @@ class ThreadedMainWindow(QtWidgets.QMainWindow):
         :param callback: Function to run in the main thread.
         """
 
-        self.runThreadedOperationEvent.emit({
-            "callback": callback,
-            "args": args,
-        })
+        # Ignore the operation if the window was closed, such as by a request finishing after it was cancelled.
+        if not WindowRegistry.getRegistry().isOpen(self):
+            return
+        try:
+            self.runThreadedOperationEvent.emit({
+                "callback": callback,
+                "args": args,
+            })
+        except RuntimeError:
+            # The window was deleted after it was checked.
+            pass
 
     def performOperation(self, dictionary: Dict) -> None:
         """Performs an operation.
@@ -0,0 +1,110 @@
+"""
+Zachary Cook
+
+Keeps the open windows alive and tears down closed windows so they
+and their widgets are freed.
+"""
+
+import threading
+import weakref
+from typing import List, Optional, Type
+from PyQt5 import QtCore
+
+
+class WindowRegistry:
+    """Registry of the windows created by the plugins. Open windows are referenced
+    strongly since Qt doesn't own top level windows created in Python. Closed windows
+    are disconnected, deleted by Qt, and only referenced weakly to find leaks.
+    """
+
+    def __init__(self):
+        """Creates the registry.
+        """
+
+        self.lock = threading.Lock()
+        self.openWindows = {}
+        self.releasedWindows = weakref.WeakSet()
+        self.releasedCount = 0
+
+    def register(self, window: QtCore.QObject) -> None:
+        """Keeps a window alive until it is released.
+
+        :param window: Window to register.
+        """
+
+        with self.lock:
+            self.openWindows[id(window)] = window
+
+    def release(self, window: QtCore.QObject) -> None:
+        """Disconnects the signals of a window, deletes it once the events
+        queued for it are handled, and stops keeping it alive.
+
+        :param window: Window to release.
+        """
+
+        with self.lock:
+            if self.openWindows.pop(id(window), None) is None:
+                return
+            self.releasedWindows.add(window)
+            self.releasedCount += 1
+        disconnectSignals(window)
+        window.deleteLater()
+
+    def isOpen(self, window: QtCore.QObject) -> bool:
+        """Returns if a window is registered and not released.
+
+        :param window: Window to check.
+        """
+
+        with self.lock:
+            return id(window) in self.openWindows
+
+    def getOpenWindows(self, windowType: Optional[Type] = None) -> List[QtCore.QObject]:
+        """Returns the open windows.
+
+        :param windowType: Type of the windows to return. If None, all the windows are returned.
+        """
+
+        with self.lock:
+            windows = list(self.openWindows.values())
+        return [window for window in windows if windowType is None or isinstance(window, windowType)]
+
+    def getLeakedWindows(self) -> List[QtCore.QObject]:
+        """Returns the released windows that are still referenced. Garbage
+        should be collected before checking.
+        """
+
+        with self.lock:
+            return list(self.releasedWindows)
+
+
+def disconnectSignals(qObject: QtCore.QObject) -> None:
+    """Disconnects every slot from the signals declared by the classes of an object.
+
+    :param qObject: Object to disconnect the signals of.
+    """
+
+    for objectType in type(qObject).__mro__:
+        for name, value in list(vars(objectType).items()):
+            if isinstance(value, QtCore.pyqtSignal):
+                try:
+                    getattr(qObject, name).disconnect()
+                except (TypeError, RuntimeError):
+                    # The signal has no connections or the object was already deleted.
+                    pass
+
+
+# Registry shared by the plugins.
+_registry = None
+_registryLock = threading.Lock()
+
+
+def getRegistry() -> WindowRegistry:
+    """Returns the registry shared by the plugins.
+    """
+
+    global _registry
+    with _registryLock:
+        if _registry is None:
+            _registry = WindowRegistry()
+        return _registry
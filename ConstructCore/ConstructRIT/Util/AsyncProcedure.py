@@ -5,8 +5,10 @@ Asynchronous steps for simplifying threaded operations.
 """
 
 import threading
+import time
 from typing import Callable, List, Optional
 from PyQt5 import QtCore
+from . import Tracing
 
 
 class QtAsyncWrapper(QtCore.QObject):
@@ -25,8 +27,22 @@ class QtAsyncWrapper(QtCore.QObject):
         super().__init__()
         self.function = function
 
+        # Move the wrapper to the main thread if it was created in another thread, such as by importing in the background.
+        application = QtCore.QCoreApplication.instance()
+        if application is not None and self.thread() is not application.thread():
+            self.moveToThread(application.thread())
+
         # Connect calling the function.
-        self.runSignal.connect(lambda args: self.function(*args["args"], **args["kwargs"]))
+        self.runSignal.connect(self.run)
+
+    def run(self, args: dict) -> None:
+        """Runs the wrapped function in the trace it was called from.
+
+        :param args: Arguments and trace of the call.
+        """
+
+        with Tracing.Span(Tracing.getFunctionName(self.function), args["traceContext"], queuedSeconds=time.perf_counter() - args["callTime"]):
+            self.function(*args["args"], **args["kwargs"])
 
     def call(self, *args, **kwargs) -> None:
         """Calls the wrapped function in the main Qt thread.
@@ -35,9 +51,26 @@ class QtAsyncWrapper(QtCore.QObject):
         self.runSignal.emit({
             "args": args,
             "kwargs": kwargs,
+            "traceContext": Tracing.getCurrentContext(),
+            "callTime": time.perf_counter(),
         })
 
 
+def runStep(traceContext: Optional[Tracing.TraceContext], function: Callable, *args, **kwargs) -> None:
+    """Runs a step of a procedure in a span of the procedure's trace. Steps that
+    run in the main thread are traced when they run instead of when they are queued.
+
+    :param traceContext: Context of the procedure's trace.
+    :param function: Step to run.
+    """
+
+    if isinstance(getattr(function, "__self__", None), QtAsyncWrapper):
+        with Tracing.useContext(traceContext):
+            function(*args, **kwargs)
+    else:
+        Tracing.runInContext(traceContext, Tracing.getFunctionName(function), function, *args, **kwargs)
+
+
 class AsyncProcedureContext:
     """Context for an individual ryn of an async procedure.
     """
@@ -50,13 +83,14 @@ class AsyncProcedureContext:
 
         self.functions = functions
         self.selfArgument = None
+        self.traceContext = None
 
     def next(self, *args, **kwargs) -> None:
         """Calls the next step of the procedure.
         """
 
         function = self.functions.pop(0)
-        threading.Thread(target=function, args=[self.selfArgument, self, *args], kwargs=kwargs).start()
+        threading.Thread(target=runStep, args=[self.traceContext, function, self.selfArgument, self, *args], kwargs=kwargs).start()
 
     def end(self, *args, **kwargs) -> None:
         """Calls the next step of the procedure without the context argument.
@@ -64,7 +98,15 @@ class AsyncProcedureContext:
         """
 
         function = self.functions.pop(0)
-        threading.Thread(target=function, args=[self.selfArgument, *args], kwargs=kwargs).start()
+        threading.Thread(target=runStep, args=[self.traceContext, function, self.selfArgument, *args], kwargs=kwargs).start()
+
+    def endInline(self, *args, **kwargs) -> None:
+        """Calls the next step of the procedure without the context argument in the current thread.
+        Intended for calling steps in the order they are ended, such as main thread steps from one worker.
+        """
+
+        function = self.functions.pop(0)
+        runStep(self.traceContext, function, self.selfArgument, *args, **kwargs)
 
 
 def AsyncProcedure(function: Optional[Callable] = None) -> Callable:
@@ -84,9 +126,10 @@ def AsyncProcedure(function: Optional[Callable] = None) -> Callable:
         :param self: Reference to self of the object containing the procedure function.
         """
 
-        # Create the procedure context.
+        # Create the procedure context. The steps are traced in the current trace, or in a new trace for the procedure.
         context = AsyncProcedureContext(asyncProcedureWrapper.getFunctions())
         context.selfArgument = self
+        context.traceContext = Tracing.getCurrentContext() or Tracing.createContext(asyncProcedureWrapper.traceName)
 
         # Perform the next (first) step.
         context.next(*args, **kwargs)
@@ -133,8 +176,10 @@ def AsyncProcedure(function: Optional[Callable] = None) -> Callable:
 
     # Add the initial step.
     asyncProcedureWrapper.steps = []
+    asyncProcedureWrapper.traceName = "procedure"
     if function is not None:
         asyncProcedureWrapper.steps.append(function)
+        asyncProcedureWrapper.traceName = Tracing.getFunctionName(function)
 
     # Return the wrapper.
     return asyncProcedureWrapper
@@ -0,0 +1,275 @@
+"""
+Zachary Cook
+
+Compiled policy for printers and materials that don't require authorization.
+"""
+
+import datetime
+import fnmatch
+import re
+from .. import Configuration
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Maximum amount of cached lookups before the cache is cleared.
+MAX_CACHED_LOOKUPS = 4096
+
+
+class NameMatcher:
+    """Matches names against exact names, glob patterns, and regular expressions.
+    Exact names are stored in a set and all patterns are compiled into a single expression.
+    """
+
+    def __init__(self, names: Optional[List[str]]):
+        """Creates the name matcher.
+
+        :param names: Names or patterns to match. If None, all names are matched.
+        """
+
+        self.matchesAll = names is None
+        self.exactNames = set()
+        self.hasPatterns = False
+
+        # Split the exact names and the patterns.
+        patterns = []
+        for name in names or []:
+            if name.startswith("re:"):
+                patterns.append("(?:" + name[3:] + r")\Z")
+            elif any(character in name for character in "*?["):
+                patterns.append(fnmatch.translate(name))
+            else:
+                self.exactNames.add(name)
+
+        # Compile the patterns into a single expression.
+        self.pattern = None
+        if len(patterns) > 0:
+            self.hasPatterns = True
+            self.pattern = re.compile("|".join(patterns))
+
+    def matches(self, name: Optional[str]) -> bool:
+        """Returns if a name is matched.
+
+        :param name: Name to check.
+        """
+
+        if self.matchesAll:
+            return True
+        if name is None:
+            return False
+        if name in self.exactNames:
+            return True
+        return self.pattern is not None and self.pattern.match(name) is not None
+
+
+class Schedule:
+    """Days and hours that a rule applies to. If the start hour is after the end hour,
+    the schedule crosses midnight and the hours after midnight belong to the day before.
+    """
+
+    def __init__(self, days: Optional[List[int]], startHour: float, endHour: float):
+        """Creates the schedule.
+
+        :param days: Days of the week (0 is Monday) the schedule applies to. If None, all days apply.
+        :param startHour: Hour the schedule starts.
+        :param endHour: Hour the schedule ends. If before the start hour, the hour on the next day.
+        """
+
+        self.days = None if days is None else frozenset(days)
+        self.startHour = startHour
+        self.endHour = endHour
+
+    def isActive(self, time: datetime.datetime) -> bool:
+        """Returns if the schedule is active at a given time.
+
+        :param time: Time to check.
+        """
+
+        # Return if the hour is in the schedule on the same day.
+        hour = time.hour + (time.minute / 60.0)
+        weekday = time.weekday()
+        if self.startHour <= self.endHour:
+            return (self.days is None or weekday in self.days) and self.startHour <= hour < self.endHour
+
+        # Return if the hour is before midnight on a scheduled day, or after midnight following a scheduled day.
+        if hour >= self.startHour:
+            return self.days is None or weekday in self.days
+        if hour < self.endHour:
+            return self.days is None or (weekday - 1) % 7 in self.days
+        return False
+
+
+class CompiledRule:
+    """Rule for authorizing printers or materials.
+    """
+
+    def __init__(self, rule: Dict):
+        """Creates the compiled rule.
+
+        :param rule: Configured rule to compile.
+        """
+
+        self.printers = NameMatcher(rule.get("printers"))
+        self.materials = None if rule.get("materials") is None else NameMatcher(rule["materials"])
+        self.schedule = None
+        if "days" in rule.keys() or "startHour" in rule.keys() or "endHour" in rule.keys():
+            self.schedule = Schedule(rule.get("days"), rule.get("startHour", 0), rule.get("endHour", 24))
+
+    def isActive(self, time: Optional[datetime.datetime]) -> bool:
+        """Returns if the rule is active at a given time.
+
+        :param time: Time to check. If None, the current time is used.
+        """
+
+        if self.schedule is None:
+            return True
+        return self.schedule.isActive(time or datetime.datetime.now())
+
+
+class AuthorizationPolicy:
+    """Policy for printers and materials that don't require authorization.
+    Rules are compiled once into hashed lookups so that the common case is a set lookup,
+    and the rules that apply to a name are cached after the first lookup.
+    """
+
+    def __init__(self, printers: List[str], materials: List[str], rules: List[Dict]):
+        """Creates the policy.
+
+        :param printers: Printer names that are always authorized.
+        :param materials: Material names that are always authorized.
+        :param rules: Additional rules to compile.
+        """
+
+        self.authorizedPrinters = set()
+        self.authorizedMaterials = set()
+        self.authorizedPairs = set()
+        self.printerIndex = {}
+        self.printerPatternRules = []
+        self.materialIndex = {}
+        self.materialPatternRules = []
+        self.cache = {}
+
+        # Add the always authorized names as rules so that patterns are supported.
+        allRules = [{"printers": [printer]} for printer in printers]
+        allRules += [{"materials": [material]} for material in materials]
+        allRules += rules
+
+        # Compile and index the rules.
+        for rule in allRules:
+            compiledRule = CompiledRule(rule)
+            if compiledRule.materials is None:
+                self._addPrinterRule(compiledRule)
+            else:
+                self._addMaterialRule(compiledRule)
+
+    def _addPrinterRule(self, rule: CompiledRule) -> None:
+        """Indexes a rule that authorizes printers.
+
+        :param rule: Rule to index.
+        """
+
+        # Store unconditional exact names directly.
+        if rule.schedule is None and not rule.printers.matchesAll:
+            self.authorizedPrinters.update(rule.printers.exactNames)
+        else:
+            for printer in rule.printers.exactNames:
+                self.printerIndex.setdefault(printer, []).append(rule)
+
+        # Store the rule to be checked against names if it has patterns.
+        if rule.printers.hasPatterns or rule.printers.matchesAll:
+            self.printerPatternRules.append(rule)
+
+    def _addMaterialRule(self, rule: CompiledRule) -> None:
+        """Indexes a rule that authorizes materials.
+
+        :param rule: Rule to index.
+        """
+
+        # Store unconditional exact names and pairs directly.
+        printersExact = not rule.printers.matchesAll and not rule.printers.hasPatterns
+        if rule.schedule is None and rule.printers.matchesAll:
+            self.authorizedMaterials.update(rule.materials.exactNames)
+        elif rule.schedule is None and printersExact:
+            for printer in rule.printers.exactNames:
+                for material in rule.materials.exactNames:
+                    self.authorizedPairs.add((printer, material))
+        else:
+            for material in rule.materials.exactNames:
+                self.materialIndex.setdefault(material, []).append(rule)
+
+        # Store the rule to be checked against names if it has patterns.
+        if rule.materials.hasPatterns:
+            self.materialPatternRules.append(rule)
+
+    def _getCachedRules(self, key: Tuple, getRules: Callable[[], List[CompiledRule]]) -> List[CompiledRule]:
+        """Returns the rules that apply to a lookup, using the cached rules if they were already determined.
+
+        :param key: Key of the lookup.
+        :param getRules: Function that returns the rules that apply if they weren't already determined.
+        """
+
+        # Return the cached rules.
+        cachedRules = self.cache.get(key)
+        if cachedRules is not None:
+            return cachedRules
+
+        # Determine and cache the rules.
+        if len(self.cache) >= MAX_CACHED_LOOKUPS:
+            self.cache.clear()
+        cachedRules = getRules()
+        self.cache[key] = cachedRules
+        return cachedRules
+
+    def isPrinterAuthorized(self, printer: Optional[str], time: Optional[datetime.datetime] = None) -> bool:
+        """Returns if a printer doesn't require authorization.
+
+        :param printer: Name of the printer.
+        :param time: Time to check the rules at. If None, the current time is used.
+        """
+
+        # Return if the printer is always authorized.
+        if printer in self.authorizedPrinters:
+            return True
+
+        # Return if any rule for the printer is active.
+        rules = self._getCachedRules(("printer", printer), lambda: self.printerIndex.get(printer, []) + [rule for rule in self.printerPatternRules if rule.printers.matches(printer)])
+        for rule in rules:
+            if rule.isActive(time):
+                return True
+        return False
+
+    def isMaterialAuthorized(self, material: Optional[str], printer: Optional[str] = None, time: Optional[datetime.datetime] = None) -> bool:
+        """Returns if a material doesn't require authorization.
+
+        :param material: Name of the material.
+        :param printer: Name of the printer the material is used on.
+        :param time: Time to check the rules at. If None, the current time is used.
+        """
+
+        # Return if the material is always authorized.
+        if material in self.authorizedMaterials or (printer, material) in self.authorizedPairs:
+            return True
+
+        # Return if any rule for the material and printer is active.
+        rules = self._getCachedRules(("material", printer, material), lambda: [rule for rule in self.materialIndex.get(material, []) + self.materialPatternRules if rule.materials.matches(material) and rule.printers.matches(printer)])
+        for rule in rules:
+            if rule.isActive(time):
+                return True
+        return False
+
+
+# Policy compiled from the configuration and the configuration it was compiled from.
+_policy = None
+_policyConfiguration = None
+
+
+def getPolicy() -> AuthorizationPolicy:
+    """Returns the policy compiled from the configuration. The policy is
+    compiled again if the configuration was reloaded.
+    """
+
+    global _policy, _policyConfiguration
+    configuration = Configuration.current
+    if _policy is None or _policyConfiguration is not configuration:
+        _policy = AuthorizationPolicy(configuration.AUTO_AUTHORIZED_PRINTERS, configuration.AUTO_AUTHORIZED_MATERIALS, configuration.AUTHORIZATION_RULES)
+        _policyConfiguration = configuration
+    return _policy
@@ -0,0 +1,220 @@
+"""
+Zachary Cook
+
+Logs the prints of a single user in batches, such as for job mode.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .. import Configuration
+from . import Http
+from typing import Dict, List, Optional
+
+
+class BatchPrintLogger:
+    """Logs the prints of a single user in batches. The hashed id of the user is found once,
+    and the prints are sent in one request, or in pipelined requests if the server doesn't
+    support logging multiple prints. Whether each print was logged is stored by record id.
+    """
+
+    def __init__(self, email: str, hashedId: Optional[str] = None, batchSize: Optional[int] = None, pipelineThreads: Optional[int] = None):
+        """Creates the batch print logger.
+
+        :param email: Email of the user logging the prints.
+        :param hashedId: Hashed university id of the user. If None, it is found from the email when first needed.
+        :param batchSize: Maximum prints to send in one request. If None, the configured batch size is used.
+        :param pipelineThreads: Requests to send at once if the server doesn't support logging multiple prints.
+        """
+
+        self.email = email
+        self.hashedId = hashedId
+        self.batchSize = batchSize or Configuration.PRINT_LOG_BATCH_SIZE
+        self.pipelineThreads = pipelineThreads or Configuration.PRINT_LOG_PIPELINE_THREADS
+        self.lock = threading.RLock()
+        self.sessions = []
+        self.session = self._createSession()
+        self.threadSessions = threading.local()
+        self.executor = None
+        self.supportsBulk = True
+        self.nextRecordId = 0
+        self.pendingRecords = []
+        self.acknowledgements = {}
+        self.requestsSent = 0
+
+    def getHashedId(self) -> Optional[str]:
+        """Returns the hashed university id of the user.
+        """
+
+        # Find the hashed id without holding the lock, since it is a request to the server.
+        with self.lock:
+            if self.hashedId is not None:
+                return self.hashedId
+        hashedId = Http.getUniversityIdHash(self.email)
+        with self.lock:
+            self.requestsSent += 1
+            if self.hashedId is None:
+                self.hashedId = hashedId
+            return self.hashedId
+
+    def addPrint(self, fileName: str, materialType: str, printWeight: float, printPurpose: str, msdNumber: Optional[str], paymentOwed: bool) -> int:
+        """Adds a print to log. The print is sent when the pending prints are flushed.
+
+        :param fileName: Name of the file that was exported.
+        :param materialType: Type of the material being used.
+        :param printWeight: Weight of the print being exported.
+        :param printPurpose: Purpose of the print being exported.
+        :param msdNumber: MSD Number of the print being exported.
+        :param paymentOwed: Whether the payment is owed or not.
+        :return: The id of the record for getting the acknowledgement.
+        """
+
+        with self.lock:
+            recordId = self.nextRecordId
+            self.nextRecordId += 1
+            self.pendingRecords.append((recordId, (fileName, materialType, printWeight, printPurpose, msdNumber, paymentOwed)))
+            return recordId
+
+    def getAcknowledgement(self, recordId: int) -> Optional[bool]:
+        """Returns if a print was logged, or None if it hasn't been sent.
+
+        :param recordId: Id of the record.
+        """
+
+        with self.lock:
+            return self.acknowledgements.get(recordId)
+
+    def getPendingCount(self) -> int:
+        """Returns the amount of prints that haven't been sent.
+        """
+
+        with self.lock:
+            return len(self.pendingRecords)
+
+    def cancelPending(self, recordIds: List[int]) -> None:
+        """Removes prints that haven't been sent and marks them as not logged.
+
+        :param recordIds: Ids of the records to remove.
+        """
+
+        with self.lock:
+            recordIds = set(recordIds)
+            self.pendingRecords = [record for record in self.pendingRecords if record[0] not in recordIds]
+            for recordId in recordIds:
+                self.acknowledgements.setdefault(recordId, False)
+
+    def flush(self) -> Dict[int, bool]:
+        """Sends the pending prints. If sending fails, the prints that weren't sent stay
+        pending and the error is raised. The lock isn't held while sending, so prints
+        can be added and acknowledgements read during the requests.
+
+        :return: Whether each sent print was logged by record id.
+        """
+
+        results = {}
+        while True:
+            # Take the next batch of pending prints.
+            with self.lock:
+                batch = self.pendingRecords[0:self.batchSize]
+                del self.pendingRecords[0:len(batch)]
+            if len(batch) == 0:
+                return results
+
+            # Send the batch, marking the prints as not logged if the user doesn't exist.
+            batchResults = [None] * len(batch)
+            error = None
+            try:
+                hashedId = self.getHashedId()
+                if hashedId is None:
+                    batchResults = [False] * len(batch)
+                else:
+                    error = self._sendRecords([Http.createPrintRecord(hashedId, *printArguments) for _, printArguments in batch], batchResults)
+            except Exception as sendError:
+                error = sendError
+
+            # Store the results of the sent prints. The prints that weren't sent are pending
+            # again, unless they were cancelled while sending.
+            with self.lock:
+                unsentRecords = []
+                for record, logged in zip(batch, batchResults):
+                    if logged is None:
+                        if record[0] not in self.acknowledgements.keys():
+                            unsentRecords.append(record)
+                    else:
+                        self.acknowledgements[record[0]] = logged
+                        results[record[0]] = logged
+                self.pendingRecords[0:0] = unsentRecords
+            if error is not None:
+                raise error
+
+    def _sendRecords(self, records: List[Dict], results: List[Optional[bool]]) -> Optional[Exception]:
+        """Sends prints in one request, or in pipelined requests if the server doesn't support logging multiple prints.
+
+        :param records: Payloads of the prints.
+        :param results: List to store whether each print was logged in. Prints that weren't sent are left as None.
+        :return: The first error sending the prints, if any.
+        """
+
+        # Send the prints in one request.
+        if self.supportsBulk:
+            with self.lock:
+                self.requestsSent += 1
+            bulkResults = Http.LogPrints(records, self.session)
+            if bulkResults is not None:
+                results[:] = bulkResults
+                return None
+            self.supportsBulk = False
+
+        # Send the prints in pipelined requests. The threads are kept so their sessions reuse the connections.
+        with self.lock:
+            self.requestsSent += len(records)
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.pipelineThreads)
+            executor = self.executor
+        futures = [executor.submit(self._sendRecord, record) for record in records]
+
+        # Store the result of each print, since other prints may have been logged when one fails.
+        error = None
+        for index, future in enumerate(futures):
+            try:
+                results[index] = future.result()
+            except Exception as sendError:
+                error = error or sendError
+        return error
+
+    def _sendRecord(self, record: Dict) -> bool:
+        """Sends a print with a session for the current thread.
+
+        :param record: Payload of the print.
+        :return: Whether the print was logged.
+        """
+
+        session = getattr(self.threadSessions, "session", None)
+        if session is None:
+            session = self._createSession()
+            self.threadSessions.session = session
+        return Http.LogPrintRecord(record, session)
+
+    def _createSession(self):
+        """Creates a session that uses the cached address of the server and keeps the
+        connections open, and stores it to be closed.
+        """
+
+        from . import HttpSession
+        session = HttpSession.createSession()
+        with self.lock:
+            self.sessions.append(session)
+        return session
+
+    def close(self) -> None:
+        """Stops the threads for pipelining and closes the connections of the sessions used to send the prints.
+        """
+
+        with self.lock:
+            executor = self.executor
+            sessions = self.sessions
+            self.executor = None
+            self.sessions = []
+        if executor is not None:
+            executor.shutdown(wait=False)
+        for session in sessions:
+            session.close()
@@ -0,0 +1,146 @@
+"""
+Zachary Cook
+
+Opens a connection to the server before an export is likely, such as when slicing
+finishes, so the first request of the export doesn't wait to connect.
+"""
+
+import threading
+import time
+from .. import Configuration
+from . import Http
+from typing import Callable
+
+
+# State of the backend when slicing finishes (UM.Backend.Backend.BackendState.Done).
+BACKEND_STATE_DONE = 3
+
+# Fraction of the server's keep-alive seconds between pings, so each ping is sent before the server closes the connection.
+PING_INTERVAL_FRACTION = 0.8
+
+
+def isRemovableDrive(outputDevice) -> bool:
+    """Returns if an output device is a removable drive. The class is checked by name since
+    it is defined by Cura's RemovableDriveOutputDevice plugin, which can't be imported.
+
+    :param outputDevice: Output device to check.
+    """
+
+    return type(outputDevice).__name__ == "RemovableDriveOutputDevice"
+
+
+class ConnectionWarmer:
+    """Opens a connection to the server in the shared session when warmed, and keeps it
+    open with pings until CONNECTION_WARM_MAX_PINGS are sent after the last time it was warmed.
+    """
+
+    def __init__(self, ping: Callable[[], None] = Http.ping, clock: Callable[[], float] = time.monotonic):
+        """Creates the connection warmer.
+
+        :param ping: Function that sends a request to the server with the shared session.
+        :param clock: Function that returns the current time in seconds.
+        """
+
+        self.ping = ping
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.pingsRemaining = 0
+        self.removableDriveIds = set()
+        self.lastPingTime = None
+        self.pingCount = 0
+        self.stopEvent = None
+        self.thread = None
+
+    def warm(self) -> None:
+        """Opens a connection to the server in the background if one isn't being kept
+        open, and keeps it open with up to CONNECTION_WARM_MAX_PINGS pings.
+        """
+
+        with self.lock:
+            self.pingsRemaining = Configuration.CONNECTION_WARM_MAX_PINGS
+            if self.thread is None:
+                self.stopEvent = threading.Event()
+                self.thread = threading.Thread(target=self._run, args=(self.stopEvent,), name="ConnectionWarmer", daemon=True)
+                self.thread.start()
+
+    def stop(self) -> None:
+        """Stops keeping the connection open.
+        """
+
+        with self.lock:
+            if self.stopEvent is not None:
+                self.stopEvent.set()
+            self.thread = None
+            self.lastPingTime = None
+
+    def onBackendStateChanged(self, state) -> None:
+        """Warms the connection when slicing finishes.
+
+        :param state: New state of the backend.
+        """
+
+        if state == BACKEND_STATE_DONE:
+            self.warm()
+
+    def onOutputDevicesChanged(self, outputDeviceManager) -> None:
+        """Warms the connection when a removable drive is added. Removed drives and
+        other output devices don't warm the connection.
+
+        :param outputDeviceManager: Output device manager of Cura.
+        """
+
+        removableDriveIds = set(outputDevice.getId() for outputDevice in outputDeviceManager.getOutputDevices() if isRemovableDrive(outputDevice))
+        addedDriveIds = removableDriveIds - self.removableDriveIds
+        self.removableDriveIds = removableDriveIds
+        if len(addedDriveIds) > 0:
+            self.warm()
+
+    def getSecondsUntilPing(self) -> float:
+        """Returns the seconds until the next ping.
+        """
+
+        if self.lastPingTime is None:
+            return 0.0
+        return max(0.0, self.lastPingTime + Configuration.SERVER_KEEP_ALIVE_SECONDS * PING_INTERVAL_FRACTION - self.clock())
+
+    def _run(self, stopEvent: threading.Event) -> None:
+        """Pings the server until stopped or the pings of the last warm-up are sent.
+
+        :param stopEvent: Event that is set when the warmer is stopped.
+        """
+
+        while not stopEvent.wait(self.getSecondsUntilPing()):
+            # Stop if the pings of the last warm-up were sent.
+            with self.lock:
+                if self.pingsRemaining <= 0:
+                    if not stopEvent.is_set():
+                        self.thread = None
+                        self.lastPingTime = None
+                    return
+                self.pingsRemaining -= 1
+
+            # Ping the server.
+            self.lastPingTime = self.clock()
+            try:
+                self.ping()
+                self.pingCount += 1
+            except IOError:
+                # The export connects normally if the server can't be reached.
+                pass
+
+
+def createConnectionWarmer(app) -> ConnectionWarmer:
+    """Creates a connection warmer that is warmed when Cura finishes slicing and when
+    a removable drive is added.
+
+    :param app: Instance of the application.
+    """
+
+    # Warm the connection when slicing finishes and when a removable drive is added.
+    connectionWarmer = ConnectionWarmer()
+    backend = app.getBackend()
+    if backend is not None:
+        backend.backendStateChange.connect(connectionWarmer.onBackendStateChanged)
+    outputDeviceManager = app.getOutputDeviceManager()
+    outputDeviceManager.outputDevicesChanged.connect(lambda: connectionWarmer.onOutputDevicesChanged(outputDeviceManager))
+    return connectionWarmer
@@ -0,0 +1,194 @@
+"""
+Zachary Cook
+
+Local ledger of the recent prints of users for checking the print cooldown.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from .. import Configuration
+from . import Http
+from typing import Callable, Optional, Tuple
+
+
+def getCooldownSeconds(weight: Optional[float], configuration: Optional[Configuration.ConfigurationSnapshot] = None) -> float:
+    """Returns the seconds a user must wait after a print before printing again.
+
+    :param weight: Weight of the print in grams.
+    :param configuration: Configuration to read the cooldown from. If None, the current configuration is used.
+    """
+
+    if weight is None or weight <= 0:
+        return 0.0
+    configuration = configuration or Configuration.current
+    return ((math.log(weight) * configuration.PRINT_COOLDOWN_MINUTES_PER_LOG_GRAM) + configuration.PRINT_COOLDOWN_BASE_MINUTES) * 60
+
+
+def getUserKey(email: str) -> str:
+    """Returns the key of a user in the ledger. Emails are hashed so they
+    are not stored in memory or sent to other kiosks.
+
+    :param email: Email of the user.
+    """
+
+    return Http.hashId(email.strip().lower())
+
+
+class CooldownLedger:
+    """Ledger of the last prints of users. Prints logged by the kiosk are recorded directly, and
+    the last print from the server is fetched only when a user isn't in the ledger. Users are
+    removed when their entries expire or when the ledger is full, least recently used first.
+    """
+
+    def __init__(self, fetchLastPrint: Callable[[str], Tuple[Optional[float], Optional[float]]] = Http.getLastPrint, clock: Callable[[], float] = time.time, configuration: Optional[Configuration.ConfigurationSnapshot] = None):
+        """Creates the cooldown ledger.
+
+        :param fetchLastPrint: Function that returns the last print time and weight of an email from the server.
+        :param clock: Function that returns the current timestamp.
+        :param configuration: Configuration to read the cooldown from. If None, the current configuration is used.
+        """
+
+        self.fetchLastPrint = fetchLastPrint
+        self.clock = clock
+        self.configuration = configuration
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.printListeners = []
+        self.hits = 0
+        self.misses = 0
+
+    def _storeEntry(self, key: str, printTime: Optional[float], weight: Optional[float]) -> Tuple[Optional[float], Optional[float], float]:
+        """Stores the last print of a user, keeping the print with the latest cooldown.
+        The lock must be held.
+
+        :param key: Key of the user.
+        :param printTime: Timestamp of the print.
+        :param weight: Weight of the print in grams.
+        :return: The stored entry.
+        """
+
+        # Keep the existing print if its cooldown ends later.
+        configuration = self.configuration or Configuration.current
+        cooldownEnd = None if printTime is None else printTime + getCooldownSeconds(weight, configuration)
+        existingEntry = self.entries.get(key)
+        if existingEntry is not None and existingEntry[0] is not None and (cooldownEnd is None or existingEntry[0] + getCooldownSeconds(existingEntry[1], configuration) > cooldownEnd):
+            printTime, weight = existingEntry[0], existingEntry[1]
+            cooldownEnd = printTime + getCooldownSeconds(weight, configuration)
+
+        # Store the entry until the cooldown ends. Users not cooling down are stored for the seed time
+        # since they may print from kiosks that haven't been seen.
+        currentTime = self.clock()
+        expireTime = currentTime + configuration.PRINT_COOLDOWN_SEED_SECONDS
+        if cooldownEnd is not None and cooldownEnd > currentTime:
+            expireTime = cooldownEnd
+        entry = (printTime, weight, expireTime)
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+
+        # Remove the least recently used entries if the ledger is full.
+        while len(self.entries) > configuration.PRINT_COOLDOWN_MAX_USERS:
+            self.entries.popitem(last=False)
+        return entry
+
+    def recordPrint(self, email: str, weight: float, printTime: Optional[float] = None) -> None:
+        """Records a print logged by the kiosk.
+
+        :param email: Email of the user.
+        :param weight: Weight of the print in grams.
+        :param printTime: Timestamp of the print. If None, the current time is used.
+        """
+
+        key = getUserKey(email)
+        printTime = self.clock() if printTime is None else printTime
+        self.recordUserPrint(key, weight, printTime)
+        for listener in list(self.printListeners):
+            listener(key, weight, printTime)
+
+    def addPrintListener(self, listener: Callable[[str, float, float], None]) -> None:
+        """Adds a function to call when a print logged by the kiosk is recorded.
+
+        :param listener: Function to call with the key of the user, weight, and timestamp of the print.
+        """
+
+        self.printListeners.append(listener)
+
+    def recordUserPrint(self, key: str, weight: float, printTime: Optional[float] = None) -> None:
+        """Records a print of a user by key, such as a print announced by another kiosk.
+
+        :param key: Key of the user.
+        :param weight: Weight of the print in grams.
+        :param printTime: Timestamp of the print. If None, the current time is used.
+        """
+
+        with self.lock:
+            self._storeEntry(key, self.clock() if printTime is None else printTime, weight)
+
+    def getCooldownEnd(self, email: str) -> Optional[float]:
+        """Returns the timestamp that the cooldown of a user ends, or None if the user isn't cooling down.
+        The last print is fetched from the server if the user isn't in the ledger.
+
+        :param email: Email of the user.
+        """
+
+        # Get the entry, or fetch the last print if there is no entry.
+        key = getUserKey(email)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] <= self.clock():
+                del self.entries[key]
+                entry = None
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            printTime, weight = self.fetchLastPrint(email)
+            with self.lock:
+                self.misses += 1
+                entry = self._storeEntry(key, printTime, weight)
+
+        # Return the end of the cooldown if it hasn't passed.
+        if entry[0] is None:
+            return None
+        cooldownEnd = entry[0] + getCooldownSeconds(entry[1], self.configuration)
+        if cooldownEnd <= self.clock():
+            return None
+        return cooldownEnd
+
+    def isCoolingDown(self, email: str) -> bool:
+        """Returns if a user must wait before printing again.
+
+        :param email: Email of the user.
+        """
+
+        return self.getCooldownEnd(email) is not None
+
+    def removeExpired(self) -> int:
+        """Removes the expired entries.
+
+        :return: The amount of entries removed.
+        """
+
+        with self.lock:
+            currentTime = self.clock()
+            expiredKeys = [key for key, entry in self.entries.items() if entry[2] <= currentTime]
+            for key in expiredKeys:
+                del self.entries[key]
+        return len(expiredKeys)
+
+
+# Ledger shared by the plugins.
+_ledger = None
+_ledgerLock = threading.Lock()
+
+
+def getLedger() -> CooldownLedger:
+    """Returns the ledger shared by the plugins.
+    """
+
+    global _ledger
+    with _ledgerLock:
+        if _ledger is None:
+            _ledger = CooldownLedger()
+        return _ledger
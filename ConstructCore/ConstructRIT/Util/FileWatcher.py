@@ -0,0 +1,84 @@
+"""
+Zachary Cook
+
+Watches files for changes.
+"""
+
+import os
+import threading
+from typing import Callable, List, Optional, Tuple
+
+
+class FileWatcher:
+    """Watches files for changes by checking their modified times and sizes in a background thread.
+    Polling is used instead of file system events so no additional dependencies are needed.
+    """
+
+    def __init__(self, paths: List[str], onChanged: Callable[[], None], interval: float = 2.0):
+        """Creates the file watcher.
+
+        :param paths: Paths of the files to watch. The files don't need to exist.
+        :param onChanged: Function to call when any of the files are created, changed, or removed.
+        :param interval: Seconds between checking the files.
+        """
+
+        self.paths = paths
+        self.onChanged = onChanged
+        self.interval = interval
+        self.stopEvent = threading.Event()
+        self.thread = None
+        self.lastStates = self.getStates()
+
+    def getStates(self) -> List[Optional[Tuple[int, int]]]:
+        """Returns the modified times and sizes of the files.
+        """
+
+        states = []
+        for path in self.paths:
+            try:
+                fileStat = os.stat(path)
+                states.append((fileStat.st_mtime_ns, fileStat.st_size))
+            except OSError:
+                states.append(None)
+        return states
+
+    def checkForChanges(self) -> bool:
+        """Checks the files and calls the changed function if any changed.
+
+        :return: Whether any of the files changed.
+        """
+
+        states = self.getStates()
+        if states == self.lastStates:
+            return False
+        self.lastStates = states
+        self.onChanged()
+        return True
+
+    def start(self) -> None:
+        """Starts watching the files.
+        """
+
+        if self.thread is not None:
+            return
+        self.stopEvent.clear()
+        self.thread = threading.Thread(target=self._run, name="FileWatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stops watching the files.
+        """
+
+        self.stopEvent.set()
+        self.thread = None
+
+    def _run(self) -> None:
+        """Checks the files until the watcher is stopped.
+        """
+
+        while not self.stopEvent.wait(self.interval):
+            try:
+                self.checkForChanges()
+            except Exception:
+                # Keep watching the files if handling a change fails.
+                pass
@@ -5,9 +5,68 @@ Utilities for interacting with external services.
 """
 
 import hashlib
-import requests
+import threading
+import time
 from .. import Configuration
-from typing import Dict, Optional, Tuple
+from . import LazyImport, Tracing, Usernames
+from typing import Dict, List, Optional, Tuple
+
+# Imported when the first request is sent, since importing requests slows down starting Cura.
+requests = LazyImport.lazyImport("requests")
+
+# Session shared by the requests to the server.
+_session = None
+_sessionLock = threading.Lock()
+
+
+def getSession() -> "requests.Session":
+    """Returns the session shared by the requests to the server, which keeps
+    the connections open and reuses the resolved address of the server.
+    """
+
+    global _session
+    with _sessionLock:
+        if _session is None:
+            from . import HttpSession
+            _session = HttpSession.createSession()
+        return _session
+
+
+def resetSession() -> None:
+    """Closes the connections of the shared session so the next request opens a new connection.
+    """
+
+    global _session
+    with _sessionLock:
+        session = _session
+        _session = None
+    if session is not None:
+        session.close()
+
+
+def request(method: str, path: str, session: Optional["requests.Session"] = None, **kwargs) -> "requests.Response":
+    """Sends a request to the server in a span of the current trace.
+
+    :param method: HTTP method of the request.
+    :param path: Path and query of the request.
+    :param session: Session to send the request with. If None, the shared session is used.
+    :return: The response of the request.
+    """
+
+    with Tracing.Span("http " + method + " " + path.split("?")[0]) as span:
+        response = (session or getSession()).request(method, getHost() + path, **kwargs)
+        span.setAttribute("status", response.status_code)
+        return response
+
+
+def ping(timeout: float = 10.0) -> None:
+    """Sends a request to the server with the shared session, which opens a connection to the
+    server if none are open and keeps the connection open. The request isn't traced.
+
+    :param timeout: Seconds to wait for the server.
+    """
+
+    getSession().head(getHost() + "/", timeout=timeout).close()
 
 
 def hashId(universityId: str) -> str:
@@ -26,6 +85,18 @@ def getHost() -> str:
     return Configuration.SERVER_HOST
 
 
+def hasLabManagerPermission(permissions: List[str]) -> bool:
+    """Returns if a list of permissions contains the LabManager permission.
+
+    :param permissions: Permissions of a user.
+    """
+
+    for permission in permissions:
+        if permission.lower() == "labmanager":
+            return True
+    return False
+
+
 def isAuthorized(universityId: str) -> bool:
     """Returns if an id is authorized.
 
@@ -33,24 +104,51 @@ def isAuthorized(universityId: str) -> bool:
     """
 
     # Get the user information and return if the LabManager permission exists.
-    userResult = requests.get(getHost() + "/user/get?hashedid=" + hashId(universityId)).json()
+    userResult = request("GET", "/user/get?hashedid=" + hashId(universityId)).json()
     if "permissions" in userResult.keys():
-        for permission in userResult["permissions"]:
-            if permission.lower() == "labmanager":
-                return True
+        return hasLabManagerPermission(userResult["permissions"])
 
     # Return false (unauthorized).
     return False
 
 
-def getUniversityIdHash(email) -> Optional[str]:
+def getUser(hashedId: str) -> Optional[Dict]:
+    """Returns the identity of a user with the hashed id, email, name, permissions,
+    and the time it was fetched. If the user doesn't exist, None is returned.
+
+    :param hashedId: Hashed university id of the user.
+    """
+
+    # Send and read the HTTP request.
+    userResult = request("GET", "/user/get?hashedid=" + hashedId).json()
+    if "email" not in userResult.keys():
+        return None
+
+    # Return the identity.
+    return {
+        "hashedId": hashedId,
+        "email": userResult["email"],
+        "name": userResult.get("name"),
+        "permissions": userResult.get("permissions") or [],
+        "fetchTime": time.time(),
+    }
+
+
+def getUniversityIdHash(email, identity: Optional[Dict] = None) -> Optional[str]:
     """Returns the university id hash for an email.
 
     :param email: Email to get the university id hash of.
+    :param identity: Identity of a user from getUser. If it is for the email, the hashed id is returned without a request.
     """
 
+    # Return the hashed id of the identity if it is for the email.
+    if identity is not None and identity.get("hashedId") is not None:
+        identityEmail = Usernames.normalizeEmail(identity["email"])
+        if identityEmail is not None and identityEmail == Usernames.normalizeEmail(email):
+            return identity["hashedId"]
+
     # Send and read the HTTP request.
-    response = requests.get(getHost() + "/user/find?email=" + email).json()
+    response = request("GET", "/user/find?email=" + email).json()
 
     # If the request was successful.
     if "hashedId" in response.keys() and response["hashedId"] is not None:
@@ -58,20 +156,46 @@ def getUniversityIdHash(email) -> Optional[str]:
     return None
 
 
-def getLastPrint(email: str) -> Tuple[Optional[float], Optional[float]]:
+def getUserChanges(watermark: Optional[str], limit: int) -> Optional[Dict]:
+    """Returns the users registered, changed, or removed since a watermark, with the
+    watermark of the last change returned and if there are more changes. Each change has
+    the email, the hashed id, and if the user was removed. If the server doesn't
+    support fetching changes, None is returned.
+
+    :param watermark: Watermark returned by the last fetch. If None, every user is returned.
+    :param limit: Maximum amount of changes to return.
+    """
+
+    # Send the request.
+    response = request("GET", "/user/changes?limit=" + str(limit) + ("" if watermark is None else "&since=" + watermark))
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+
+    # Return the changes.
+    changes = response.json()
+    return {
+        "users": changes.get("users") or [],
+        "watermark": changes.get("watermark"),
+        "more": changes.get("more", False),
+    }
+
+
+def getLastPrint(email: str, identity: Optional[Dict] = None) -> Tuple[Optional[float], Optional[float]]:
     """Returns the last print time and weight. If there is no
     last print, none is returned.
 
     :param email: Email to get the last print of.
+    :param identity: Identity of the user from getUser, if it is known.
     """
 
     # Get the hashed id and return if there is none.
-    hashedId = getUniversityIdHash(email)
+    hashedId = getUniversityIdHash(email, identity)
     if hashedId is None:
         return None, None
 
     # Send and read the HTTP request.
-    response = requests.get(getHost() + "/print/last?hashedid=" + hashedId).json()
+    response = request("GET", "/print/last?hashedid=" + hashedId).json()
 
     # If the request was successful, return the last print time and weight if there is one.
     if "timeStamp" in response and "weight" in response and response["timeStamp"] is not None and response["weight"] is not None:
@@ -89,7 +213,7 @@ def getLastPrintInformation(universityId: str) -> Optional[Dict]:
 
     # Get the email of the user.
     hashedId = hashId(universityId)
-    userResult = requests.get(getHost() + "/user/get?hashedid=" + hashedId).json()
+    userResult = request("GET", "/user/get?hashedid=" + hashedId).json()
     if "email" not in userResult.keys():
         return None
     userData = {
@@ -97,7 +221,7 @@ def getLastPrintInformation(universityId: str) -> Optional[Dict]:
     }
 
     # Add the last print information and return it.
-    printResponse = requests.get(getHost() + "/print/last?hashedid=" + hashedId).json()
+    printResponse = request("GET", "/print/last?hashedid=" + hashedId).json()
     if "purpose" in printResponse.keys() and printResponse["purpose"] is not None:
         userData["lastPurpose"] = printResponse["purpose"]
     if "billTo" in printResponse.keys() and printResponse["billTo"] is not None:
@@ -112,7 +236,7 @@ def getName(universityId: str) -> Optional[str]:
     """
 
     # Get the user information.
-    userResult = requests.get(getHost() + "/user/get?hashedid=" + hashId(universityId)).json()
+    userResult = request("GET", "/user/get?hashedid=" + hashId(universityId)).json()
 
     # Process and return the result.
     if "name" in userResult.keys():
@@ -121,7 +245,7 @@ def getName(universityId: str) -> Optional[str]:
         return None
 
 
-def LogPrint(email: str, fileName: str, materialType: str, printWeight: float, printPurpose: str, msdNumber: Optional[str], paymentOwed: bool) -> bool:
+def LogPrint(email: str, fileName: str, materialType: str, printWeight: float, printPurpose: str, msdNumber: Optional[str], paymentOwed: bool, identity: Optional[Dict] = None) -> bool:
     """Logs a print. Returns if the task was successful.
 
     :param email: Email of the user exporting the print.
@@ -131,18 +255,35 @@ def LogPrint(email: str, fileName: str, materialType: str, printWeight: float, p
     :param printPurpose: Purpose of the print being exported.
     :param msdNumber: MSD Number of the print being exported.
     :param paymentOwed: Whether the payment is owed or not.
+    :param identity: Identity of the user from getUser, if it is known.
     """
 
     # Get the hashed id and return if there is none.
-    hashedId = getUniversityIdHash(email)
+    hashedId = getUniversityIdHash(email, identity)
     if hashedId is None:
         return False
 
+    # Send the request and return the result.
+    return LogPrintRecord(createPrintRecord(hashedId, fileName, materialType, printWeight, printPurpose, msdNumber, paymentOwed))
+
+
+def createPrintRecord(hashedId: str, fileName: str, materialType: str, printWeight: float, printPurpose: str, msdNumber: Optional[str], paymentOwed: bool) -> Dict:
+    """Returns the payload for logging a print.
+
+    :param hashedId: Hashed university id of the user exporting the print.
+    :param fileName: Name of the file that was exported.
+    :param materialType: Type of the material being used.
+    :param printWeight: Weight of the print being exported.
+    :param printPurpose: Purpose of the print being exported.
+    :param msdNumber: MSD Number of the print being exported.
+    :param paymentOwed: Whether the payment is owed or not.
+    """
+
     # Check if this is a Senior Design print.
     msd = printPurpose == "Senior Design Project (Reimbursed)"
 
     # Create the payload.
-    arguments = {
+    return {
         "hashedId": hashedId,
         "fileName": fileName,
         "material": materialType,
@@ -152,6 +293,32 @@ def LogPrint(email: str, fileName: str, materialType: str, printWeight: float, p
         "owed": paymentOwed,
     }
 
-    # Send the request and return the result.
-    printResult = requests.post(getHost() + "/print/add", json=arguments).json()
+
+def LogPrintRecord(record: Dict, session: Optional["requests.Session"] = None) -> bool:
+    """Logs a print from a payload created with createPrintRecord. Returns if the task was successful.
+
+    :param record: Payload of the print.
+    :param session: Session to send the request with, if any.
+    """
+
+    printResult = request("POST", "/print/add", session, json=record).json()
     return "status" in printResult.keys() and printResult["status"] == "success"
+
+
+def LogPrints(records: List[Dict], session: Optional["requests.Session"] = None) -> Optional[List[bool]]:
+    """Logs multiple prints in one request. Returns if each print was logged, or
+    None if the server doesn't support logging multiple prints.
+
+    :param records: Payloads of the prints created with createPrintRecord.
+    :param session: Session to send the request with, if any.
+    """
+
+    # Send the request.
+    response = request("POST", "/print/addbulk", session, json={"prints": records})
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+
+    # Return the results.
+    results = response.json().get("results") or []
+    return [index < len(results) and results[index].get("status") == "success" for index in range(len(records))]
@@ -0,0 +1,184 @@
+"""
+Zachary Cook
+
+Session for the requests to the server, which keeps the connections to the server
+open between requests and reuses the resolved address of the server.
+"""
+
+import socket
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import connection, connectionpool, exceptions
+from .. import Configuration
+from typing import Callable, Dict, List, Tuple
+
+
+class DnsCache:
+    """Cache of resolved host addresses. The resolver of the system doesn't return the
+    time to live of the records, so addresses are reused for DNS_CACHE_SECONDS, and the
+    expired addresses are reused if resolving the host again fails.
+    """
+
+    def __init__(self, resolve: Callable = socket.getaddrinfo, clock: Callable[[], float] = time.monotonic):
+        """Creates the cache.
+
+        :param resolve: Function that resolves a host and port like socket.getaddrinfo.
+        :param clock: Function that returns the current time in seconds.
+        """
+
+        self.resolve = resolve
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    def getAddresses(self, host: str, port: int) -> List[str]:
+        """Returns the addresses of a host, resolving it if it isn't cached or expired.
+
+        :param host: Host to resolve.
+        :param port: Port to connect to.
+        """
+
+        # Return the cached addresses if they haven't expired.
+        with self.lock:
+            entry = self.entries.get((host, port))
+        if entry is not None and self.clock() < entry[0]:
+            return entry[1]
+
+        # Resolve the addresses and cache them, or use the expired addresses if the host can't be resolved.
+        try:
+            results = self.resolve(host, port, 0, socket.SOCK_STREAM)
+        except OSError:
+            if entry is not None:
+                return entry[1]
+            raise
+        addresses = []
+        for result in results:
+            if result[4][0] not in addresses:
+                addresses.append(result[4][0])
+        with self.lock:
+            self.entries[(host, port)] = (self.clock() + Configuration.DNS_CACHE_SECONDS, addresses)
+        return addresses
+
+    def invalidate(self, host: str, port: int) -> None:
+        """Removes the cached addresses of a host, such as after connecting to them failed.
+
+        :param host: Host to remove.
+        :param port: Port of the host.
+        """
+
+        with self.lock:
+            self.entries.pop((host, port), None)
+
+    def clear(self) -> None:
+        """Removes every cached address.
+        """
+
+        with self.lock:
+            self.entries.clear()
+
+
+class CachedAddressConnection:
+    """Mixin for connections that connect to the cached addresses of the host. Only the
+    address connected to is replaced, so the host is still used for TLS and the headers.
+    """
+
+    def _new_conn(self):
+        """Opens the socket of the connection to the first cached address that accepts it.
+        """
+
+        # Connect normally if the DNS cache is disabled or the connection isn't supported.
+        host = getattr(self, "_dns_host", None)
+        if host is None or Configuration.DNS_CACHE_SECONDS <= 0:
+            return super()._new_conn()
+
+        # Get the addresses.
+        dnsCache = getDnsCache()
+        try:
+            addresses = dnsCache.getAddresses(host, self.port)
+        except OSError as error:
+            raise exceptions.NewConnectionError(self, "Failed to resolve " + host + ": " + str(error))
+
+        # Connect to the addresses in order, and resolve the host again next time if none can be connected to.
+        lastError = None
+        for address in addresses:
+            self._dns_host = address
+            try:
+                return super()._new_conn()
+            except exceptions.HTTPError as error:
+                lastError = error
+            finally:
+                self._dns_host = host
+        dnsCache.invalidate(host, self.port)
+        raise lastError or exceptions.NewConnectionError(self, "No addresses for " + host)
+
+
+class CachedAddressHTTPConnection(CachedAddressConnection, connection.HTTPConnection):
+    """HTTP connection that connects to the cached addresses of the host.
+    """
+
+    pass
+
+
+class CachedAddressHTTPSConnection(CachedAddressConnection, connection.HTTPSConnection):
+    """HTTPS connection that connects to the cached addresses of the host.
+    """
+
+    pass
+
+
+class CachedAddressHTTPConnectionPool(connectionpool.HTTPConnectionPool):
+    """Pool of HTTP connections that connect to the cached addresses of the host.
+    """
+
+    ConnectionCls = CachedAddressHTTPConnection
+
+
+class CachedAddressHTTPSConnectionPool(connectionpool.HTTPSConnectionPool):
+    """Pool of HTTPS connections that connect to the cached addresses of the host.
+    """
+
+    ConnectionCls = CachedAddressHTTPSConnection
+
+
+class CachedAddressAdapter(HTTPAdapter):
+    """Adapter that pools connections that connect to the cached addresses of the host.
+    """
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        """Creates the pool manager with the pools of the cached address connections.
+        """
+
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CachedAddressHTTPConnectionPool,
+            "https": CachedAddressHTTPSConnectionPool,
+        }
+
+
+def createSession() -> requests.Session:
+    """Creates a session that pools the connections and connects to the cached addresses of the hosts.
+    """
+
+    session = requests.Session()
+    adapter = CachedAddressAdapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Cache shared by the sessions.
+_dnsCache = None
+_dnsCacheLock = threading.Lock()
+
+
+def getDnsCache() -> DnsCache:
+    """Returns the DNS cache shared by the sessions.
+    """
+
+    global _dnsCache
+    with _dnsCacheLock:
+        if _dnsCache is None:
+            _dnsCache = DnsCache()
+        return _dnsCache
@@ -0,0 +1,170 @@
+"""
+Zachary Cook
+
+Defers importing modules until they are used, and imports modules that are
+needed soon in the background after Cura starts.
+"""
+
+import importlib
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class LazyModule:
+    """Proxy of a module that is imported when an attribute is first accessed.
+    """
+
+    def __init__(self, name: str):
+        """Creates the lazy module.
+
+        :param name: Full name of the module.
+        """
+
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self):
+        """Returns the module, importing it if it isn't imported.
+        """
+
+        module = self._module
+        if module is None:
+            module = importlib.import_module(self._name)
+            object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, name: str):
+        """Returns an attribute of the module.
+
+        :param name: Name of the attribute.
+        """
+
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        """Sets an attribute of the module.
+
+        :param name: Name of the attribute.
+        :param value: Value to set.
+        """
+
+        setattr(self._load(), name, value)
+
+    def __repr__(self) -> str:
+        """Returns the representation of the lazy module.
+        """
+
+        return "<LazyModule " + self._name + (" (imported)" if self._module is not None else "") + ">"
+
+
+def lazyImport(name: str) -> LazyModule:
+    """Returns a proxy of a module that is imported when it is first used.
+
+    :param name: Full name of the module.
+    """
+
+    return LazyModule(name)
+
+
+class PreImporter:
+    """Imports modules in a background thread so they are imported before they are used.
+    Modules that fail to import are skipped and imported again when they are used.
+    """
+
+    def __init__(self):
+        """Creates the pre-importer.
+        """
+
+        self.lock = threading.Lock()
+        self.pendingNames = []
+        self.durations = {}
+        self.errors = {}
+        self.started = False
+        self.running = False
+        self.finished = threading.Event()
+
+    def addModules(self, names: List[str]) -> None:
+        """Adds modules to import. If the pre-importer is running, they are imported after the current modules.
+
+        :param names: Full names of the modules.
+        """
+
+        with self.lock:
+            self.pendingNames.extend(names)
+            if self.started and not self.running:
+                self._startThread()
+
+    def start(self) -> None:
+        """Starts importing the modules in the background.
+        """
+
+        with self.lock:
+            self.started = True
+            if not self.running:
+                self._startThread()
+
+    def _startThread(self) -> None:
+        """Starts the thread for importing. The lock must be held.
+        """
+
+        self.running = True
+        self.finished.clear()
+        threading.Thread(target=self._run, name="PreImporter", daemon=True).start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits for the modules to be imported.
+
+        :param timeout: Maximum seconds to wait. If None, there is no limit.
+        :return: Whether the modules were imported before the timeout.
+        """
+
+        return self.finished.wait(timeout)
+
+    def getDurations(self) -> Dict[str, float]:
+        """Returns the seconds each module took to import.
+        """
+
+        with self.lock:
+            return dict(self.durations)
+
+    def _run(self) -> None:
+        """Imports the pending modules.
+        """
+
+        while True:
+            with self.lock:
+                if len(self.pendingNames) == 0:
+                    self.running = False
+                    self.finished.set()
+                    return
+                name = self.pendingNames.pop(0)
+            startTime = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except Exception as error:
+                with self.lock:
+                    self.errors[name] = error
+                continue
+            with self.lock:
+                self.durations[name] = time.perf_counter() - startTime
+
+
+# Pre-importer shared by the plugins.
+_preImporter = PreImporter()
+
+
+def getPreImporter() -> PreImporter:
+    """Returns the pre-importer shared by the plugins.
+    """
+
+    return _preImporter
+
+
+def preImport(*names: str) -> None:
+    """Adds modules for the shared pre-importer to import once Cura finishes starting.
+
+    :param names: Full names of the modules.
+    """
+
+    _preImporter.addModules(list(names))
@@ -0,0 +1,228 @@
+"""
+Zachary Cook
+
+Announces prints to the other kiosks on the local network.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from .. import Configuration
+from .CooldownLedger import CooldownLedger
+from typing import Callable, Optional
+
+
+# Length of the signature appended to each announcement.
+SIGNATURE_LENGTH = hashlib.sha256().digest_size
+
+# Maximum kiosks to remember the last sequence number of.
+MAX_TRACKED_PEERS = 256
+
+
+def getSecret() -> Optional[str]:
+    """Returns the secret for signing announcements, or None if it isn't set.
+    """
+
+    secret = Configuration.PEER_BROADCAST_SECRET
+    if secret == "" or Configuration.bindingPattern.search(secret) is not None:
+        return None
+    return secret
+
+
+class PeerBroadcast:
+    """Announces the prints logged by the kiosk over UDP multicast and records the prints
+    announced by other kiosks in the cooldown ledger. Announcements are signed with
+    HMAC-SHA256, and old or repeated announcements are ignored.
+    """
+
+    def __init__(self, ledger: CooldownLedger, secret: str, group: str, port: int, maxAge: float = 30.0, interface: str = "0.0.0.0", clock: Callable[[], float] = time.time):
+        """Creates the peer broadcast.
+
+        :param ledger: Ledger to announce the prints of and record the received prints in.
+        :param secret: Secret shared by the kiosks for signing announcements.
+        :param group: Multicast group to send and receive announcements on.
+        :param port: Port to send and receive announcements on.
+        :param maxAge: Maximum seconds between sending and receiving an announcement.
+        :param interface: Address of the network interface to use.
+        :param clock: Function that returns the current timestamp.
+        """
+
+        self.ledger = ledger
+        self.secret = secret.encode("UTF-8")
+        self.group = group
+        self.port = port
+        self.maxAge = maxAge
+        self.interface = interface
+        self.clock = clock
+        self.kioskId = os.urandom(8).hex()
+        self.sequence = 0
+        self.lastSequences = {}
+        self.lock = threading.Lock()
+        self.statistics = {"sent": 0, "accepted": 0, "rejected": 0}
+        self.sendSocket = None
+        self.receiveSocket = None
+        self.stopEvent = threading.Event()
+        self.thread = None
+
+    def start(self) -> None:
+        """Starts sending and receiving announcements.
+        """
+
+        if self.thread is not None:
+            return
+
+        # Create the socket for sending.
+        self.sendSocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.sendSocket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+        self.sendSocket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        self.sendSocket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self.interface))
+
+        # Create the socket for receiving. The port is shared so multiple kiosks can run on one machine.
+        self.receiveSocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.receiveSocket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            self.receiveSocket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self.receiveSocket.bind(("", self.port))
+        self.receiveSocket.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, struct.pack("4s4s", socket.inet_aton(self.group), socket.inet_aton(self.interface)))
+        self.receiveSocket.settimeout(0.5)
+
+        # Start receiving and announce the prints logged by the kiosk.
+        self.stopEvent.clear()
+        self.thread = threading.Thread(target=self._run, name="PeerBroadcast", daemon=True)
+        self.thread.start()
+        self.ledger.addPrintListener(self.announcePrint)
+
+    def stop(self) -> None:
+        """Stops sending and receiving announcements.
+        """
+
+        self.stopEvent.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        for openSocket in (self.sendSocket, self.receiveSocket):
+            if openSocket is not None:
+                openSocket.close()
+        self.sendSocket = None
+        self.receiveSocket = None
+
+    def sign(self, payload: bytes) -> bytes:
+        """Returns the signature of a payload.
+
+        :param payload: Payload to sign.
+        """
+
+        return hmac.new(self.secret, payload, hashlib.sha256).digest()
+
+    def createAnnouncement(self, key: str, weight: float, printTime: float) -> bytes:
+        """Returns a signed announcement of a print.
+
+        :param key: Key of the user in the cooldown ledger.
+        :param weight: Weight of the print in grams.
+        :param printTime: Timestamp of the print.
+        """
+
+        with self.lock:
+            self.sequence += 1
+            sequence = self.sequence
+        payload = json.dumps({
+            "kiosk": self.kioskId,
+            "sequence": sequence,
+            "sentTime": self.clock(),
+            "key": key,
+            "weight": weight,
+            "printTime": printTime,
+        }, separators=(",", ":")).encode("UTF-8")
+        return payload + self.sign(payload)
+
+    def announcePrint(self, key: str, weight: float, printTime: float) -> None:
+        """Announces a print to the other kiosks. Errors are ignored since
+        the server is still used for prints that aren't announced.
+
+        :param key: Key of the user in the cooldown ledger.
+        :param weight: Weight of the print in grams.
+        :param printTime: Timestamp of the print.
+        """
+
+        sendSocket = self.sendSocket
+        if sendSocket is None:
+            return
+        try:
+            sendSocket.sendto(self.createAnnouncement(key, weight, printTime), (self.group, self.port))
+            self.statistics["sent"] += 1
+        except OSError:
+            pass
+
+    def handleAnnouncement(self, data: bytes) -> bool:
+        """Records the print of an announcement if it is valid.
+
+        :param data: Received announcement.
+        :return: Whether the announcement was accepted.
+        """
+
+        # Verify the signature and read the announcement.
+        payload, signature = data[:-SIGNATURE_LENGTH], data[-SIGNATURE_LENGTH:]
+        if len(data) <= SIGNATURE_LENGTH or not hmac.compare_digest(signature, self.sign(payload)):
+            self.statistics["rejected"] += 1
+            return False
+        try:
+            announcement = json.loads(payload.decode("UTF-8"))
+            kioskId, sequence = str(announcement["kiosk"]), int(announcement["sequence"])
+            sentTime, key = float(announcement["sentTime"]), str(announcement["key"])
+            weight, printTime = float(announcement["weight"]), float(announcement["printTime"])
+        except (ValueError, KeyError, TypeError):
+            self.statistics["rejected"] += 1
+            return False
+
+        # Ignore the kiosk's own announcements.
+        if kioskId == self.kioskId:
+            return False
+
+        # Ignore old and repeated announcements.
+        if abs(self.clock() - sentTime) > self.maxAge:
+            self.statistics["rejected"] += 1
+            return False
+        with self.lock:
+            if sequence <= self.lastSequences.get(kioskId, 0):
+                self.statistics["rejected"] += 1
+                return False
+            self.lastSequences.pop(kioskId, None)
+            self.lastSequences[kioskId] = sequence
+            while len(self.lastSequences) > MAX_TRACKED_PEERS:
+                del self.lastSequences[next(iter(self.lastSequences))]
+
+        # Record the print.
+        self.ledger.recordUserPrint(key, weight, printTime)
+        self.statistics["accepted"] += 1
+        return True
+
+    def _run(self) -> None:
+        """Receives announcements until stopped.
+        """
+
+        while not self.stopEvent.is_set():
+            try:
+                data, _ = self.receiveSocket.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.handleAnnouncement(data)
+
+
+def createPeerBroadcast(ledger: CooldownLedger) -> Optional[PeerBroadcast]:
+    """Creates the peer broadcast from the configuration. Returns None if
+    broadcasting is disabled or the secret isn't set.
+
+    :param ledger: Ledger to announce the prints of and record the received prints in.
+    """
+
+    secret = getSecret()
+    if not Configuration.PEER_BROADCAST_ENABLED or secret is None:
+        return None
+    return PeerBroadcast(ledger, secret, Configuration.PEER_BROADCAST_GROUP, Configuration.PEER_BROADCAST_PORT, Configuration.PEER_BROADCAST_MAX_AGE_SECONDS)
@@ -0,0 +1,131 @@
+"""
+Zachary Cook
+
+Fetches the configuration from the server and stores it for starting offline.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from .. import Configuration
+from .Http import requests
+from typing import Dict
+
+
+class RemoteConfiguration:
+    """Fetches the configuration from the server using conditional requests. The fetched
+    configuration is stored so it is used when starting, without waiting for the server.
+    """
+
+    def __init__(self):
+        """Creates the remote configuration. The fetched configuration is stored to
+        Configuration.remoteFile, which the configuration is reloaded from.
+        """
+
+        self.stopEvent = threading.Event()
+        self.thread = None
+
+    def getUrl(self) -> str:
+        """Returns the URL of the configuration.
+        """
+
+        return Configuration.SERVER_HOST + "/configuration"
+
+    def getCache(self) -> Dict:
+        """Returns the stored configuration, or an empty dictionary if there is none.
+        """
+
+        try:
+            return Configuration.readJson(Configuration.remoteFile)
+        except (OSError, ValueError):
+            return {}
+
+    def storeCache(self, cache: Dict) -> None:
+        """Stores the fetched configuration.
+
+        :param cache: Fetched configuration and its ETag.
+        """
+
+        cachePath = Configuration.remoteFile
+        if not os.path.exists(os.path.dirname(cachePath)):
+            os.makedirs(os.path.dirname(cachePath))
+        fileDescriptor, temporaryPath = tempfile.mkstemp(dir=os.path.dirname(cachePath))
+        with os.fdopen(fileDescriptor, "w") as file:
+            file.write(json.dumps(cache))
+        os.replace(temporaryPath, cachePath)
+
+    def getSecondsUntilRefresh(self) -> float:
+        """Returns the seconds until the stored configuration should be refreshed.
+        """
+
+        fetchTime = self.getCache().get("fetchTime")
+        if fetchTime is None:
+            return 0
+        return max(0.0, fetchTime + Configuration.REMOTE_CONFIGURATION_REFRESH_SECONDS - time.time())
+
+    def refresh(self) -> bool:
+        """Fetches the configuration if it changed on the server.
+
+        :return: Whether the configuration changed.
+        """
+
+        # Send the request with the ETag of the stored configuration.
+        cache = self.getCache()
+        headers = {}
+        if cache.get("etag") is not None:
+            headers["If-None-Match"] = cache["etag"]
+        response = requests.get(self.getUrl(), headers=headers)
+
+        # Update the fetch time if the configuration is unchanged or not provided by the server.
+        if response.status_code == 304 or response.status_code == 404:
+            cache["fetchTime"] = time.time()
+            self.storeCache(cache)
+            return False
+        response.raise_for_status()
+
+        # Store and apply the new configuration.
+        document = response.json()
+        self.storeCache({
+            "etag": response.headers.get("ETag"),
+            "version": document.get("version"),
+            "fetchTime": time.time(),
+            "configuration": document.get("configuration") or {},
+        })
+        Configuration.reload()
+        return True
+
+    def start(self) -> None:
+        """Starts refreshing the configuration in the background. Startup is not delayed since
+        the stored configuration is used until the refresh completes.
+        """
+
+        if self.thread is None:
+            self.stopEvent.clear()
+            self.thread = threading.Thread(target=self._run, name="RemoteConfiguration", daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        """Stops refreshing the configuration.
+        """
+
+        self.stopEvent.set()
+        self.thread = None
+
+    def _run(self) -> None:
+        """Refreshes the configuration until stopped.
+        """
+
+        while not self.stopEvent.wait(self.getSecondsUntilRefresh()):
+            try:
+                self.refresh()
+            except Exception:
+                # Retry after the refresh time. The stored configuration continues to be used.
+                try:
+                    cache = self.getCache()
+                    cache["fetchTime"] = time.time()
+                    self.storeCache(cache)
+                except Exception:
+                    # Wait the refresh time without storing it if the stored configuration can't be written.
+                    self.stopEvent.wait(Configuration.REMOTE_CONFIGURATION_REFRESH_SECONDS)
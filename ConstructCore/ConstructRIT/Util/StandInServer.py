@@ -0,0 +1,386 @@
+"""
+Zachary Cook
+
+Local stand-in of the Construct server for testing and benchmarking without the real server.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """Handles the requests of the stand-in server.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        """Sets up a new connection, simulating the latency of connecting.
+        """
+
+        super().setup()
+        connectLatency = self.server.standInServer.connectLatency
+        if connectLatency > 0:
+            time.sleep(connectLatency)
+
+    def log_message(self, format: str, *args) -> None:
+        """Prevents logging every request.
+        """
+
+        pass
+
+    def sendJson(self, data, status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+        """Sends a JSON response.
+
+        :param data: Data to send.
+        :param status: Status code of the response.
+        :param headers: Additional headers to send.
+        """
+
+        body = json.dumps(data).encode("UTF-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handleRequest(self, method: str) -> None:
+        """Handles a request.
+
+        :param method: HTTP method of the request.
+        """
+
+        # Read the request.
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        body = None
+        if "Content-Length" in self.headers.keys():
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+
+        # Simulate the latency and errors and send the response.
+        server = self.server.standInServer
+        server.recordRequest(method, url.path)
+        latency = server.getLatency()
+        if latency > 0:
+            time.sleep(latency)
+        handler = server.routes.get((method, url.path))
+        if server.shouldFail():
+            server.recordError(method, url.path)
+            self.sendJson({"status": "error", "message": "Internal server error."}, 500)
+        elif handler is None:
+            self.sendJson({"status": "error", "message": "Not found."}, 404)
+        else:
+            handler(self, query, json.loads(body) if body else None)
+
+    def do_GET(self) -> None:
+        """Handles a GET request.
+        """
+
+        self.handleRequest("GET")
+
+    def do_POST(self) -> None:
+        """Handles a POST request.
+        """
+
+        self.handleRequest("POST")
+
+    def do_HEAD(self) -> None:
+        """Handles a HEAD request.
+        """
+
+        self.handleRequest("HEAD")
+
+
+class StandInHTTPServer(ThreadingHTTPServer):
+    """HTTP server of the stand-in server. The connection backlog is raised so many
+    kiosks connecting at once aren't delayed by retried connections.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class StandInServer:
+    """Local stand-in of the Construct server with the data stored in memory.
+    """
+
+    def __init__(self, latency: float = 0.0, latencyJitter: float = 0.0, errorRate: float = 0.0, seed: Optional[int] = None, connectLatency: float = 0.0):
+        """Creates the stand-in server.
+
+        :param latency: Seconds to wait before responding to each request.
+        :param latencyJitter: Maximum random seconds added to the latency of each request.
+        :param errorRate: Fraction of requests that are answered with an internal server error.
+        :param seed: Seed of the random latency and errors, if any.
+        :param connectLatency: Seconds to wait before handling a new connection, such as for the TCP and TLS handshakes.
+        """
+
+        self.latency = latency
+        self.connectLatency = connectLatency
+        self.latencyJitter = latencyJitter
+        self.errorRate = errorRate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.users = {}
+        self.userChanges = []
+        self.prints = []
+        self.requestCounts = {}
+        self.errorCounts = {}
+        self.configuration = None
+        self.configurationVersion = 0
+        self.supportsBulkPrints = True
+        self.routes = {
+            ("GET", "/user/get"): self.handleGetUser,
+            ("GET", "/user/find"): self.handleFindUser,
+            ("GET", "/user/changes"): self.handleUserChanges,
+            ("GET", "/print/last"): self.handleLastPrint,
+            ("POST", "/print/add"): self.handleAddPrint,
+            ("POST", "/print/addbulk"): self.handleAddPrints,
+            ("GET", "/configuration"): self.handleConfiguration,
+            ("HEAD", "/"): self.handlePing,
+        }
+        self.httpServer = None
+        self.thread = None
+
+    def start(self) -> str:
+        """Starts the server on a free local port.
+
+        :return: The URL of the server.
+        """
+
+        self.httpServer = StandInHTTPServer(("127.0.0.1", 0), StandInRequestHandler)
+        self.httpServer.standInServer = self
+        self.thread = threading.Thread(target=self.httpServer.serve_forever, name="StandInServer", daemon=True)
+        self.thread.start()
+        return self.getUrl()
+
+    def stop(self) -> None:
+        """Stops the server.
+        """
+
+        if self.httpServer is not None:
+            self.httpServer.shutdown()
+            self.httpServer.server_close()
+            self.httpServer = None
+
+    def getUrl(self) -> str:
+        """Returns the URL of the server.
+        """
+
+        return "http://127.0.0.1:" + str(self.httpServer.server_address[1])
+
+    def addUser(self, universityId: str, email: str, name: str, permissions: Optional[List[str]] = None) -> str:
+        """Adds a user.
+
+        :param universityId: University id of the user.
+        :param email: Email of the user.
+        :param name: Name of the user.
+        :param permissions: Permissions of the user.
+        :return: The hashed id of the user.
+        """
+
+        hashedId = hashlib.sha256(universityId.encode("UTF-8")).hexdigest()
+        with self.lock:
+            self.users[hashedId] = {
+                "hashedId": hashedId,
+                "email": email,
+                "name": name,
+                "permissions": permissions or [],
+            }
+            self.userChanges.append({"email": email, "hashedId": hashedId, "removed": False})
+        return hashedId
+
+    def removeUser(self, universityId: str) -> None:
+        """Removes a user.
+
+        :param universityId: University id of the user.
+        """
+
+        hashedId = hashlib.sha256(universityId.encode("UTF-8")).hexdigest()
+        with self.lock:
+            user = self.users.pop(hashedId, None)
+            if user is not None:
+                self.userChanges.append({"email": user["email"], "hashedId": hashedId, "removed": True})
+
+    def setConfiguration(self, configuration: Dict) -> None:
+        """Sets the configuration document served to the kiosks.
+
+        :param configuration: Configuration values.
+        """
+
+        with self.lock:
+            self.configuration = configuration
+            self.configurationVersion += 1
+
+    def recordRequest(self, method: str, path: str) -> None:
+        """Counts a request.
+
+        :param method: HTTP method of the request.
+        :param path: Path of the request.
+        """
+
+        with self.lock:
+            key = method + " " + path
+            self.requestCounts[key] = self.requestCounts.get(key, 0) + 1
+
+    def recordError(self, method: str, path: str) -> None:
+        """Counts a request that was answered with a simulated error.
+
+        :param method: HTTP method of the request.
+        :param path: Path of the request.
+        """
+
+        with self.lock:
+            key = method + " " + path
+            self.errorCounts[key] = self.errorCounts.get(key, 0) + 1
+
+    def getRequestCount(self) -> int:
+        """Returns the total amount of requests received.
+        """
+
+        with self.lock:
+            return sum(self.requestCounts.values())
+
+    def getErrorCount(self) -> int:
+        """Returns the total amount of requests answered with a simulated error.
+        """
+
+        with self.lock:
+            return sum(self.errorCounts.values())
+
+    def getLatency(self) -> float:
+        """Returns the seconds to wait before responding to a request.
+        """
+
+        if self.latencyJitter <= 0:
+            return self.latency
+        with self.lock:
+            return self.latency + self.random.uniform(0, self.latencyJitter)
+
+    def shouldFail(self) -> bool:
+        """Returns if a request should be answered with a simulated error.
+        """
+
+        if self.errorRate <= 0:
+            return False
+        with self.lock:
+            return self.random.random() < self.errorRate
+
+    def findUserByEmail(self, email: Optional[str]) -> Optional[Dict]:
+        """Returns the user with an email, if any.
+
+        :param email: Email of the user.
+        """
+
+        with self.lock:
+            for user in self.users.values():
+                if user["email"] == email:
+                    return user
+        return None
+
+    def handlePing(self, handler: StandInRequestHandler, query: Dict, body) -> None:
+        """Handles a HEAD / request, which is sent to keep connections open.
+        """
+
+        handler.send_response(200)
+        handler.send_header("Content-Length", "0")
+        handler.end_headers()
+
+    def handleGetUser(self, handler: StandInRequestHandler, query: Dict, body) -> None:
+        """Handles a /user/get request.
+        """
+
+        user = self.users.get(query.get("hashedid"))
+        if user is None:
+            handler.sendJson({"status": "error", "message": "User not found."})
+        else:
+            handler.sendJson({"name": user["name"], "email": user["email"], "permissions": user["permissions"]})
+
+    def handleFindUser(self, handler: StandInRequestHandler, query: Dict, body) -> None:
+        """Handles a /user/find request.
+        """
+
+        user = self.findUserByEmail(query.get("email"))
+        handler.sendJson({"hashedId": None if user is None else user["hashedId"]})
+
+    def handleUserChanges(self, handler: StandInRequestHandler, query: Dict, body) -> None:
+        """Handles a /user/changes request. The watermark is the amount of changes returned so far.
+        """
+
+        start = int(query.get("since") or 0)
+        limit = int(query.get("limit") or 1000)
+        with self.lock:
+            changes = self.userChanges[start:start + limit]
+            more = start + limit < len(self.userChanges)
+        handler.sendJson({"users": changes, "watermark": str(start + len(changes)), "more": more})
+
+    def handleLastPrint(self, handler: StandInRequestHandler, query: Dict, body) -> None:
+        """Handles a /print/last request.
+        """
+
+        lastPrint = None
+        with self.lock:
+            for printData in self.prints:
+                if printData["hashedId"] == query.get("hashedid"):
+                    lastPrint = printData
+        if lastPrint is None:
+            handler.sendJson({"timeStamp": None, "weight": None, "purpose": None, "billTo": None})
+        else:
+            handler.sendJson({"timeStamp": lastPrint["timeStamp"], "weight": lastPrint["weight"], "purpose": lastPrint["purpose"], "billTo": lastPrint["billTo"]})
+
+    def addPrint(self, printData: Optional[Dict]) -> Dict:
+        """Stores a logged print.
+
+        :param printData: Payload of the print.
+        :return: The result to send for the print.
+        """
+
+        if printData is None or printData.get("hashedId") not in self.users.keys():
+            return {"status": "error", "message": "User not found."}
+        printData = dict(printData)
+        printData["timeStamp"] = time.time()
+        with self.lock:
+            self.prints.append(printData)
+        return {"status": "success"}
+
+    def handleAddPrint(self, handler: StandInRequestHandler, query: Dict, body) -> None:
+        """Handles a /print/add request.
+        """
+
+        handler.sendJson(self.addPrint(body))
+
+    def handleAddPrints(self, handler: StandInRequestHandler, query: Dict, body) -> None:
+        """Handles a /print/addbulk request.
+        """
+
+        if not self.supportsBulkPrints:
+            handler.sendJson({"status": "error", "message": "Not found."}, 404)
+            return
+        handler.sendJson({"results": [self.addPrint(printData) for printData in (body or {}).get("prints") or []]})
+
+    def handleConfiguration(self, handler: StandInRequestHandler, query: Dict, body) -> None:
+        """Handles a /configuration request using the ETag for conditional requests.
+        """
+
+        with self.lock:
+            configuration = self.configuration
+            version = self.configurationVersion
+        if configuration is None:
+            handler.sendJson({"status": "error", "message": "No configuration."}, 404)
+            return
+        etag = "\"" + str(version) + "\""
+        if handler.headers.get("If-None-Match") == etag:
+            handler.send_response(304)
+            handler.send_header("ETag", etag)
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+        else:
+            handler.sendJson({"version": version, "configuration": configuration}, headers={"ETag": etag})
@@ -0,0 +1,189 @@
+"""
+Zachary Cook
+
+Records the time spent importing modules and registering plugins while Cura starts.
+"""
+
+import contextlib
+import importlib.machinery
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+# Loaders that are created for each module, so the loading can be timed without changing other modules.
+TIMED_LOADER_TYPES = (importlib.machinery.SourceFileLoader, importlib.machinery.SourcelessFileLoader, importlib.machinery.ExtensionFileLoader)
+
+
+class StartupProfiler:
+    """Profiler for the startup of the plugins. Imports are timed with a meta path finder
+    that wraps the loaders of the modules found by the other finders.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        """Creates the profiler.
+
+        :param clock: Function that returns the current time in seconds.
+        """
+
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.threadState = threading.local()
+        self.startTime = clock()
+        self.imports = {}
+        self.plugins = {}
+
+    def start(self) -> None:
+        """Starts timing imports.
+        """
+
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def stop(self) -> None:
+        """Stops timing imports.
+        """
+
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name: str, path=None, target=None):
+        """Finds a module with the other finders and times loading it.
+
+        :param name: Full name of the module.
+        :param path: Path of the parent package.
+        :param target: Module being reloaded, if any.
+        :return: The spec of the module, or None to let the other finders handle it.
+        """
+
+        # Find the module with the other finders.
+        if getattr(self.threadState, "finding", False):
+            return None
+        self.threadState.finding = True
+        try:
+            spec = None
+            for finder in list(sys.meta_path):
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+        finally:
+            self.threadState.finding = False
+
+        # Time running the module if it has its own loader.
+        if spec is None or not isinstance(spec.loader, TIMED_LOADER_TYPES):
+            return spec
+        loader = spec.loader
+        execModule = loader.exec_module
+        def timedExecModule(module) -> None:
+            del loader.exec_module
+            with self.measureImport(name):
+                execModule(module)
+        loader.exec_module = timedExecModule
+        return spec
+
+    @contextlib.contextmanager
+    def measureImport(self, name: str) -> Iterator[None]:
+        """Records the time of a module being run. The time of imports inside the
+        module is included in the total time and excluded from the self time.
+
+        :param name: Full name of the module.
+        """
+
+        stack = getattr(self.threadState, "stack", None)
+        if stack is None:
+            stack = []
+            self.threadState.stack = stack
+        stack.append(0.0)
+        startTime = self.clock()
+        try:
+            yield
+        finally:
+            duration = self.clock() - startTime
+            childDuration = stack.pop()
+            if len(stack) > 0:
+                stack[-1] += duration
+            with self.lock:
+                self.imports[name] = {"total": duration, "self": duration - childDuration}
+
+    @contextlib.contextmanager
+    def measurePlugin(self, name: str) -> Iterator[None]:
+        """Records the time of loading and registering a plugin.
+
+        :param name: Id of the plugin.
+        """
+
+        with self.lock:
+            importCount = len(self.imports)
+        startTime = self.clock()
+        try:
+            yield
+        finally:
+            duration = self.clock() - startTime
+            with self.lock:
+                self.plugins[name] = {"total": duration, "imports": len(self.imports) - importCount}
+
+    def wrapPluginLoading(self, pluginRegistry) -> None:
+        """Times the plugins loaded by a plugin registry after this plugin.
+
+        :param pluginRegistry: Plugin registry of the application.
+        """
+
+        if not hasattr(pluginRegistry, "loadPlugin"):
+            return
+        loadPlugin = pluginRegistry.loadPlugin
+        def timedLoadPlugin(pluginId: str, *args, **kwargs):
+            with self.measurePlugin(pluginId):
+                return loadPlugin(pluginId, *args, **kwargs)
+        pluginRegistry.loadPlugin = timedLoadPlugin
+
+    def getTopImports(self, count: int, key: str = "self") -> List[Dict]:
+        """Returns the slowest imports.
+
+        :param count: Amount of imports to return.
+        :param key: Time to sort by, either "self" or "total".
+        """
+
+        with self.lock:
+            imports = [{"name": name, **times} for name, times in self.imports.items()]
+        imports.sort(key=lambda entry: entry[key], reverse=True)
+        return imports[0:count]
+
+    def getReport(self, count: int = 10) -> str:
+        """Returns a report of the plugins and the slowest imports.
+
+        :param count: Amount of imports to include.
+        """
+
+        lines = ["Startup profile: " + "{:.1f}".format((self.clock() - self.startTime) * 1000) + " ms since profiling started."]
+        with self.lock:
+            plugins = sorted(self.plugins.items(), key=lambda entry: entry[1]["total"], reverse=True)
+        for name, times in plugins:
+            lines.append("  Plugin " + name + ": " + "{:.1f}".format(times["total"] * 1000) + " ms (" + str(times["imports"]) + " modules imported)")
+        for entry in self.getTopImports(count):
+            lines.append("  Import " + entry["name"] + ": " + "{:.1f}".format(entry["self"] * 1000) + " ms self, " + "{:.1f}".format(entry["total"] * 1000) + " ms total")
+        return "\n".join(lines)
+
+
+# Profiler of the current launch.
+_profiler = None
+
+
+def getProfiler() -> Optional[StartupProfiler]:
+    """Returns the profiler of the current launch, if it was started.
+    """
+
+    return _profiler
+
+
+def startProfiler() -> StartupProfiler:
+    """Starts the profiler of the current launch.
+    """
+
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler()
+        _profiler.start()
+    return _profiler
@@ -0,0 +1,318 @@
+"""
+Zachary Cook
+
+Records the latency of operations as spans of traces for finding slow exports.
+Summarize the recorded traces with:
+python -m ConstructRIT.Util.Tracing [--days DAYS] [files...]
+"""
+
+import contextlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import uuid
+from .. import Configuration
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+
+# File the spans are written to. Older spans are rotated to numbered files.
+traceFile = Configuration.getDataPath(os.path.join("Traces", "traces.jsonl"))
+
+
+class TraceContext(NamedTuple):
+    """Trace and parent span of the current operation.
+    """
+
+    traceId: str
+    spanId: str
+    traceName: str
+
+
+# Trace context of each thread and the logger for writing spans.
+_threadState = threading.local()
+_logger = None
+_loggerLock = threading.Lock()
+_listener = None
+
+
+def createId() -> str:
+    """Returns a new id for a trace or span.
+    """
+
+    return uuid.uuid4().hex[0:16]
+
+
+def getCurrentContext() -> Optional[TraceContext]:
+    """Returns the trace context of the current thread, if any.
+    """
+
+    return getattr(_threadState, "context", None)
+
+
+def setCurrentContext(context: Optional[TraceContext]) -> None:
+    """Sets the trace context of the current thread.
+
+    :param context: Context to use, or None to clear the context.
+    """
+
+    _threadState.context = context
+
+
+@contextlib.contextmanager
+def useContext(context: Optional[TraceContext]) -> Iterator[None]:
+    """Sets the trace context of the current thread until the block ends.
+
+    :param context: Context to use.
+    """
+
+    previousContext = getCurrentContext()
+    setCurrentContext(context)
+    try:
+        yield
+    finally:
+        setCurrentContext(previousContext)
+
+
+def createContext(traceName: str) -> TraceContext:
+    """Returns the context of a new trace.
+
+    :param traceName: Name of the trace, such as the operation being traced.
+    """
+
+    return TraceContext(createId(), createId(), traceName)
+
+
+def getLogger() -> logging.Logger:
+    """Returns the logger that writes the spans. Spans are written from a background
+    thread so recording spans doesn't wait for the file.
+    """
+
+    global _logger, _listener
+    with _loggerLock:
+        if _logger is None:
+            # Create the rotating file handler.
+            if not os.path.exists(os.path.dirname(traceFile)):
+                os.makedirs(os.path.dirname(traceFile))
+            fileHandler = logging.handlers.RotatingFileHandler(traceFile, maxBytes=Configuration.TRACE_FILE_MAX_BYTES, backupCount=Configuration.TRACE_FILE_BACKUPS, encoding="UTF-8")
+            fileHandler.setFormatter(logging.Formatter("%(message)s"))
+
+            # Create the logger that queues the spans for the handler.
+            spanQueue = queue.Queue()
+            _listener = logging.handlers.QueueListener(spanQueue, fileHandler)
+            _listener.start()
+            logger = logging.getLogger("ConstructRIT.Tracing")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(logging.handlers.QueueHandler(spanQueue))
+            _logger = logger
+        return _logger
+
+
+def flush() -> None:
+    """Writes the queued spans and stops the background writer. A new writer is started if more spans are recorded.
+    """
+
+    global _logger, _listener
+    with _loggerLock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in list(_logger.handlers):
+                _logger.removeHandler(handler)
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+            _logger = None
+
+
+def recordSpan(span: Dict[str, Any]) -> None:
+    """Writes a finished span.
+
+    :param span: Data of the span.
+    """
+
+    getLogger().info(json.dumps(span, separators=(",", ":"), default=str))
+
+
+class Span:
+    """Span of an operation. When entered, the span is the parent of the spans started in the thread.
+    """
+
+    def __init__(self, name: str, context: Optional[TraceContext] = None, **attributes):
+        """Creates the span.
+
+        :param name: Name of the operation.
+        :param context: Context of the trace. If None, the current context is used, or a new trace is started.
+        :param attributes: Additional values to record.
+        """
+
+        self.name = name
+        self.parentContext = context or getCurrentContext() or createContext(name)
+        self.context = TraceContext(self.parentContext.traceId, createId(), self.parentContext.traceName)
+        self.attributes = attributes
+        self.startTime = None
+        self.startCounter = None
+        self.previousContext = None
+
+    def setAttribute(self, name: str, value: Any) -> None:
+        """Sets a value to record with the span.
+
+        :param name: Name of the value.
+        :param value: Value to record.
+        """
+
+        self.attributes[name] = value
+
+    def __enter__(self) -> "Span":
+        """Starts the span.
+        """
+
+        self.previousContext = getCurrentContext()
+        setCurrentContext(self.context)
+        self.startTime = time.time()
+        self.startCounter = time.perf_counter()
+        return self
+
+    def __exit__(self, errorType, error, traceback) -> None:
+        """Ends and records the span.
+        """
+
+        duration = time.perf_counter() - self.startCounter
+        setCurrentContext(self.previousContext)
+        if not Configuration.current.TRACING_ENABLED:
+            return
+        span = {
+            "traceId": self.context.traceId,
+            "trace": self.context.traceName,
+            "spanId": self.context.spanId,
+            "parentId": self.parentContext.spanId,
+            "name": self.name,
+            "start": self.startTime,
+            "duration": duration,
+            "thread": threading.current_thread().name,
+        }
+        if errorType is not None:
+            span["error"] = errorType.__name__
+        span.update(self.attributes)
+        recordSpan(span)
+
+
+def runInContext(context: Optional[TraceContext], name: str, function: Callable, *args, **kwargs) -> Any:
+    """Calls a function in a span of a trace, such as for a step that runs in another thread.
+
+    :param context: Context of the trace. If None, a new trace is started.
+    :param name: Name of the span.
+    :param function: Function to call.
+    """
+
+    with Span(name, context or createContext(name)):
+        return function(*args, **kwargs)
+
+
+def getFunctionName(function: Callable) -> str:
+    """Returns the name of a function for a span.
+
+    :param function: Function to get the name of.
+    """
+
+    if hasattr(function, "__self__") and hasattr(function.__self__, "function"):
+        # Use the name of the function wrapped to run in the main thread.
+        return getFunctionName(function.__self__.function)
+    return getattr(function, "__qualname__", None) or getattr(function, "__name__", None) or type(function).__name__
+
+
+def readSpans(paths: List[str], since: Optional[float] = None) -> List[Dict]:
+    """Reads spans from trace files. Lines that can't be read are skipped.
+
+    :param paths: Trace files to read.
+    :param since: Timestamp to read spans after, if any.
+    """
+
+    spans = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="UTF-8") as file:
+            for line in file:
+                try:
+                    span = json.loads(line)
+                except ValueError:
+                    continue
+                if since is None or span.get("start", 0) >= since:
+                    spans.append(span)
+    return spans
+
+
+def getPercentile(sortedValues: List[float], percentile: float) -> float:
+    """Returns a percentile of sorted values using the nearest rank.
+
+    :param sortedValues: Values to get the percentile of.
+    :param percentile: Percentile between 0 and 100.
+    """
+
+    index = max(0, min(len(sortedValues) - 1, int(round(percentile / 100 * len(sortedValues) + 0.5)) - 1))
+    return sortedValues[index]
+
+
+def summarize(spans: List[Dict]) -> List[Dict]:
+    """Returns the count and latency percentiles of each span name, and of each trace name
+    using the time from the first span starting to the last span ending.
+
+    :param spans: Spans to summarize.
+    """
+
+    # Group the durations by name and the spans by trace.
+    durations = {}
+    traces = {}
+    for span in spans:
+        durations.setdefault(span["name"], []).append(span["duration"])
+        traceTimes = traces.setdefault((span.get("trace"), span["traceId"]), [span["start"], span["start"] + span["duration"]])
+        traceTimes[0] = min(traceTimes[0], span["start"])
+        traceTimes[1] = max(traceTimes[1], span["start"] + span["duration"])
+    for (traceName, _), (startTime, endTime) in traces.items():
+        durations.setdefault(str(traceName) + " (total)", []).append(endTime - startTime)
+
+    # Calculate the percentiles.
+    summary = []
+    for name, nameDurations in durations.items():
+        nameDurations.sort()
+        summary.append({
+            "name": name,
+            "count": len(nameDurations),
+            "p50": getPercentile(nameDurations, 50),
+            "p95": getPercentile(nameDurations, 95),
+            "p99": getPercentile(nameDurations, 99),
+        })
+    summary.sort(key=lambda entry: entry["p99"], reverse=True)
+    return summary
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    """Summarizes the trace files from the command line.
+
+    :param arguments: Command line arguments. If None, the process arguments are used.
+    """
+
+    import argparse
+
+    # Parse the arguments.
+    parser = argparse.ArgumentParser(description="Summarizes the latency of the traced operations.")
+    parser.add_argument("files", nargs="*", help="Trace files to read. If not given, the kiosk's trace files are read.")
+    parser.add_argument("--days", type=float, help="Only include spans from the last amount of days.")
+    arguments = parser.parse_args(arguments)
+    paths = arguments.files or [traceFile] + [traceFile + "." + str(i) for i in range(1, Configuration.TRACE_FILE_BACKUPS + 1)]
+    since = None if arguments.days is None else time.time() - (arguments.days * 24 * 60 * 60)
+
+    # Print the summary.
+    summary = summarize(readSpans(paths, since))
+    nameWidth = max([len(entry["name"]) for entry in summary] + [4])
+    print("Name".ljust(nameWidth) + "  " + "Count".rjust(7) + "  " + "p50 (ms)".rjust(10) + "  " + "p95 (ms)".rjust(10) + "  " + "p99 (ms)".rjust(10))
+    for entry in summary:
+        print(entry["name"].ljust(nameWidth) + "  " + str(entry["count"]).rjust(7) + "  " + "{:.1f}".format(entry["p50"] * 1000).rjust(10) + "  " + "{:.1f}".format(entry["p95"] * 1000).rjust(10) + "  " + "{:.1f}".format(entry["p99"] * 1000).rjust(10))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+"""
+Zachary Cook
+
+Local index of the registered users for checking registrations without the server.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from .. import Configuration
+from . import Http, Usernames
+from typing import Callable, Dict, Optional
+
+
+# File the index is stored in.
+indexFile = Configuration.getDataPath("userIndex.sqlite3")
+
+# Maximum changes to fetch in one request when syncing.
+SYNC_PAGE_SIZE = 5000
+
+
+def getEmailKey(email: str) -> str:
+    """Returns the key of a user in the index.
+
+    :param email: Email of the user.
+    """
+
+    return email.strip().lower()
+
+
+class UserIndex:
+    """Index of the hashed ids of registered emails stored in SQLite. The index is synced
+    from the server with the changes since the last sync, and updated with the registrations
+    looked up on the server. Registrations are used without the server only if the index
+    was synced, or the registration was confirmed, within the maximum staleness.
+    """
+
+    def __init__(self, path: Optional[str] = None, fetchHashedId: Callable[[str, Optional[Dict]], Optional[str]] = Http.getUniversityIdHash, fetchChanges: Callable[[Optional[str], int], Optional[Dict]] = Http.getUserChanges, clock: Callable[[], float] = time.time):
+        """Creates the user index.
+
+        :param path: Path of the SQLite file. If None, the default file is used.
+        :param fetchHashedId: Function that returns the hashed id of an email and identity from the server.
+        :param fetchChanges: Function that returns the users changed since a watermark from the server.
+        :param clock: Function that returns the current timestamp.
+        """
+
+        self.path = path or indexFile
+        self.fetchHashedId = fetchHashedId
+        self.fetchChanges = fetchChanges
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.connection = None
+        self.usernameIndex = None
+        self.lastSyncAttemptTime = None
+        self.stopEvent = threading.Event()
+        self.thread = None
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Returns the connection to the index, opening it if it isn't open. An index
+        that can't be read is replaced with an empty index. The lock must be held.
+        """
+
+        if self.connection is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            try:
+                self.connection = self._open()
+            except sqlite3.DatabaseError:
+                # Replace the corrupted index. It is filled again by the next sync.
+                os.remove(self.path)
+                self.connection = self._open()
+        return self.connection
+
+    def _open(self) -> sqlite3.Connection:
+        """Opens the index file and creates the tables.
+        """
+
+        if not os.path.exists(os.path.dirname(self.path)):
+            os.makedirs(os.path.dirname(self.path))
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            with connection:
+                connection.execute("CREATE TABLE IF NOT EXISTS users (email TEXT PRIMARY KEY, hashedId TEXT NOT NULL, confirmTime REAL NOT NULL) WITHOUT ROWID")
+                connection.execute("CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)")
+        except sqlite3.DatabaseError:
+            connection.close()
+            raise
+        return connection
+
+    def _getMetadata(self, connection: sqlite3.Connection, name: str) -> Optional[str]:
+        """Returns a stored value of the index. The lock must be held.
+
+        :param connection: Connection to the index.
+        :param name: Name of the value.
+        """
+
+        row = connection.execute("SELECT value FROM metadata WHERE name = ?", (name,)).fetchone()
+        return None if row is None else row[0]
+
+    def getLastSyncTime(self) -> Optional[float]:
+        """Returns the time the index was last fully synced, if it was synced.
+        """
+
+        with self.lock:
+            syncTime = self._getMetadata(self._connect(), "syncTime")
+        return None if syncTime is None else float(syncTime)
+
+    def getCount(self) -> int:
+        """Returns the amount of users in the index.
+        """
+
+        with self.lock:
+            return self._connect().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def lookup(self, email: str) -> Optional[str]:
+        """Returns the hashed id of an email if it is in the index and not too stale.
+
+        :param email: Email of the user.
+        """
+
+        # Get the registration and the sync time.
+        with self.lock:
+            connection = self._connect()
+            row = connection.execute("SELECT hashedId, confirmTime FROM users WHERE email = ?", (getEmailKey(email),)).fetchone()
+            syncTime = self._getMetadata(connection, "syncTime")
+        if row is None:
+            return None
+
+        # Return the hashed id if the registration was confirmed recently enough.
+        confirmTime = max(row[1], 0.0 if syncTime is None else float(syncTime))
+        if self.clock() - confirmTime > Configuration.USER_INDEX_MAX_STALENESS_SECONDS:
+            return None
+        return row[0]
+
+    def record(self, email: str, hashedId: Optional[str]) -> None:
+        """Stores the registration of an email looked up on the server.
+
+        :param email: Email of the user.
+        :param hashedId: Hashed id of the user, or None if the email isn't registered.
+        """
+
+        with self.lock:
+            connection = self._connect()
+            with connection:
+                if hashedId is None:
+                    connection.execute("DELETE FROM users WHERE email = ?", (getEmailKey(email),))
+                else:
+                    connection.execute("INSERT OR REPLACE INTO users VALUES (?, ?, ?)", (getEmailKey(email), hashedId, self.clock()))
+
+    def getUniversityIdHash(self, email: str, identity: Optional[Dict] = None) -> Optional[str]:
+        """Returns the university id hash for an email from the index, or from the server
+        if the email isn't in the index or the registration is too stale.
+
+        :param email: Email to get the university id hash of.
+        :param identity: Identity of a user from Http.getUser, if it is known.
+        """
+
+        # Return the hashed id from the index if it is recent enough.
+        if not Configuration.USER_INDEX_ENABLED:
+            return self.fetchHashedId(email, identity)
+        try:
+            hashedId = self.lookup(email)
+        except sqlite3.Error:
+            hashedId = None
+        if hashedId is not None:
+            self.hits += 1
+            return hashedId
+
+        # Look up the hashed id on the server and store it.
+        self.misses += 1
+        hashedId = self.fetchHashedId(email, identity)
+        try:
+            self.record(email, hashedId)
+        except sqlite3.Error:
+            pass
+        return hashedId
+
+    def sync(self) -> int:
+        """Fetches the users changed on the server since the last sync.
+
+        :return: The amount of changes fetched.
+        """
+
+        with self.lock:
+            watermark = self._getMetadata(self._connect(), "watermark")
+        changeCount = 0
+        while True:
+            # Fetch the next changes and return if the server doesn't support fetching changes.
+            changes = self.fetchChanges(watermark, SYNC_PAGE_SIZE)
+            if changes is None:
+                return changeCount
+
+            # Store the changes and the watermark together so a failed sync continues from the stored changes.
+            syncTime = self.clock()
+            addedUsers = [(getEmailKey(user["email"]), user["hashedId"], syncTime) for user in changes["users"] if not user.get("removed", False)]
+            removedUsers = [(getEmailKey(user["email"]), user["hashedId"]) for user in changes["users"] if user.get("removed", False)]
+            with self.lock:
+                connection = self._connect()
+                with connection:
+                    connection.executemany("INSERT OR REPLACE INTO users VALUES (?, ?, ?)", addedUsers)
+                    connection.executemany("DELETE FROM users WHERE email = ? AND hashedId = ?", removedUsers)
+                    connection.execute("INSERT OR REPLACE INTO metadata VALUES ('watermark', ?)", (changes["watermark"],))
+                    if not changes["more"]:
+                        connection.execute("INSERT OR REPLACE INTO metadata VALUES ('syncTime', ?)", (str(syncTime),))
+            changeCount += len(changes["users"])
+            watermark = changes["watermark"]
+            if not changes["more"]:
+                return changeCount
+
+    def updateUsernameIndex(self) -> None:
+        """Rebuilds the index of the usernames for completing usernames from the users in the index.
+        """
+
+        with self.lock:
+            emails = [row[0] for row in self._connect().execute("SELECT email FROM users")]
+        self.usernameIndex = Usernames.UsernameIndex(Usernames.getUsername(email) for email in emails)
+
+    def getSecondsUntilSync(self) -> float:
+        """Returns the seconds until the index should be synced.
+        """
+
+        lastSyncTime = max(self.getLastSyncTime() or 0.0, self.lastSyncAttemptTime or 0.0)
+        return max(0.0, lastSyncTime + Configuration.USER_INDEX_SYNC_SECONDS - self.clock())
+
+    def startSyncing(self) -> None:
+        """Starts syncing the index in the background.
+        """
+
+        if self.thread is None:
+            self.stopEvent.clear()
+            self.thread = threading.Thread(target=self._run, name="UserIndex", daemon=True)
+            self.thread.start()
+
+    def stopSyncing(self) -> None:
+        """Stops syncing the index.
+        """
+
+        self.stopEvent.set()
+        self.thread = None
+
+    def _run(self) -> None:
+        """Syncs the index until stopped.
+        """
+
+        # Build the usernames from the stored index before the first sync.
+        try:
+            self.updateUsernameIndex()
+        except sqlite3.Error:
+            pass
+
+        # Sync the index and rebuild the usernames if users changed.
+        while not self.stopEvent.wait(self.getSecondsUntilSync()):
+            self.lastSyncAttemptTime = self.clock()
+            try:
+                if self.sync() > 0:
+                    self.updateUsernameIndex()
+            except (IOError, ValueError, sqlite3.Error):
+                # Retry after the sync time. The index continues to be used until it is too stale.
+                pass
+
+
+# Index shared by the plugins.
+_index = None
+_indexLock = threading.Lock()
+
+
+def getIndex() -> UserIndex:
+    """Returns the index shared by the plugins.
+    """
+
+    global _index
+    with _indexLock:
+        if _index is None:
+            _index = UserIndex()
+        return _index
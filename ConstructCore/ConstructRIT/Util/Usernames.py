@@ -0,0 +1,132 @@
+"""
+Zachary Cook
+
+Validates RIT usernames and emails and completes usernames from the known users.
+"""
+
+import re
+import sys
+from array import array
+from typing import Iterable, List, Optional
+
+
+# Pattern of the usernames and emails accepted for RIT users, with the username as the first group.
+EMAIL_PATTERN = re.compile(r"([+,\-./0-9_a-z]+)(?:@(?:g\.|mail\.)?rit\.edu)?")
+
+
+def getUsername(text: str) -> Optional[str]:
+    """Returns the username of an RIT username or email, or None if it is invalid.
+
+    :param text: Username or email entered.
+    """
+
+    match = EMAIL_PATTERN.fullmatch(text.lower().strip())
+    return None if match is None else match.group(1)
+
+
+def isEmailPrefix(text: str) -> bool:
+    """Returns if more text can be typed after an RIT username or email to make it valid.
+
+    :param text: Username or email being typed.
+    """
+
+    username, separator, domain = text.lower().strip().partition("@")
+    if username == "":
+        return separator == ""
+    return getUsername(username) is not None and (separator == "" or any(validDomain.startswith(domain) for validDomain in ["rit.edu", "g.rit.edu", "mail.rit.edu"]))
+
+
+def normalizeEmail(text: str) -> Optional[str]:
+    """Returns the @rit.edu email of an RIT username or email, or None if it is invalid.
+    The @g.rit.edu and @mail.rit.edu domains are replaced with @rit.edu.
+
+    :param text: Username or email entered.
+    """
+
+    username = getUsername(text)
+    return None if username is None else username + "@rit.edu"
+
+
+class UsernameIndex:
+    """Sorted index of usernames for completing usernames as they are typed. The
+    usernames are stored in one byte string with an array of where each username
+    starts instead of as a list of strings, which uses about a fifth of the memory.
+    """
+
+    def __init__(self, usernames: Iterable[Optional[str]]):
+        """Creates the index.
+
+        :param usernames: Usernames to index. Invalid usernames and None are ignored.
+        """
+
+        # Sort the valid usernames and store them with the offset of each username.
+        sortedUsernames = sorted(set(username for username in usernames if username is not None and EMAIL_PATTERN.fullmatch(username) is not None and "@" not in username))
+        self.data = "".join(sortedUsernames).encode("ascii")
+        self.offsets = array("I", [0])
+        offset = 0
+        for username in sortedUsernames:
+            offset += len(username)
+            self.offsets.append(offset)
+
+    def __len__(self) -> int:
+        """Returns the amount of usernames in the index.
+        """
+
+        return len(self.offsets) - 1
+
+    def __contains__(self, username: str) -> bool:
+        """Returns if a username is in the index.
+
+        :param username: Username to check.
+        """
+
+        index = self.findFirst(username)
+        return index < len(self) and self.getUsernameBytes(index) == username.encode("ascii", "replace")
+
+    def getUsernameBytes(self, index: int) -> bytes:
+        """Returns a username in the index as bytes.
+
+        :param index: Position of the username in the sorted usernames.
+        """
+
+        return self.data[self.offsets[index]:self.offsets[index + 1]]
+
+    def findFirst(self, prefix: str) -> int:
+        """Returns the position of the first username that isn't before a prefix.
+
+        :param prefix: Prefix to find.
+        """
+
+        prefixBytes = prefix.encode("ascii", "replace")
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.getUsernameBytes(middle) < prefixBytes:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def getCompletions(self, prefix: str, limit: int) -> List[str]:
+        """Returns the first usernames in alphabetical order that start with a prefix.
+
+        :param prefix: Prefix of the usernames.
+        :param limit: Maximum amount of usernames to return.
+        """
+
+        prefixBytes = prefix.encode("ascii", "replace")
+        completions = []
+        index = self.findFirst(prefix)
+        while index < len(self) and len(completions) < limit:
+            username = self.getUsernameBytes(index)
+            if not username.startswith(prefixBytes):
+                break
+            completions.append(username.decode("ascii"))
+            index += 1
+        return completions
+
+    def getMemorySize(self) -> int:
+        """Returns the bytes used to store the usernames.
+        """
+
+        return sys.getsizeof(self.data) + sys.getsizeof(self.offsets)
@@ -6,6 +6,8 @@ Adds the classes used by The Construct @ RIT.
 
 import os
 import site
+from typing import Any, Callable
+from UM.Logger import Logger
 from UM.PluginObject import PluginObject
 from UM.PluginRegistry import PluginRegistry
 
@@ -18,7 +20,34 @@ class ConstructState:
         """Creates the state.
         """
 
+        # Identity of the job mode user from Http.getUser (hashedId, email, name,
+        # permissions, and fetchTime). Cleared when job mode is turned off.
         self.currentJobModeUser = None
+        self.jobModePrintLogger = None
+        self.jobModeExportQueue = None
+        self.remoteConfiguration = None
+        self.peerBroadcast = None
+        self.connectionWarmer = None
+        self.listeners = {}
+
+    def addListener(self, name: str, listener: Callable) -> None:
+        """Adds a function to call when a shared value changes.
+
+        :param name: Name of the value.
+        :param listener: Function to call with the new value.
+        """
+
+        self.listeners.setdefault(name, []).append(listener)
+
+    def notifyListeners(self, name: str, value: Any) -> None:
+        """Calls the functions listening to a shared value.
+
+        :param name: Name of the value.
+        :param value: New value.
+        """
+
+        for listener in list(self.listeners.get(name, [])):
+            listener(value)
 
 
 def getMetaData():
@@ -37,8 +66,78 @@ def register(app):
     # Add the shared state.
     app.ConstructRIT = ConstructState()
 
-    # Register the ConstructRIT module.
+    # Register the ConstructRIT module and start timing the imports and the plugins loaded after this one.
     site.addsitedir(os.path.realpath(os.path.join(__file__, "..")))
+    from ConstructRIT.Util import StartupProfiler
+    profiler = StartupProfiler.startProfiler()
+    with profiler.measurePlugin("ConstructCore"):
+        # Reload the configuration when the configuration files change, and fetch the configuration from the server.
+        from ConstructRIT import Configuration
+        Configuration.startWatching()
+        if Configuration.REMOTE_CONFIGURATION_ENABLED:
+            from ConstructRIT.Util.RemoteConfiguration import RemoteConfiguration
+            app.ConstructRIT.remoteConfiguration = RemoteConfiguration()
+            app.ConstructRIT.remoteConfiguration.start()
+
+        # Announce prints to the other kiosks on the local network.
+        from ConstructRIT.Util import CooldownLedger, PeerBroadcast
+        app.ConstructRIT.peerBroadcast = PeerBroadcast.createPeerBroadcast(CooldownLedger.getLedger())
+        if app.ConstructRIT.peerBroadcast is not None:
+            try:
+                app.ConstructRIT.peerBroadcast.start()
+            except OSError:
+                # Cooldowns are still checked with the server if the network doesn't support multicast.
+                app.ConstructRIT.peerBroadcast.stop()
+                app.ConstructRIT.peerBroadcast = None
+
+    # Report the slowest startup steps once Cura finishes starting.
+    if Configuration.STARTUP_PROFILE_ENABLED:
+        profiler.wrapPluginLoading(PluginRegistry.getInstance())
+        def reportStartup() -> None:
+            """Stops timing the imports and logs the report.
+            """
+
+            profiler.stop()
+            Logger.log("i", profiler.getReport(Configuration.STARTUP_PROFILE_REPORT_SIZE))
+        app.initializationFinished.connect(reportStartup)
+    else:
+        profiler.stop()
+
+    # Import the modules needed for the first export in the background once Cura finishes starting,
+    # after the startup is reported.
+    from ConstructRIT.Util import LazyImport
+    if Configuration.PRE_IMPORT_ENABLED:
+        LazyImport.preImport("requests", "ConstructRIT.Util.HttpSession")
+        app.initializationFinished.connect(LazyImport.getPreImporter().start)
+
+    # Build the swipe prompt once Cura finishes starting so the first swipe only shows it.
+    def buildSwipePrompt() -> None:
+        """Creates the swipe prompt shared by the plugins.
+        """
+
+        from ConstructRIT.UI.Swipe import SwipePrompt
+        SwipePrompt.getSwipePrompt()
+    app.initializationFinished.connect(buildSwipePrompt)
+
+    # Sync the registered users once Cura finishes starting so registrations can be checked without the server.
+    if Configuration.USER_INDEX_ENABLED:
+        def startUserIndex() -> None:
+            """Starts syncing the user index in the background.
+            """
+
+            from ConstructRIT.Util import UserIndex
+            UserIndex.getIndex().startSyncing()
+        app.initializationFinished.connect(startUserIndex)
+
+    # Open a connection to the server when slicing finishes or a removable drive is added, once Cura finishes starting.
+    if Configuration.CONNECTION_WARMING_ENABLED:
+        def startConnectionWarmer() -> None:
+            """Creates the connection warmer and connects it to the backend and output devices.
+            """
+
+            from ConstructRIT.Util import ConnectionWarmer
+            app.ConstructRIT.connectionWarmer = ConnectionWarmer.createConnectionWarmer(app)
+        app.initializationFinished.connect(startConnectionWarmer)
 
     # Return an empty PluginObject.
     # As of Uranium for Cura 4.13, the plugin will fail to load if there is nothing registered.
@@ -4,8 +4,10 @@ Zachary Cook
 Adds a job mode to top bar.
 """
 
+from typing import Optional
 from UM.Application import Application
 from UM.Logger import Logger
+from UM.Qt.Bindings.StageModel import StageModel
 
 
 # Exposed to allow external name changes.
@@ -17,14 +19,29 @@ metaData = {
     }
 
 
-def setTabName(name: str) -> None:
-    """Sets the name of the tab.
+def setTabName(name: str, stageId: Optional[str] = None) -> None:
+    """Sets the name of the tab. Only the name of the tab in the existing stage models is
+    changed instead of emitting stagesChanged, which rebuilds every stage tab.
 
     :param name: New name for the tab.
+    :param stageId: Id of the stage to update in the stage models. If None, only
+    the metadata is changed, which is read when the stage models are created.
     """
 
+    # Store the name for stage models created later.
     metaData["stage"]["name"] = name
-    Application.getInstance().getController().stagesChanged.emit()
+    if stageId is None:
+        return
+
+    # Update the name in the stage models of the QML engine.
+    engine = Application.getInstance()._qml_engine
+    if engine is None:
+        return
+    for rootObject in engine.rootObjects():
+        for stageModel in rootObject.findChildren(StageModel):
+            index = stageModel.find("id", stageId)
+            if index != -1:
+                stageModel.setProperty(index, "name", name)
 
 
 def getMetaData():
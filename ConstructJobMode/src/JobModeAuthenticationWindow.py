@@ -1,26 +1,26 @@
 """
 Zachary Cook
 
-Swipe window used to authenticate lab managers
+Swipe request used to authenticate lab managers
 for job mode and import their information.
 """
 
 import threading
 import time
 from PyQt5 import QtCore
-from ConstructRIT.UI.Swipe.SwipeWindow import SwipeWindow
+from ConstructRIT.UI.Swipe.SwipePrompt import SwipeRequest
 from ConstructRIT.Util import Http
 
 
-class JobModeAuthenticationWindow(SwipeWindow):
-    """Swipe window used to authenticate lab managers
+class JobModeAuthenticationWindow(SwipeRequest):
+    """Swipe request used to authenticate lab managers
     for job mode and import their information.
     """
 
     onAuthenticated = QtCore.pyqtSignal(dict)
 
     def __init__(self):
-        """Creates the job mode authentication window.
+        """Creates the job mode authentication request and shows the swipe prompt.
         """
         super().__init__("Start Job Mode")
 
@@ -38,46 +38,28 @@ class JobModeAuthenticationWindow(SwipeWindow):
         self.buffer.lock()
         self.setLabelText("Authenticating. Please wait...")
 
-        # Authenticate the id.
+        # Fetch the identity of the user, which is stored for the job mode session.
         try:
-            authorized = Http.isAuthorized(universityId)
+            identity = Http.getUser(Http.hashId(universityId))
         except IOError:
             self.setLabelText("Error occurred. Try again.")
             self.buffer.unlock()
             return
 
-        if authorized:
-            # Load the user information.
-            self.setLabelText("Importing information. Please wait...")
-            try:
-                userInformation = Http.getLastPrintInformation(universityId)
-            except IOError:
-                self.setLabelText("Error occurred. Try again.")
-                self.buffer.unlock()
-                return
-            try:
-                name = Http.getName(universityId)
-            except IOError:
-                self.setLabelText("Error occurred. Try again.")
-                self.buffer.unlock()
-                return
-
+        if identity is not None and Http.hasLabManagerPermission(identity["permissions"]):
             # Return if a profile doesn't exist.
-            if userInformation is None or name is None:
+            if identity["name"] is None:
                 self.setLabelText("No user information found.")
                 self.buffer.unlock()
                 return
 
             # Authorize the user.
-            returnData = {
-                "email": userInformation["email"],
-                "name": name,
-            }
+            returnData = identity
             self.setLabelText("Authorization accepted.")
             self.cancelled = True
             time.sleep(0.5)
-            self.closeThreaded()
             self.onAuthenticated.emit(returnData)
+            self.closeThreaded()
         else:
             # Unlock the buffer and display an error.
             self.setLabelText("Authorization failed.")
@@ -43,6 +43,24 @@ Item
                 horizontalAlignment: Text.AlignHCenter
                 elide: Text.ElideRight
             }
+
+            Label
+            {
+                id: exportProgressText
+                anchors
+                {
+                    left: parent.left
+                    right: parent.right
+                    bottom: parent.bottom
+                }
+                text: JobModeStage.exportProgress
+                color: UM.Theme.getColor("text_inactive")
+                font: UM.Theme.getFont("small")
+                visible: text != ""
+                renderType: Text.NativeRendering
+                horizontalAlignment: Text.AlignHCenter
+                elide: Text.ElideRight
+            }
         }
 
         background: Rectangle
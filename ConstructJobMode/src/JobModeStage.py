@@ -5,26 +5,36 @@ Stage for job mode.
 """
 
 import os.path
+import threading
 from cura.CuraApplication import CuraApplication
 from cura.Stages.CuraStage import CuraStage
 from PyQt5 import QtCore
 from PyQt5.QtCore import pyqtSlot, pyqtProperty
-from typing import Callable, Dict
+from typing import Callable, Dict, Optional
 from UM.Application import Application
+from UM.Logger import Logger
+from ConstructRIT.Util.BatchPrintLogger import BatchPrintLogger
 from .JobModeAuthenticationWindow import JobModeAuthenticationWindow
 
 
+# Seconds to wait for the queued exports to complete after job mode is deactivated, before the remaining prints are sent.
+EXPORT_QUEUE_STOP_SECONDS = 60.0
+
+
 class JobModeStage(CuraStage):
     """Stage for job mode.
     """
 
     stateChanged = QtCore.pyqtSignal(str)
+    exportProgressChanged = QtCore.pyqtSignal(str)
+    exportProgressReceived = QtCore.pyqtSignal(dict)
     _jobModeState = "Job Mode: Inactive"
+    _exportProgress = ""
 
-    def __init__(self, setTabName: Callable[[str], None], parent=None):
+    def __init__(self, setTabName: Callable[[str, Optional[str]], None], parent=None):
         """Creates the stage.
 
-        :param setTabName: Callback for setting the tab name.
+        :param setTabName: Callback for setting the tab name with the id of the stage.
         """
 
         # Set up the stage.
@@ -32,9 +42,15 @@ class JobModeStage(CuraStage):
         self.setTabName = setTabName
         setTabName(self._jobModeState)
 
+        # Update the export progress in the main thread, since it is sent from the export queue's worker.
+        self.exportProgressReceived.connect(self.setExportProgress)
+
         # Wait until QML engine is created, otherwise creating the new QML components will fail.
         Application.getInstance().engineCreatedSignal.connect(self.onEngineCreated)
 
+        # Close the connections of the print logger when Cura closes.
+        Application.getInstance().applicationShuttingDown.connect(self.onShuttingDown)
+
     @pyqtProperty(str, notify=stateChanged)
     def jobModeState(self) -> str:
         """Qt property for the state.
@@ -51,7 +67,27 @@ class JobModeStage(CuraStage):
 
         self._jobModeState = value
         self.stateChanged.emit(value)
-        self.setTabName(value)
+        self.setTabName(value, self.getPluginId())
+
+    @pyqtProperty(str, notify=exportProgressChanged)
+    def exportProgress(self) -> str:
+        """Qt property for the progress of the job mode exports.
+        """
+
+        return self._exportProgress
+
+    def setExportProgress(self, progress: Dict) -> None:
+        """Sets the displayed progress of the job mode exports.
+
+        :param progress: Progress from the export queue.
+        """
+
+        self._exportProgress = ""
+        if progress["queued"] > 0:
+            self._exportProgress = str(progress["exported"]) + "/" + str(progress["queued"]) + " exported"
+            if progress["failed"] > 0:
+                self._exportProgress += ", " + str(progress["failed"]) + " failed"
+        self.exportProgressChanged.emit(self._exportProgress)
 
     def jobModeStartedCallback(self, jobModeUser: Dict) -> None:
         """Callback for job mode being started.
@@ -61,8 +97,34 @@ class JobModeStage(CuraStage):
 
         app = CuraApplication.getInstance()
         app.ConstructRIT.currentJobModeUser = jobModeUser
+        app.ConstructRIT.jobModePrintLogger = BatchPrintLogger(jobModeUser["email"], jobModeUser.get("hashedId"))
         self.jobModeState = "Job Mode: " + app.ConstructRIT.currentJobModeUser["name"]
 
+    def flushPrintLogger(self, printLogger: BatchPrintLogger, exportQueue) -> None:
+        """Waits for the queued exports of a job mode session, sends the prints that
+        haven't been logged, and closes the connections of the print logger.
+
+        :param printLogger: Print logger of the job mode session.
+        :param exportQueue: Export queue of the job mode session, if any.
+        """
+
+        try:
+            if exportQueue is not None:
+                exportQueue.stop(EXPORT_QUEUE_STOP_SECONDS)
+            printLogger.flush()
+        except IOError:
+            Logger.logException("e", "Failed to log the remaining job mode prints.")
+        finally:
+            printLogger.close()
+
+    def onShuttingDown(self) -> None:
+        """Closes the connections of the print logger of the job mode session when Cura closes.
+        """
+
+        printLogger = CuraApplication.getInstance().ConstructRIT.jobModePrintLogger
+        if printLogger is not None:
+            printLogger.close()
+
     @pyqtSlot()
     def onClick(self) -> None:
         """Invoked when the button is clicked.
@@ -70,8 +132,16 @@ class JobModeStage(CuraStage):
 
         app = CuraApplication.getInstance()
         if app.ConstructRIT.currentJobModeUser is not None:
-            # De-activate job mode.
+            # De-activate job mode, clearing the stored identity, and send the prints that haven't been logged
+            # after the queued exports complete.
+            printLogger = app.ConstructRIT.jobModePrintLogger
+            exportQueue = app.ConstructRIT.jobModeExportQueue
             app.ConstructRIT.currentJobModeUser = None
+            app.ConstructRIT.jobModePrintLogger = None
+            app.ConstructRIT.jobModeExportQueue = None
+            self.setExportProgress({"queued": 0, "exported": 0, "failed": 0})
+            if printLogger is not None:
+                threading.Thread(target=self.flushPrintLogger, args=[printLogger, exportQueue]).start()
             self.jobModeState = "Job Mode: Inactive"
         else:
             # Prompt to activate job mode.
@@ -82,6 +152,9 @@ class JobModeStage(CuraStage):
         """Sets up the Qt components.
         """
 
+        # Listen to the progress of the job mode exports.
+        CuraApplication.getInstance().ConstructRIT.addListener("jobModeExportProgress", self.exportProgressReceived.emit)
+
         # Register the UI component.
         plugin_path = Application.getInstance().getPluginRegistry().getPluginPath(self.getPluginId())
         if plugin_path is not None:
@@ -21,8 +21,12 @@ def register(app):
     """
 
     try:
+        from ConstructRIT.Util import LazyImport
         from ConstructRIT.Util.AsyncProcedure import AsyncProcedureContext, UIAsyncProcedure
 
+        # Import the payment window before the first export instead of when exporting.
+        LazyImport.preImport(__name__ + ".src.PaymentWindow", __name__ + ".src.ExportInformation")
+
         @UIAsyncProcedure
         def promptPaymentWindow(_, context: AsyncProcedureContext, file_name: str, *args, **kwargs) -> None:
             """Step for prompting a payment window.
@@ -34,11 +38,32 @@ def register(app):
 
             from .src.PaymentWindow import PaymentWindow
             if file_name.endswith(".gcode") or file_name.endswith(".x3g"):
-                window = PaymentWindow(file_name)
-                window.onCompleted.connect(lambda data: context.end(data[0], *args))
+                if app.ConstructRIT.jobModePrintLogger is not None:
+                    # Queue the export without prompting in job mode. The writes are called
+                    # from the queue's worker so they happen in the order they were queued.
+                    from .src.ExportInformation import getExportInformation
+                    getJobModeExportQueue().addExport(getExportInformation(file_name), lambda printLocation: context.endInline(printLocation, *args))
+                else:
+                    window = PaymentWindow(file_name)
+                    window.onCompleted.connect(lambda data: context.end(data[0], *args))
             else:
                 context.end(file_name, *args)
 
+        def getJobModeExportQueue():
+            """Returns the export queue of the current job mode session.
+            """
+
+            from .src.JobModeExportQueue import JobModeExportQueue
+            state = app.ConstructRIT
+            exportQueue = state.jobModeExportQueue
+            if exportQueue is None or exportQueue.printLogger is not state.jobModePrintLogger:
+                if exportQueue is not None:
+                    exportQueue.stop()
+                exportQueue = JobModeExportQueue(state.jobModePrintLogger, lambda progress: state.notifyListeners("jobModeExportProgress", progress))
+                exportQueue.start()
+                state.jobModeExportQueue = exportQueue
+            return exportQueue
+
         def wrapOutputs() -> None:
             """Wraps the output devices.
             """
@@ -51,6 +76,7 @@ def register(app):
                 if outputType not in wrappedOutputDevices and hasattr(outputType, "_performWrite"):
                     outputType._performWrite = UIAsyncProcedure(outputType._performWrite)
                     outputType._performWrite.appendFirst(promptPaymentWindow)
+                    outputType._performWrite.traceName = "export"
                     wrappedOutputDevices.append(outputType)
 
         def init() -> None:
@@ -0,0 +1,67 @@
+"""
+Zachary Cook
+
+Gathers the information of a print being exported.
+"""
+
+import math
+import ntpath
+import os
+from cura.CuraApplication import CuraApplication
+from ConstructRIT import Configuration
+from typing import Dict, Optional
+
+
+def getExportInformation(printLocation: str, printWeight: Optional[float] = None, printTimeHours: Optional[float] = None, printMaterial: Optional[str] = None, printVolume: Optional[str] = None) -> Dict:
+    """Returns the information of the print being exported. Values that aren't specified are
+    read from Cura, so this must be called from the main thread.
+
+    :param printLocation: Location to save the print.
+    :param printWeight: Weight of the print.
+    :param printTimeHours: Duration in hours of the print.
+    :param printMaterial: Material of the print.
+    :param printVolume: Volume of the print.
+    :return: The print location (with the file name truncated if needed), print name, machine name, weight, time, material, and volume.
+    """
+
+    # Set the values from Cura they aren't specified.
+    if printWeight is None:
+        printWeight = 0
+        for weightList in CuraApplication.getInstance().getPrintInformation()._material_weights.values():
+            for weight in weightList:
+                printWeight += weight
+    if printTimeHours is None:
+        printTimeHours = 0
+        for duraction in CuraApplication.getInstance().getPrintInformation()._current_print_time.values():
+            printTimeHours += int(duraction)/(60 * 60)
+    if printMaterial is None:
+        for extruder in CuraApplication.getInstance().getMachineManager()._global_container_stack.extruders.values():
+            printMaterial = extruder.material.getName()
+            break
+    if printVolume is None:
+        app = CuraApplication.getInstance()
+        printVolume = "{:,.1f} (L) x {:,.1f} (W) x {:,.1f} (H)".format(app._scene_bounding_box.width.item(),app._scene_bounding_box.depth.item(),app._scene_bounding_box.height.item())
+
+    # Truncate the file name if it is too long.
+    printName = ntpath.basename(printLocation)
+    directoryLocation = ntpath.dirname(printLocation)
+    curaApplication = CuraApplication.getInstance()
+    if curaApplication is not None:
+        machineName = curaApplication.getMachineManager()._global_container_stack.getName()
+    else:
+        machineName = "[Test Machine]"
+    if machineName in Configuration.MAX_FILE_NAME_LENGTHS.keys() and len(printName) > Configuration.MAX_FILE_NAME_LENGTHS[machineName]:
+        fileTypeIndex = printName.rfind(".")
+        printName = printName[0:Configuration.MAX_FILE_NAME_LENGTHS[machineName] - (len(printName) - fileTypeIndex)] + printName[fileTypeIndex:]
+        printLocation = os.path.join(directoryLocation,printName)
+
+    # Return the information.
+    return {
+        "printLocation": printLocation,
+        "printName": printName,
+        "machineName": machineName,
+        "printWeight": math.ceil(printWeight),
+        "printTimeHours": printTimeHours,
+        "printMaterial": printMaterial,
+        "printVolume": printVolume,
+    }
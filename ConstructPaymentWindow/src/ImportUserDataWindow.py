@@ -1,24 +1,24 @@
 """
 Zachary Cook
 
-Swipe window used to load user data.
+Swipe request used to load user data.
 """
 
 import threading
 import time
 from PyQt5 import QtWidgets, QtCore
-from ConstructRIT.UI.Swipe.SwipeWindow import SwipeWindow
+from ConstructRIT.UI.Swipe.SwipePrompt import SwipeRequest
 from ConstructRIT.Util import Http
 
 
-class ImportUserDataWindow(SwipeWindow):
-    """Window for loading user data.
+class ImportUserDataWindow(SwipeRequest):
+    """Swipe request for loading user data.
     """
 
     onImported = QtCore.pyqtSignal([dict], [type(None)])
 
     def __init__(self):
-        """Creates the user data importer window.
+        """Creates the user data import request and shows the swipe prompt.
         """
 
         super().__init__("Import")
@@ -49,14 +49,14 @@ class ImportUserDataWindow(SwipeWindow):
             self.setLabelText("No information found.")
             self.cancelled = True
             time.sleep(0.5)
-            self.closeThreaded()
             self.onCancelled.emit()
+            self.closeThreaded()
         else:
             self.setLabelText("Information found.")
             self.cancelled = True
             time.sleep(0.5)
-            self.closeThreaded()
             self.onImported.emit(userData)
+            self.closeThreaded()
 
     def importDataIdThreaded(self, universityId: str) -> None:
         """Imports user data in a thread.
@@ -71,7 +71,7 @@ if __name__ == '__main__':
     # Create an app.
     app = QtWidgets.QApplication([])
 
-    # Create a window.
+    # Create a request.
     swipeWindow = ImportUserDataWindow()
 
     # Connect the test events.
@@ -0,0 +1,184 @@
+"""
+Zachary Cook
+
+Queue for exporting prints in job mode without prompting the payment window.
+"""
+
+import queue
+import threading
+import time
+from ConstructRIT.Util import CooldownLedger, Tracing
+from ConstructRIT.Util.BatchPrintLogger import BatchPrintLogger
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# File types that are logged when exported.
+LOGGED_FILE_TYPES = (".gcode", ".x3g")
+
+
+class JobModeExportQueue:
+    """Queue for exporting prints in job mode. Exports are validated and logged in batches
+    by a background worker, and the logged exports are written in the order they were queued.
+    """
+
+    def __init__(self, printLogger: BatchPrintLogger, onProgress: Optional[Callable[[Dict], None]] = None, retryDelays: Tuple[float, ...] = (1.0, 2.0, 4.0)):
+        """Creates the export queue.
+
+        :param printLogger: Print logger of the job mode session.
+        :param onProgress: Function to call with the progress when it changes.
+        :param retryDelays: Seconds to wait before retrying logging when the server can't be reached.
+        """
+
+        self.printLogger = printLogger
+        self.onProgress = onProgress
+        self.retryDelays = retryDelays
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.progress = {"queued": 0, "exported": 0, "failed": 0}
+        self.thread = None
+
+    def start(self) -> None:
+        """Starts the worker for the exports.
+        """
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="JobModeExportQueue", daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stops the worker after the queued exports are completed.
+
+        :param timeout: Maximum seconds to wait for the exports. If None, the worker isn't waited for.
+        """
+
+        if self.thread is not None:
+            self.queue.put(None)
+            if timeout is not None:
+                self.thread.join(timeout)
+            self.thread = None
+
+    def getProgress(self) -> Dict:
+        """Returns the amount of exports queued, exported, failed, and remaining.
+        """
+
+        with self.lock:
+            progress = dict(self.progress)
+        progress["remaining"] = progress["queued"] - progress["exported"] - progress["failed"]
+        return progress
+
+    def _updateProgress(self, name: str) -> None:
+        """Increments a progress count and calls the progress function.
+
+        :param name: Name of the count to increment.
+        """
+
+        with self.lock:
+            self.progress[name] += 1
+        if self.onProgress is not None:
+            self.onProgress(self.getProgress())
+
+    def addExport(self, exportInformation: Dict, write: Callable[[str], None]) -> None:
+        """Queues an export.
+
+        :param exportInformation: Information of the print from getExportInformation.
+        :param write: Function to call with the print location to write the print.
+        """
+
+        self.queue.put((exportInformation, write, Tracing.getCurrentContext()))
+        self._updateProgress("queued")
+
+    def validateExport(self, exportInformation: Dict) -> Optional[str]:
+        """Returns the reason an export can't be logged, or None if it is valid.
+        The output is checked to be writable so prints aren't logged without being written.
+
+        :param exportInformation: Information of the print.
+        """
+
+        if not exportInformation["printLocation"].lower().endswith(LOGGED_FILE_TYPES):
+            return "Unsupported file type."
+        if exportInformation["printWeight"] is None or exportInformation["printWeight"] < 0:
+            return "Invalid print weight."
+        try:
+            open(exportInformation["printLocation"], "w").close()
+        except IOError:
+            return "Can't write file."
+        return None
+
+    def _logBatch(self, recordIds: List[int]) -> None:
+        """Sends the logged prints, retrying if the server can't be reached. Prints that
+        couldn't be sent are cancelled so they aren't logged without being written.
+
+        :param recordIds: Ids of the records of the batch.
+        """
+
+        for retryDelay in self.retryDelays + (None,):
+            try:
+                self.printLogger.flush()
+                return
+            except Exception:
+                if retryDelay is None:
+                    self.printLogger.cancelPending(recordIds)
+                    return
+                time.sleep(retryDelay)
+
+    def _exportBatch(self, batch: List[Tuple[Dict, Callable[[str], None], Optional[Tracing.TraceContext]]]) -> None:
+        """Validates, logs, and writes a batch of exports.
+
+        :param batch: Exports to complete.
+        """
+
+        # Add the valid exports to the log.
+        recordIds = []
+        try:
+            for exportInformation, _, _ in batch:
+                if self.validateExport(exportInformation) is None:
+                    recordIds.append(self.printLogger.addPrint(exportInformation["printName"], exportInformation["printMaterial"], exportInformation["printWeight"], "Job Mode", None, False))
+                else:
+                    recordIds.append(None)
+        except Exception:
+            # Remove the prints of the batch so they aren't sent with a later batch without being written.
+            self.printLogger.cancelPending([recordId for recordId in recordIds if recordId is not None])
+            raise
+        self._logBatch([recordId for recordId in recordIds if recordId is not None])
+
+        # Write the logged exports in order.
+        ledger = CooldownLedger.getLedger()
+        for (exportInformation, write, traceContext), recordId in zip(batch, recordIds):
+            if recordId is None or not self.printLogger.getAcknowledgement(recordId):
+                self._updateProgress("failed")
+                continue
+            ledger.recordPrint(self.printLogger.email, exportInformation["printWeight"])
+            with Tracing.useContext(traceContext):
+                write(exportInformation["printLocation"])
+            self._updateProgress("exported")
+
+    def _run(self) -> None:
+        """Completes the queued exports until stopped.
+        """
+
+        stopped = False
+        while not stopped:
+            # Wait for an export and add the other queued exports to the batch.
+            export = self.queue.get()
+            if export is None:
+                break
+            batch = [export]
+            while len(batch) < self.printLogger.batchSize:
+                try:
+                    export = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if export is None:
+                    stopped = True
+                    break
+                batch.append(export)
+
+            # Complete the batch, and fail the rest of the batch if completing it fails so the worker keeps running.
+            progress = self.getProgress()
+            try:
+                self._exportBatch(batch)
+            except Exception:
+                newProgress = self.getProgress()
+                completedCount = newProgress["exported"] + newProgress["failed"] - progress["exported"] - progress["failed"]
+                for _ in range(len(batch) - completedCount):
+                    self._updateProgress("failed")
@@ -4,9 +4,6 @@ Zachary Cook
 Prompt for user information.
 """
 
-import math
-import ntpath
-import os
 import threading
 import time
 from PyQt5 import QtWidgets,QtCore
@@ -14,9 +11,10 @@ from cura.CuraApplication import CuraApplication
 from ConstructRIT import Configuration
 from ConstructRIT.UI.ThreadedMainWindow import ThreadedMainWindow, ThreadedOperation
 from ConstructRIT.UI.Swipe.LabManagerAuthenticationWindow import LabManagerAuthenticationWindow
-from ConstructRIT.Util import Http
+from ConstructRIT.Util import CooldownLedger, Http, Tracing, UserIndex, Usernames
 from ConstructRIT.Util.AsyncProcedure import AsyncProcedureContext, AsyncProcedure, UIAsyncProcedure
 from typing import Optional
+from .ExportInformation import getExportInformation
 from .ImportUserDataWindow import ImportUserDataWindow
 from .PrintTimeUtil import getPrintLengthError, getLastPrintTimeError
 
@@ -40,41 +38,20 @@ class PaymentWindow(ThreadedMainWindow):
         """
 
         super().__init__()
-
-        # Set the values from Cura they aren't specified.
-        if printWeight is None:
-            printWeight = 0
-            for weightList in CuraApplication.getInstance().getPrintInformation()._material_weights.values():
-                for weight in weightList:
-                    printWeight += weight
-        if printTimeHours is None:
-            printTimeHours = 0
-            for duraction in CuraApplication.getInstance().getPrintInformation()._current_print_time.values():
-                printTimeHours += int(duraction)/(60 * 60)
-        if printMaterial is None:
-            for extruder in CuraApplication.getInstance().getMachineManager()._global_container_stack.extruders.values():
-                printMaterial = extruder.material.getName()
-                break
-        if printVolume is None:
-            app = CuraApplication.getInstance()
-            printVolume = "{:,.1f} (L) x {:,.1f} (W) x {:,.1f} (H)".format(app._scene_bounding_box.width.item(),app._scene_bounding_box.depth.item(),app._scene_bounding_box.height.item())
-
-        # Truncate the file name if it is too long.
-        printName = ntpath.basename(printLocation)
-        directoryLocation = ntpath.dirname(printLocation)
-        curaApplication = CuraApplication.getInstance()
-        if curaApplication is not None:
-            machineName = curaApplication.getMachineManager()._global_container_stack.getName()
-        else:
-            machineName = "[Test Machine]"
-        if machineName in Configuration.MAX_FILE_NAME_LENGTHS.keys() and len(printName) > Configuration.MAX_FILE_NAME_LENGTHS[machineName]:
-            fileTypeIndex = printName.rfind(".")
-            printName = printName[0:Configuration.MAX_FILE_NAME_LENGTHS[machineName] - (len(printName) - fileTypeIndex)] + printName[fileTypeIndex:]
-            printLocation = os.path.join(directoryLocation,printName)
+        configuration = Configuration.current
+
+        # Get the information of the print.
+        exportInformation = getExportInformation(printLocation, printWeight, printTimeHours, printMaterial, printVolume)
+        printLocation = exportInformation["printLocation"]
+        printName = exportInformation["printName"]
+        machineName = exportInformation["machineName"]
+        printWeight = exportInformation["printWeight"]
+        printTimeHours = exportInformation["printTimeHours"]
+        printMaterial = exportInformation["printMaterial"]
+        printVolume = exportInformation["printVolume"]
         self.fileLocation = printLocation
 
         # Get the print weight as a string.
-        printWeight = math.ceil(printWeight)
         if printWeight == 1:
             printWeightString = "1 gram"
         else:
@@ -87,11 +64,12 @@ class PaymentWindow(ThreadedMainWindow):
         self.printWeight = printWeight
         self.printTimeHours = printTimeHours
         self.printMaterial = printMaterial
-        self.printCost = printWeight * Configuration.PRINT_COST_PER_GRAM
+        self.printCost = printWeight * configuration.PRINT_COST_PER_GRAM
         self.formattedPrintCost = "${:,.2f}".format(self.printCost)
         self.printVolume = printVolume
         self.ignorePayment = False
         self.ignoreTime = False
+        self.traceContext = Tracing.getCurrentContext()
 
         # Set the window properties.
         initialSizeX, initialSizeY = 500, 420
@@ -142,9 +120,16 @@ class PaymentWindow(ThreadedMainWindow):
         self.emailField = QtWidgets.QLineEdit()
         self.emailField.setStyleSheet("QLineEdit {font-size: 14px}")
         self.emailField.setFixedSize(300, 26)
-        if Configuration.DISABLE_MANUALLY_ENTERING_EMAIL:
+        if configuration.DISABLE_MANUALLY_ENTERING_EMAIL:
             self.emailField.setStyleSheet("QLineEdit {font-size: 14px; background-color: #DDDDDD;}")
             self.emailField.setReadOnly(True)
+        else:
+            # Complete the usernames of the known users as they are typed.
+            self.emailCompletions = QtCore.QStringListModel()
+            emailCompleter = QtWidgets.QCompleter(self.emailCompletions, self.emailField)
+            emailCompleter.setCompletionMode(QtWidgets.QCompleter.UnfilteredPopupCompletion)
+            self.emailField.setCompleter(emailCompleter)
+            self.emailField.textEdited.connect(self.emailEdited)
         emailFieldLayout.addWidget(self.emailField)
 
         self.printPurposeLabel = QtWidgets.QLabel("Print Purpose?")
@@ -156,7 +141,7 @@ class PaymentWindow(ThreadedMainWindow):
         self.printPurposeField.setStyleSheet("QLineEdit {font-size: 14px}")
         self.printPurposeField.setFixedSize(300, 26)
         self.printPurposeField.addItem("Please Select...")
-        for entry in Configuration.NORMAL_PRINT_PURPOSES:
+        for entry in configuration.NORMAL_PRINT_PURPOSES:
             self.printPurposeField.addItem(entry)
         printPurposeLayout.addWidget(self.printPurposeField)
         self.additionalPrintPurposesAdded = False
@@ -239,7 +224,7 @@ class PaymentWindow(ThreadedMainWindow):
             self.printPurposeField.setCurrentText("Job Mode")
         else:
             # Display an initial error if the print time is too long.
-            printTimeError = getPrintLengthError(printTimeHours)
+            printTimeError = getPrintLengthError(printTimeHours, machineName)
             if printTimeError is not None:
                 self.setErrorMessage(printTimeError)
 
@@ -253,43 +238,25 @@ class PaymentWindow(ThreadedMainWindow):
         :return: The valid RIT email, if any.
         """
 
-        currentEmail = self.emailField.text().lower().strip()
+        return Usernames.normalizeEmail(self.emailField.text())
 
-        # Cut off email domain. Return none if email isn't "@rit.edu" or "@g.rit.edu"
-        domainLocation = currentEmail.find("@")
-        if domainLocation != -1:
-            domain = currentEmail[domainLocation:]
-            currentEmail = currentEmail[0:domainLocation]
-            if domain != "@rit.edu" and domain != "@g.rit.edu" and domain != "@mail.rit.edu":
-                return None
-
-        # Return if invalid character.
-        for character in currentEmail:
-            characterNum = ord(character)
-            if characterNum < 43 or (characterNum >= 58 and characterNum <= 65) or (characterNum >= 91 and characterNum <= 96 and characterNum != 95) or characterNum >= 123:
-                return None
-
-        # Return if empty.
-        if currentEmail == "":
-            return None
+    def emailEdited(self, text: str) -> None:
+        """Validates the email and completes the username as it is typed.
 
-        # Remove @g.rit.edu
-        emailIndex = currentEmail.find("@g.rit.edu")
-        if emailIndex > -1:
-            currentEmail = currentEmail[0:emailIndex]
-
-        # Remove @mail.rit.edu
-        emailIndex = currentEmail.find("@mail.rit.edu")
-        if emailIndex > -1:
-            currentEmail = currentEmail[0:emailIndex]
+        :param text: Text entered in the email field.
+        """
 
-        # Add @rit.edu
-        emailIndex = currentEmail.find("@rit.edu")
-        if emailIndex == -1:
-            currentEmail += "@rit.edu"
+        # Show the email as invalid if typing more can't make it valid.
+        validPrefix = Usernames.isEmailPrefix(text)
+        self.emailLabel.setStyleSheet("QLabel {font-weight: 700; font-size: 14px;}" if validPrefix else "QLabel {font-weight: 700; font-size: 14px; color: #FF0000;}")
 
-        # Return the email (valid).
-        return currentEmail
+        # Show the known usernames starting with the username being typed.
+        usernameIndex = UserIndex.getIndex().usernameIndex
+        username = text.lower().strip()
+        if usernameIndex is not None and validPrefix and username != "" and "@" not in username:
+            self.emailCompletions.setStringList(usernameIndex.getCompletions(username, Configuration.current.EMAIL_COMPLETION_SIZE))
+        else:
+            self.emailCompletions.setStringList([])
 
     def getValidMSDNumber(self) -> Optional[str]:
         """Returns the MSD number entered, or an empty string.
@@ -364,8 +331,8 @@ class PaymentWindow(ThreadedMainWindow):
         """Closes the window.
         """
 
-        self.runThreadedOperation(super().close)
         self.onClose.emit()
+        self.runThreadedOperation(super().close)
 
     def cancelPayment(self, event) -> None:
         """Cancels the payment.
@@ -380,7 +347,10 @@ class PaymentWindow(ThreadedMainWindow):
         # Log the print.
         try:
             self.setStatusMessage("Logging print...")
-            Http.LogPrint(self.getValidEmail(), self.printName, self.printMaterial, self.printWeight, self.printPurposeField.currentText(), self.getValidMSDNumber(), not self.ignorePayment)
+            with Tracing.Span("logPrint", self.traceContext):
+                email = self.getValidEmail()
+                if Http.LogPrint(email, self.printName, self.printMaterial, self.printWeight, self.printPurposeField.currentText(), self.getValidMSDNumber(), not self.ignorePayment, CuraApplication.getInstance().ConstructRIT.currentJobModeUser):
+                    CooldownLedger.getLedger().recordPrint(email, self.printWeight)
         except IOError as error:
             if "[Errno socket error]" in str(error):
                 self.setErrorMessage("An error occurred logging print. (Server can't be reached)")
@@ -403,7 +373,7 @@ class PaymentWindow(ThreadedMainWindow):
         self.setStatusMessage("Please wait...")
 
         # Display an initial error if the print time is too long.
-        printTimeError = getPrintLengthError(self.printTimeHours)
+        printTimeError = getPrintLengthError(self.printTimeHours, self.machineName)
         if printTimeError is not None and not self.ignoreTime:
             self.setErrorMessage(printTimeError)
             self.showButtons()
@@ -443,8 +413,9 @@ class PaymentWindow(ThreadedMainWindow):
         newTransaction = self.currentTransaction + 1
         self.currentTransaction = newTransaction
 
-        # Start the submit states so that the UI gets updated.
-        self.startWriteCheck()
+        # Start the submit states in the export's trace so that the UI gets updated.
+        with Tracing.useContext(self.traceContext):
+            self.startWriteCheck()
 
     @AsyncProcedure
     def startWriteCheck(self, routineContext: AsyncProcedureContext) -> None:
@@ -482,10 +453,10 @@ class PaymentWindow(ThreadedMainWindow):
         :param routineContext: Routine context for calling steps.
         """
 
-        # Check if registration is required and if the email is registered.
+        # Check if registration is required and if the email is registered, using the local index if it is recent enough.
         try:
             email = self.getValidEmail()
-            if Http.getUniversityIdHash(email) is None:
+            if UserIndex.getIndex().getUniversityIdHash(email, CuraApplication.getInstance().ConstructRIT.currentJobModeUser) is None:
                 routineContext.next(False, "Your email isn't registered. Please swipe in the main lab to continue.")
                 return
         except IOError as error:
@@ -605,9 +576,10 @@ class PaymentWindow(ThreadedMainWindow):
 
         if not self.additionalPrintPurposesAdded:
             self.additionalPrintPurposesAdded = True
-            if Configuration.RESET_PRINT_PURPOSE_ON_IGNORE:
+            configuration = Configuration.current
+            if configuration.RESET_PRINT_PURPOSE_ON_IGNORE:
                 self.printPurposeField.setCurrentText("Please Select...")
-            for additionalPurpose in Configuration.IGNORED_PAYMENT_ADDITIONAL_PRINT_PURPOSES:
+            for additionalPurpose in configuration.IGNORED_PAYMENT_ADDITIONAL_PRINT_PURPOSES:
                 self.printPurposeField.addItem(additionalPurpose)
 
         self.ignorePayment = True
@@ -0,0 +1,228 @@
+"""
+Zachary Cook
+
+Evaluates variants of the print time limits and cooldown over logs of past prints.
+Run with Benchmarks/PolicyBacktest.py.
+"""
+
+import csv
+import datetime
+import json
+import time
+import numpy
+from ConstructRIT import Configuration
+from ConstructRIT.Util.AuthorizationPolicy import NameMatcher
+from typing import Dict, List
+
+
+# Configuration values that can be changed by the variants.
+VARIANT_NAMES = ["PRINTER_TIME_LIMITS", "PRINTER_TIME_LIMIT_HOLIDAYS", "PRINT_COOLDOWN_BASE_MINUTES", "PRINT_COOLDOWN_MINUTES_PER_LOG_GRAM"]
+
+
+class PrintLog:
+    """Columns of a log of past prints.
+    """
+
+    def __init__(self, records: List[Dict]):
+        """Creates the print log.
+
+        :param records: Prints with a hashedId, timeStamp, weight, and optionally printHours and printer.
+        """
+
+        # Store the numeric columns.
+        self.size = len(records)
+        self.timeStamps = numpy.fromiter((float(record["timeStamp"]) for record in records), numpy.float64, self.size)
+        self.weights = numpy.fromiter((float(record["weight"] or 0) for record in records), numpy.float64, self.size)
+        self.printHours = numpy.fromiter((float(record.get("printHours") or 0) for record in records), numpy.float64, self.size)
+
+        # Store the users and printers as indices of the unique values.
+        self.userNames, self.users = numpy.unique(numpy.array([str(record["hashedId"]) for record in records], dtype=object), return_inverse=True)
+        self.printerNames, self.printers = numpy.unique(numpy.array([str(record.get("printer") or "") for record in records], dtype=object), return_inverse=True)
+
+        # Store the local times of the prints. The minute of the day drops the seconds to match the print time limits.
+        localTimes = [datetime.datetime.fromtimestamp(timeStamp) for timeStamp in self.timeStamps.tolist()]
+        self.minutes = numpy.fromiter((localTime.hour * 60 + localTime.minute for localTime in localTimes), numpy.int32, self.size)
+        self.weekdays = numpy.fromiter((localTime.weekday() for localTime in localTimes), numpy.int8, self.size)
+        self.dates = numpy.fromiter((localTime.toordinal() for localTime in localTimes), numpy.int32, self.size)
+
+        # Store the order of the prints by user and time for finding the previous print of each user.
+        self.order = numpy.lexsort((self.timeStamps, self.users))
+
+
+def loadPrintLog(path: str) -> PrintLog:
+    """Loads a print log from a CSV or JSONL file.
+
+    :param path: Path of the print log.
+    """
+
+    with open(path, newline="") as file:
+        if path.lower().endswith(".csv"):
+            records = list(csv.DictReader(file))
+        else:
+            records = [json.loads(line) for line in file if line.strip() != ""]
+    return PrintLog(records)
+
+
+def getTimeLimits(printLog: PrintLog, limits: List[Dict], holidays: List[str]) -> numpy.ndarray:
+    """Returns the print time limit in hours at the time of each print, or NaN if there is no limit.
+
+    :param printLog: Prints to evaluate.
+    :param limits: Print time limits (PRINTER_TIME_LIMITS).
+    :param holidays: Holiday dates (PRINTER_TIME_LIMIT_HOLIDAYS).
+    """
+
+    # Apply the limits from last to first so the first matching limit is used.
+    timeLimits = numpy.full(printLog.size, numpy.nan)
+    isHoliday = numpy.isin(printLog.dates, [datetime.date.fromisoformat(holiday).toordinal() for holiday in holidays])
+    for limit in reversed(limits):
+        applies = (limit["startHour"] * 60 <= printLog.minutes) & (limit["endHour"] * 60 > printLog.minutes)
+        if limit.get("days") is not None:
+            applies &= numpy.isin(printLog.weekdays, list(limit["days"]))
+        if limit.get("holidays") is not None:
+            applies &= isHoliday == bool(limit["holidays"])
+        if limit.get("printers") is not None:
+            printerMatcher = NameMatcher(list(limit["printers"]))
+            applies &= numpy.array([printerMatcher.matches(printerName or None) for printerName in printLog.printerNames], dtype=bool)[printLog.printers]
+        timeLimits[applies] = limit["printHoursLimit"]
+    return timeLimits
+
+
+def getTimeLimitBlocked(printLog: PrintLog, limits: List[Dict], holidays: List[str]) -> numpy.ndarray:
+    """Returns which prints are longer than the print time limit.
+
+    :param printLog: Prints to evaluate.
+    :param limits: Print time limits (PRINTER_TIME_LIMITS).
+    :param holidays: Holiday dates (PRINTER_TIME_LIMIT_HOLIDAYS).
+    """
+
+    timeLimits = getTimeLimits(printLog, limits, holidays)
+    return ~numpy.isnan(timeLimits) & (printLog.printHours > numpy.nan_to_num(timeLimits, nan=numpy.inf))
+
+
+def getCooldownSeconds(weights: numpy.ndarray, baseMinutes: float, minutesPerLogGram: float) -> numpy.ndarray:
+    """Returns the seconds a user must wait after prints before printing again.
+
+    :param weights: Weights of the prints in grams.
+    :param baseMinutes: Base cooldown (PRINT_COOLDOWN_BASE_MINUTES).
+    :param minutesPerLogGram: Cooldown per natural log of the weight (PRINT_COOLDOWN_MINUTES_PER_LOG_GRAM).
+    """
+
+    positiveWeights = weights > 0
+    logWeights = numpy.log(numpy.where(positiveWeights, weights, 1.0))
+    return numpy.where(positiveWeights, ((logWeights * minutesPerLogGram) + baseMinutes) * 60, 0.0)
+
+
+def getCooldownBlocked(printLog: PrintLog, baseMinutes: float, minutesPerLogGram: float) -> numpy.ndarray:
+    """Returns which prints were started before the cooldown of the user's previous print ended.
+    The log is used as-is, so prints that would have been blocked still start cooldowns.
+
+    :param printLog: Prints to evaluate.
+    :param baseMinutes: Base cooldown (PRINT_COOLDOWN_BASE_MINUTES).
+    :param minutesPerLogGram: Cooldown per natural log of the weight (PRINT_COOLDOWN_MINUTES_PER_LOG_GRAM).
+    """
+
+    # Compare each print to the user's previous print.
+    order = printLog.order
+    sortedTimes = printLog.timeStamps[order]
+    sortedUsers = printLog.users[order]
+    cooldowns = getCooldownSeconds(printLog.weights[order], baseMinutes, minutesPerLogGram)
+    sortedBlocked = numpy.zeros(printLog.size, dtype=bool)
+    sortedBlocked[1:] = (sortedUsers[1:] == sortedUsers[:-1]) & (sortedTimes[1:] - sortedTimes[:-1] < cooldowns[:-1])
+
+    # Return the results in the order of the log.
+    blocked = numpy.empty(printLog.size, dtype=bool)
+    blocked[order] = sortedBlocked
+    return blocked
+
+
+def evaluateVariant(printLog: PrintLog, variant: Dict) -> Dict:
+    """Evaluates a variant of the configuration over a print log.
+
+    :param printLog: Prints to evaluate.
+    :param variant: Configuration values to replace.
+    :return: The amount of prints blocked by the time limits, the cooldown, and either.
+    """
+
+    values = {name: variant.get(name, getattr(Configuration.current, name)) for name in VARIANT_NAMES}
+    startTime = time.perf_counter()
+    timeLimitBlocked = getTimeLimitBlocked(printLog, values["PRINTER_TIME_LIMITS"], values["PRINTER_TIME_LIMIT_HOLIDAYS"])
+    cooldownBlocked = getCooldownBlocked(printLog, values["PRINT_COOLDOWN_BASE_MINUTES"], values["PRINT_COOLDOWN_MINUTES_PER_LOG_GRAM"])
+    return {
+        "name": variant.get("name", "Current"),
+        "prints": printLog.size,
+        "timeLimitBlocked": int(timeLimitBlocked.sum()),
+        "cooldownBlocked": int(cooldownBlocked.sum()),
+        "blocked": int((timeLimitBlocked | cooldownBlocked).sum()),
+        "duration": time.perf_counter() - startTime,
+    }
+
+
+def createSyntheticRecords(size: int, users: int = 2000, seed: int = 0) -> List[Dict]:
+    """Returns a synthetic print log for benchmarking.
+
+    :param size: Amount of prints.
+    :param users: Amount of users.
+    :param seed: Seed of the random values.
+    """
+
+    random = numpy.random.default_rng(seed)
+    startTime = datetime.datetime(2026, 1, 5).timestamp()
+    timeStamps = startTime + random.uniform(0, 180 * 24 * 60 * 60, size)
+    weights = random.lognormal(3, 1, size)
+    printHours = random.lognormal(1, 0.8, size)
+    userIds = random.integers(0, users, size)
+    printerNames = ["Prusa i3 Mk3/Mk3s", "Artillery Sidewinder X1", "Ultimaker S5", ""]
+    printers = random.integers(0, len(printerNames), size)
+    return [{
+        "hashedId": "user_" + str(userIds[i]),
+        "timeStamp": float(timeStamps[i]),
+        "weight": float(weights[i]),
+        "printHours": float(printHours[i]),
+        "printer": printerNames[printers[i]],
+    } for i in range(size)]
+
+
+def verifyAgainstScalar(printLog: PrintLog, variant: Dict, samples: int = 2000) -> int:
+    """Compares the evaluation to the print length and last print checks of the payment window
+    for a sample of the prints. The checks are given the values of the variant instead of
+    reading the current configuration. Raises an AssertionError if any differ.
+
+    :param printLog: Prints to evaluate.
+    :param variant: Configuration values to replace.
+    :param samples: Amount of prints to compare.
+    :return: The amount of prints compared.
+    """
+
+    from ConstructRIT.Util.CooldownLedger import CooldownLedger
+    from .PrintTimeUtil import getLastPrintTimeError, getPrintLengthError
+    from .TimeLimitSchedule import TimeLimitSchedule
+
+    # Evaluate the prints.
+    values = {name: variant.get(name, getattr(Configuration.current, name)) for name in VARIANT_NAMES}
+    configuration = Configuration.ConfigurationSnapshot(dict(Configuration.current.getValues(), **values))
+    timeLimitBlocked = getTimeLimitBlocked(printLog, values["PRINTER_TIME_LIMITS"], values["PRINTER_TIME_LIMIT_HOLIDAYS"])
+    cooldownBlocked = getCooldownBlocked(printLog, values["PRINT_COOLDOWN_BASE_MINUTES"], values["PRINT_COOLDOWN_MINUTES_PER_LOG_GRAM"])
+
+    # Determine the previous print of each print.
+    previousPrints = numpy.full(printLog.size, -1)
+    order = printLog.order
+    sameUser = printLog.users[order][1:] == printLog.users[order][:-1]
+    previousPrints[order[1:][sameUser]] = order[:-1][sameUser]
+
+    # Compare a sample of the prints to the checks of the payment window.
+    for i in numpy.random.default_rng(1).choice(printLog.size, min(samples, printLog.size), replace=False).tolist():
+        printTime = float(printLog.timeStamps[i])
+        printerName = printLog.printerNames[printLog.printers[i]] or None
+
+        # Compare the time limit.
+        schedule = TimeLimitSchedule(values["PRINTER_TIME_LIMITS"], values["PRINTER_TIME_LIMIT_HOLIDAYS"], lambda: datetime.datetime.fromtimestamp(printTime))
+        if (getPrintLengthError(float(printLog.printHours[i]), printerName, schedule) is not None) != bool(timeLimitBlocked[i]):
+            raise AssertionError("Time limit mismatch for print " + str(i) + ".")
+
+        # Compare the cooldown.
+        previousPrint = previousPrints[i]
+        lastPrint = (None, None) if previousPrint < 0 else (float(printLog.timeStamps[previousPrint]), float(printLog.weights[previousPrint]))
+        ledger = CooldownLedger(lambda email: lastPrint, lambda: printTime, configuration)
+        if (getLastPrintTimeError("user@rit.edu", ledger) is not None) != bool(cooldownBlocked[i]):
+            raise AssertionError("Cooldown mismatch for print " + str(i) + ".")
+    return min(samples, printLog.size)
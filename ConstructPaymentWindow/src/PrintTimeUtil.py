@@ -4,86 +4,51 @@ Zachary Cook
 Utility for getting information based on print time.
 """
 
-import datetime
-import math
-from ConstructRIT import Configuration
-from ConstructRIT.Util import Http
+from ConstructRIT.Util import CooldownLedger
+from . import TimeLimitSchedule
 from typing import Optional
 
 
-def getCurrentHour() -> float:
-    """Returns the current hour of the system.
-
-    :return: The current hour of system.
-    """
-
-    currentTime = datetime.datetime.now()
-    currentHour = currentTime.hour
-    currentHour += (currentTime.minute / 60.0)
-
-    return currentHour
-
-
-def getLastPrintTimeError(email: str) -> Optional[str]:
+def getLastPrintTimeError(email: str, ledger: Optional[CooldownLedger.CooldownLedger] = None) -> Optional[str]:
     """Returns a message as a String determining if the last print is
     old enough to print again. If the print is old enough, None
     is returned.
 
     :param email: The email to check with.
+    :param ledger: Ledger to check the cooldown with. If None, the shared ledger is used.
     :return: The error to display if the last print was too recent.
     """
 
-    lastPrintTime, lastPrintWeight = Http.getLastPrint(email)
-
-    # If there is no last print timestamp, return true.
-    if lastPrintTime is None or lastPrintWeight is None or lastPrintWeight <= 0:
-        return None
-
-    # Get the time difference.
-    date = datetime.datetime.utcnow()
-    currentTimestamp = (date - datetime.datetime(1970,1,1)).total_seconds()
-    deltaTime = currentTimestamp - lastPrintTime
-
-    # Return an error if the print is too recent.
-    requiredTime = ((math.log(lastPrintWeight) * 8) + 8) * 60
-    if deltaTime < requiredTime:
+    # Return an error if the user is cooling down from their last print.
+    if (ledger or CooldownLedger.getLedger()).isCoolingDown(email):
         return "Your last print was too recent. Make sure you are using only 1 printer."
 
     # Return None (no error).
     return None
 
 
-def getCurrentTimeLimit() -> (Optional[float], Optional[float]):
+def getCurrentTimeLimit(printerName: Optional[str] = None, schedule: Optional[TimeLimitSchedule.TimeLimitSchedule] = None) -> (Optional[float], Optional[float]):
     """Returns the current time limit and when the time limit ends.
     If there is no current limit, None and None are returned.
 
+    :param printerName: Name of the printer to get the limit for.
+    :param schedule: Schedule to get the limit from. If None, the schedule of the configuration is used.
     :return: The current time limit in hours, and the hour that the limit ends.
     """
 
-    currentHour = getCurrentHour()
-
-    # Iterate through the hour limits.
-    for limit in Configuration.PRINTER_TIME_LIMITS:
-        startHour = limit["startHour"]
-        endHour = limit["endHour"]
-        hourLimit = limit["printHoursLimit"]
-
-        # If the current time is within the range, return the time and the end time.
-        if startHour <= currentHour and endHour > currentHour:
-            return hourLimit, endHour
-
-    # Return None and None (no limit)
-    return None, None
+    return (schedule or TimeLimitSchedule.getSchedule()).getCurrentTimeLimit(printerName)
 
 
-def getPrintLengthError(printHours: float) -> Optional[str]:
+def getPrintLengthError(printHours: float, printerName: Optional[str] = None, schedule: Optional[TimeLimitSchedule.TimeLimitSchedule] = None) -> Optional[str]:
     """Returns a warning message if the print is too long.
 
     :param printHours: Total hours the print will take.
+    :param printerName: Name of the printer to check the limit for.
+    :param schedule: Schedule to check the limit with. If None, the schedule of the configuration is used.
     :return: The message to display if the print is too long.
     """
 
-    currentLimit, limitEnds = getCurrentTimeLimit()
+    currentLimit, limitEnds = getCurrentTimeLimit(printerName, schedule)
 
     if currentLimit is not None and limitEnds is not None and printHours > currentLimit:
         currentLimit = int(currentLimit)
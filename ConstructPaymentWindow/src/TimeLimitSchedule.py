@@ -0,0 +1,190 @@
+"""
+Zachary Cook
+
+Schedule of the print time limits.
+"""
+
+import bisect
+import datetime
+from ConstructRIT import Configuration
+from ConstructRIT.Util.AuthorizationPolicy import NameMatcher
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Minutes in a day.
+MINUTES_PER_DAY = 24 * 60
+
+
+class TimeLimitRule:
+    """Configured print time limit.
+    """
+
+    def __init__(self, limit: Dict):
+        """Creates the time limit rule.
+
+        :param limit: Configured time limit.
+        """
+
+        self.printHoursLimit = limit["printHoursLimit"]
+        self.startHour = limit["startHour"]
+        self.endHour = limit["endHour"]
+        self.days = None if limit.get("days") is None else frozenset(limit["days"])
+        self.holidays = limit.get("holidays")
+        self.printers = NameMatcher(limit.get("printers"))
+
+    def appliesTo(self, printer: Optional[str], weekday: int, holiday: bool) -> bool:
+        """Returns if the rule applies to a printer on a type of day.
+
+        :param printer: Name of the printer. If None, only rules for all printers apply.
+        :param weekday: Day of the week (0 is Monday).
+        :param holiday: Whether the day is a holiday.
+        """
+
+        if self.days is not None and weekday not in self.days:
+            return False
+        if self.holidays is not None and self.holidays != holiday:
+            return False
+        return self.printers.matches(printer)
+
+
+class TimeLimitTable:
+    """Sorted table of the time limits during a type of day.
+    """
+
+    def __init__(self, rules: List[TimeLimitRule]):
+        """Creates the table. The first rule that covers a time is used, matching the order of the configuration.
+
+        :param rules: Rules that apply to the type of day.
+        """
+
+        # Determine the boundaries of the intervals.
+        boundaries = {0, MINUTES_PER_DAY}
+        for rule in rules:
+            for hour in (rule.startHour, rule.endHour):
+                boundaries.add(min(max(hour * 60, 0), MINUTES_PER_DAY))
+        boundaries = sorted(boundaries)
+
+        # Determine the limit of each interval, merging intervals with the same limit.
+        self.starts = []
+        self.intervals = []
+        for startMinute, endMinute in zip(boundaries[:-1], boundaries[1:]):
+            activeRule = None
+            for rule in rules:
+                if rule.startHour * 60 <= startMinute and rule.endHour * 60 >= endMinute:
+                    activeRule = rule
+                    break
+            limit = (None, None) if activeRule is None else (activeRule.printHoursLimit, activeRule.endHour)
+            if len(self.intervals) > 0 and self.intervals[-1][2] == limit:
+                self.intervals[-1] = (self.intervals[-1][0], endMinute, limit)
+            else:
+                self.starts.append(startMinute)
+                self.intervals.append((startMinute, endMinute, limit))
+
+    def getInterval(self, minute: float) -> Tuple[float, float, Tuple[Optional[float], Optional[float]]]:
+        """Returns the interval containing a minute of the day.
+
+        :param minute: Minute of the day.
+        :return: The start minute, end minute, and the limit and limit end hour of the interval.
+        """
+
+        return self.intervals[bisect.bisect_right(self.starts, minute) - 1]
+
+
+class TimeLimitSchedule:
+    """Schedule of the print time limits. Limits are compiled into sorted tables for each printer
+    and type of day, and the current limit is cached until the next boundary.
+    """
+
+    def __init__(self, limits: List[Dict], holidays: List[str], clock: Callable[[], datetime.datetime] = datetime.datetime.now):
+        """Creates the schedule.
+
+        :param limits: Configured time limits.
+        :param holidays: Dates of the holidays ("YYYY-MM-DD").
+        :param clock: Function that returns the current local time.
+        """
+
+        self.rules = [TimeLimitRule(limit) for limit in limits]
+        self.holidays = set(datetime.date.fromisoformat(holiday) for holiday in holidays)
+        self.clock = clock
+        self.tables = {}
+        self.cachedWindows = {}
+
+    def getTable(self, printer: Optional[str], date: datetime.date) -> TimeLimitTable:
+        """Returns the table of the time limits for a printer on a date.
+
+        :param printer: Name of the printer.
+        :param date: Date to get the table for.
+        """
+
+        key = (printer, date.weekday(), date in self.holidays)
+        table = self.tables.get(key)
+        if table is None:
+            table = TimeLimitTable([rule for rule in self.rules if rule.appliesTo(*key)])
+            self.tables[key] = table
+        return table
+
+    def getWindow(self, printer: Optional[str], time: datetime.datetime) -> Tuple[datetime.datetime, datetime.datetime, Tuple[Optional[float], Optional[float]]]:
+        """Returns the window of time with the same time limit.
+
+        :param printer: Name of the printer.
+        :param time: Time in the window.
+        :return: The start and end of the window, and the limit and limit end hour.
+        """
+
+        midnight = datetime.datetime.combine(time.date(), datetime.time(), time.tzinfo)
+        startMinute, endMinute, limit = self.getTable(printer, time.date()).getInterval(time.hour * 60 + time.minute)
+        return midnight + datetime.timedelta(minutes=startMinute), midnight + datetime.timedelta(minutes=endMinute), limit
+
+    def getCurrentTimeLimit(self, printer: Optional[str] = None) -> Tuple[Optional[float], Optional[float]]:
+        """Returns the current time limit and when the time limit ends.
+        If there is no current limit, None and None are returned.
+
+        :param printer: Name of the printer.
+        :return: The current time limit in hours, and the hour that the limit ends.
+        """
+
+        # Return the cached limit if the boundary hasn't passed.
+        currentTime = self.clock()
+        cachedWindow = self.cachedWindows.get(printer)
+        if cachedWindow is not None and cachedWindow[0] <= currentTime < cachedWindow[1]:
+            return cachedWindow[2]
+
+        # Determine and cache the limit.
+        cachedWindow = self.getWindow(printer, currentTime)
+        self.cachedWindows[printer] = cachedWindow
+        return cachedWindow[2]
+
+    def getNextChange(self, printer: Optional[str] = None, maxDays: int = 8) -> Optional[datetime.datetime]:
+        """Returns when the time limit next changes, or None if it doesn't change within the max days.
+
+        :param printer: Name of the printer.
+        :param maxDays: Maximum days to search for a change.
+        """
+
+        currentTime = self.clock()
+        _, windowEnd, limit = self.getWindow(printer, currentTime)
+        searchEnd = currentTime + datetime.timedelta(days=maxDays)
+        while windowEnd < searchEnd:
+            _, nextWindowEnd, nextLimit = self.getWindow(printer, windowEnd)
+            if nextLimit != limit:
+                return windowEnd
+            windowEnd = nextWindowEnd
+        return None
+
+
+# Schedule compiled from the configuration and the configuration it was compiled from.
+_schedule = None
+_scheduleConfiguration = None
+
+
+def getSchedule() -> TimeLimitSchedule:
+    """Returns the schedule compiled from the configuration. The schedule is
+    compiled again if the configuration was reloaded.
+    """
+
+    global _schedule, _scheduleConfiguration
+    configuration = Configuration.current
+    if _schedule is None or _scheduleConfiguration is not configuration:
+        _schedule = TimeLimitSchedule(configuration.PRINTER_TIME_LIMITS, configuration.PRINTER_TIME_LIMIT_HOLIDAYS)
+        _scheduleConfiguration = configuration
+    return _schedule
@@ -4,7 +4,7 @@ Zachary Cook
 Monitors the changes to machines and materials of Cura.
 """
 
-from ConstructRIT import Configuration
+from ConstructRIT.Util import AuthorizationPolicy
 from ConstructRIT.UI.Swipe.LabManagerAuthenticationWindow import LabManagerAuthenticationWindow
 from typing import List, Optional
 
@@ -58,10 +58,17 @@ class AuthorizationMonitor:
         if self.lastMachine == newMachine:
             return
 
-        # Return if the new machine is allowed.
+        # Store the new machine and its materials.
         lastMachine = self.lastMachine
         self.lastMachine = newMachine
-        if newMachine in Configuration.AUTO_AUTHORIZED_PRINTERS or newMachine is None:
+        self.lastExtruders = self.getExtruderMaterials()
+        if newMachine is None:
+            return
+
+        # Return if the new machine and the materials in its extruders are allowed.
+        # The materials are checked since rules can allow a material only on some printers or at some times.
+        policy = AuthorizationPolicy.getPolicy()
+        if policy.isPrinterAuthorized(newMachine) and all(policy.isMaterialAuthorized(material, newMachine) for material in self.lastExtruders):
             return
 
         # Return if job mode is active.
@@ -89,7 +96,7 @@ class AuthorizationMonitor:
         # Return if the changed material is allowed.
         previousMaterialName = self.lastExtruders[changedExtruder]
         self.lastExtruders = newExtruders
-        if newExtruders[changedExtruder] in Configuration.AUTO_AUTHORIZED_MATERIALS:
+        if AuthorizationPolicy.getPolicy().isMaterialAuthorized(newExtruders[changedExtruder], self.lastMachine):
             return
 
         # Return if job mode is active.
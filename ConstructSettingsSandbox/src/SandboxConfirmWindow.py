@@ -14,7 +14,6 @@ class SandboxConfirmWindow(ThreadedMainWindow):
     """
 
     onConfirmed = QtCore.pyqtSignal()
-    openWindows = []
 
     def __init__(self, windowName: str, message: str, initialSizeX: int = 300, initialSizeY: int = 40):
         """Creates the window.
@@ -29,7 +28,7 @@ class SandboxConfirmWindow(ThreadedMainWindow):
 
         # Set the window properties.
         screenSize = QtWidgets.QDesktopWidget().screenGeometry(-1)
-        self.setGeometry((screenSize.width() - initialSizeX)/2, (screenSize.height() - initialSizeY)/2, initialSizeX, initialSizeY)
+        self.setGeometry(int((screenSize.width() - initialSizeX)/2), int((screenSize.height() - initialSizeY)/2), initialSizeX, initialSizeY)
         self.setWindowTitle(windowName)
 
         # Create the widget.
@@ -66,14 +65,6 @@ class SandboxConfirmWindow(ThreadedMainWindow):
         self.activateWindow()
         self.show()
         self.widget.setFocus()
-        self.openWindows.append(self)
-
-    def closeEvent(self, event) -> None:
-        """Handles the window being closed.
-        """
-
-        self.openWindows.remove(self)
-        event.accept()
 
     def confirmed(self) -> None:
         """Callback for the prompt being confirmed.
@@ -4,46 +4,62 @@ Zachary Cook
 Plugin class for managing the settings sandbox.
 """
 
+import atexit
 import os
 import shutil
+import time
+from ConstructRIT import Configuration
+from typing import Optional
 from UM.Application import Application
 from UM.Extension import Extension
+from UM.Logger import Logger
 from UM.Resources import Resources
-from .State import State
+from .State import DEFAULT_SNAPSHOT_NAME, State
 from .SandboxConfirmWindow import SandboxConfirmWindow
-
-
-# Files and directories that are not stored or updated with the sandbox.
-IGNORE_FILES = [
-    "plugins",
-]
+from .SnapshotStore import SnapshotStore, isValidSnapshotName
+from .SnapshotWorker import SnapshotWorker
 
 
 class SandboxPlugin(Extension):
     """Plugin for managing the settings sandbox.
     """
 
-    def __init__(self):
+    def __init__(self, storeDirectory: Optional[str] = None, state: Optional[State] = None):
         """Creates the plugin.
+
+        :param storeDirectory: Directory to store the snapshots of the settings in. If None, the directory in Cura's data directory is used.
+        :param state: State of the plugin. If None, the state stored with the plugin is used.
         """
 
         Extension.__init__(self)
-        self.state = State()
+        self.state = state or State()
 
-        # Set up the menu.
+        # Set up the menu. Snapshot names that can't be stored are skipped.
         self.setMenuName("Sandbox Settings")
         self.addMenuItem("Toggle Sandbox", self.toggle) # Technical limitation: can't change menu item text, so the status can't be displayed.
+        for snapshotName in Configuration.SANDBOX_SNAPSHOT_NAMES:
+            if not isValidSnapshotName(snapshotName):
+                Logger.log("w", "Skipped the sandbox settings with the invalid name " + repr(snapshotName) + ".")
+                continue
+            self.addMenuItem("Use " + snapshotName + " Settings", lambda name=snapshotName: self.promptSwitchSnapshot(name))
 
         # Replacing the saving method.
-        self.sandboxSettingsPath = os.path.realpath(os.path.join(__file__, "..", "..", "SandboxedSettings"))
+        self.snapshotStore = SnapshotStore(storeDirectory or Configuration.getDataPath("SandboxStore"), Configuration.SANDBOX_RESTORE_WITH_HARDLINKS)
+        self.configManifest = None
         self.originalSavePreferences = Application.savePreferences
         Application.savePreferences = self.savePreferences
+        self.importLegacySettings()
         self.replaceSettings()
 
         # Save the current settings if none exist.
-        if not os.path.exists(self.sandboxSettingsPath):
+        if not self.snapshotStore.hasSnapshot(self.state.getActiveSnapshot()):
             self.storeSettings()
 
+        # Create the worker for storing the settings in the background and store pending settings when closing.
+        self.snapshotWorker = SnapshotWorker(self.storeSettings, Configuration.SANDBOX_SAVE_DELAY_SECONDS, onError=lambda error: Logger.logException("e", "Failed to store the sandbox settings."))
+        Application.getInstance().applicationShuttingDown.connect(self.stopSnapshotWorker)
+        atexit.register(self.stopSnapshotWorker)
+
     def toggle(self) -> None:
         """Requests toggling the sandbox state.
         """
@@ -57,48 +73,83 @@ class SandboxPlugin(Extension):
             confirmWindow = SandboxConfirmWindow("Confirm Enable Sandbox", "Do you want to disable the settings sandbox?\nChanges to settings will now save.")
             confirmWindow.onConfirmed.connect(lambda: self.state.setCanSaveSettings(True))
 
-    def copySettings(self, sourceDirectory: str, targetDirectory: str) -> None:
-        """Copies the settings files from one location to another.
+    def promptSwitchSnapshot(self, name: str) -> None:
+        """Requests switching the stored settings being used.
+
+        :param name: Name of the stored settings to switch to.
+        """
+
+        confirmWindow = SandboxConfirmWindow("Confirm Switch Settings", "Do you want to use the " + name + " settings?\nRestart Cura to load them.")
+        confirmWindow.onConfirmed.connect(lambda: self.switchSnapshot(name))
 
-        :param sourceDirectory: Settings directory to copy from.
-        :param targetDirectory: Settings directory to copy to.
+    def importLegacySettings(self) -> None:
+        """Imports the sandbox settings stored as a single copy before the snapshot store was used.
         """
 
-        # Create the target directory if it doesn't exist.
-        if not os.path.exists(targetDirectory):
-            os.makedirs(targetDirectory)
-
-        # Copy the files and directories that aren't ignored (plugins and logs).
-        for file in os.listdir(sourceDirectory):
-            if file.lower() not in IGNORE_FILES and "cura.log" not in file:
-                # Determine the path to copy from and to.
-                sourcePath = os.path.join(sourceDirectory, file)
-                destinationPath = os.path.join(targetDirectory, file)
-
-                # Replace the destination file or directory.
-                if os.path.isfile(sourcePath):
-                    if os.path.exists(destinationPath):
-                        os.remove(destinationPath)
-                    shutil.copy(sourcePath, destinationPath)
-                elif os.path.isdir(sourcePath):
-                    if os.path.exists(destinationPath):
-                        shutil.rmtree(destinationPath)
-                    shutil.copytree(sourcePath, destinationPath)
+        legacySettingsPath = os.path.realpath(os.path.join(__file__, "..", "..", "SandboxedSettings"))
+        if os.path.exists(legacySettingsPath) and len(self.snapshotStore.getSnapshotNames()) == 0:
+            self.snapshotStore.saveSnapshot(self.state.getActiveSnapshot(), legacySettingsPath)
+            shutil.rmtree(legacySettingsPath)
+            legacyManifestPath = legacySettingsPath + ".manifest.json"
+            if os.path.exists(legacyManifestPath):
+                os.remove(legacyManifestPath)
+            Logger.log("i", "Imported the legacy sandbox settings as " + self.state.getActiveSnapshot() + ".")
 
     def storeSettings(self) -> None:
-        """Updates the stored sandbox settings from the current settings.
+        """Updates the stored sandbox settings from the current settings. The settings
+        aren't stored if another snapshot will be used when Cura restarts, since the
+        current settings belong to the snapshot being switched from.
         """
 
-        if os.path.exists(self.sandboxSettingsPath):
-            shutil.rmtree(self.sandboxSettingsPath)
-        self.copySettings(Resources.getConfigStoragePath(), self.sandboxSettingsPath)
+        if self.state.getPendingSnapshot() is not None:
+            return
+        startTime = time.perf_counter()
+        result = self.snapshotStore.saveSnapshot(self.state.getActiveSnapshot(), Resources.getConfigStoragePath(), self.configManifest)
+        self.configManifest = result["manifest"]
+        Logger.log("d", "Stored sandbox settings in %.3f seconds (%d files stored, %d files shared)." % (time.perf_counter() - startTime, result["filesStored"], result["filesShared"]))
 
     def replaceSettings(self) -> None:
-        """Replaces the user settings with the ones stored for sandboxing.
+        """Replaces the user settings with the ones stored for sandboxing. If switching
+        snapshots was requested, the snapshot is switched to first. If the stored
+        snapshot name is invalid, the default snapshot is used instead.
+        """
+
+        # Ignore a requested snapshot with an invalid name and use the default snapshot if the active name is invalid.
+        pendingSnapshot = self.state.getPendingSnapshot()
+        if pendingSnapshot is not None and not isValidSnapshotName(pendingSnapshot):
+            Logger.log("w", "Ignored switching to the sandbox settings with the invalid name " + repr(pendingSnapshot) + ".")
+            self.state.setPendingSnapshot(None)
+            pendingSnapshot = None
+        if not isValidSnapshotName(self.state.getActiveSnapshot()):
+            Logger.log("w", "Replaced the sandbox settings with the invalid name " + repr(self.state.getActiveSnapshot()) + " with " + DEFAULT_SNAPSHOT_NAME + ".")
+            self.state.setActiveSnapshot(DEFAULT_SNAPSHOT_NAME)
+
+        # Switch to the requested snapshot and remove the blobs no longer used.
+        # The worker isn't running yet, so no snapshot is being stored.
+        if pendingSnapshot is not None:
+            self.state.setActiveSnapshot(pendingSnapshot)
+            self.state.setPendingSnapshot(None)
+            Logger.log("i", "Switched the sandbox settings to " + pendingSnapshot + " (%d unused files removed)." % self.snapshotStore.collectGarbage())
+
+        # Restore the snapshot.
+        if self.snapshotStore.hasSnapshot(self.state.getActiveSnapshot()):
+            result = self.snapshotStore.restoreSnapshot(self.state.getActiveSnapshot(), Resources.getConfigStoragePath(), verify=Configuration.SANDBOX_VERIFY_ON_RESTORE, threads=Configuration.SANDBOX_HASH_THREADS)
+            self.configManifest = result["manifest"]
+            Logger.log("i", "Replaced settings with sandbox settings in %.3f seconds (%d files verified, %d files written, %d files removed)." % (result["duration"], result["filesHashed"], result["filesWritten"], result["filesRemoved"]))
+            if len(result["missingFiles"]) > 0:
+                Logger.log("w", "Sandbox settings are missing %d stored files, which were removed to use the defaults: %s" % (len(result["missingFiles"]), ", ".join(result["missingFiles"])))
+
+    def switchSnapshot(self, name: str) -> None:
+        """Switches the stored settings being used when Cura restarts. The settings aren't
+        restored while Cura is running since Cura saves the settings it loaded when closing.
+        If the stored settings don't exist, they are created from the current settings.
+
+        :param name: Name of the stored settings to switch to.
         """
 
-        if os.path.exists(self.sandboxSettingsPath):
-            self.copySettings(self.sandboxSettingsPath, Resources.getConfigStoragePath())
+        # Store the pending settings of the current snapshot, then stop storing settings until Cura restarts.
+        self.snapshotWorker.flush()
+        self.state.setPendingSnapshot(name)
 
     def savePreferences(self) -> None:
         """Saves the preferences of the application. Used as a wrapper to store the
@@ -106,5 +157,17 @@ class SandboxPlugin(Extension):
         """
 
         self.originalSavePreferences(Application.getInstance())
-        if self.state.canSaveSettings():
-            self.storeSettings()
\ No newline at end of file
+        if self.state.canSaveSettings() and self.state.getPendingSnapshot() is None:
+            # Store the settings in the background, or directly if the worker was stopped for closing.
+            if self.snapshotWorker.running:
+                self.snapshotWorker.requestSnapshot()
+            else:
+                self.storeSettings()
+
+    def stopSnapshotWorker(self) -> None:
+        """Stores the pending settings and stops storing settings in the background.
+        """
+
+        if self.snapshotWorker.running:
+            self.snapshotWorker.stop()
+            Logger.log("d", "Stopped storing sandbox settings. Metrics: " + str(self.snapshotWorker.getMetrics()))
\ No newline at end of file
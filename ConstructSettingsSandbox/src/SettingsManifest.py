@@ -0,0 +1,264 @@
+"""
+Zachary Cook
+
+Manifests of settings directories for copying only the files that changed.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+# Files and directories that are not stored or updated with the sandbox.
+IGNORE_FILES = [
+    "plugins",
+]
+
+# Size of the chunks to read when hashing files.
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def isIgnored(relativePath: str) -> bool:
+    """Returns if a file is ignored by the sandbox (plugins and logs).
+
+    :param relativePath: Path of the file relative to the settings directory.
+    """
+
+    topLevelName = relativePath.split("/")[0]
+    return topLevelName.lower() in IGNORE_FILES or "cura.log" in topLevelName
+
+
+def hashFile(path: str) -> str:
+    """Returns the SHA-256 hash of a file.
+
+    :param path: Path of the file to hash.
+    """
+
+    fileHash = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            fileHash.update(chunk)
+    return fileHash.hexdigest()
+
+
+def _hashFileIfExists(path: str) -> Optional[str]:
+    """Returns the SHA-256 hash of a file, or None if the file no longer exists.
+
+    :param path: Path of the file to hash.
+    """
+
+    try:
+        return hashFile(path)
+    except FileNotFoundError:
+        return None
+
+
+def buildManifest(directory: str, previousManifest: Optional[Dict[str, Dict]] = None, verify: bool = False, threads: int = 1, statistics: Optional[Dict] = None) -> Dict[str, Dict]:
+    """Builds the manifest of a settings directory. Files with the same size and modified
+    time as in the previous manifest reuse the previous hash instead of being hashed again.
+
+    :param directory: Directory to build the manifest of.
+    :param previousManifest: Previous manifest of the directory, if any.
+    :param verify: If true, all files are hashed instead of reusing the previous hashes.
+    :param threads: Amount of threads to hash the files with.
+    :param statistics: Dictionary to store the amount of files hashed to, if any.
+    :return: Manifest with the size, modified time, and hash of each file.
+    """
+
+    manifest = {}
+    if not os.path.isdir(directory):
+        return manifest
+    previousManifest = previousManifest or {}
+
+    # Determine the files and reuse the hashes of the unchanged files.
+    pathsToHash = {}
+    for parentDirectory, directoryNames, fileNames in os.walk(directory):
+        # Skip the ignored directories.
+        relativeParent = os.path.relpath(parentDirectory, directory).replace(os.sep, "/")
+        if relativeParent == ".":
+            relativeParent = ""
+            directoryNames[:] = [name for name in directoryNames if not isIgnored(name)]
+
+        for fileName in fileNames:
+            # Skip the ignored files.
+            relativePath = relativeParent + "/" + fileName if relativeParent != "" else fileName
+            if isIgnored(relativePath):
+                continue
+
+            # Add the entry, reusing the previous hash if the file is unchanged.
+            filePath = os.path.join(parentDirectory, fileName)
+            try:
+                fileStat = os.stat(filePath)
+            except FileNotFoundError:
+                continue
+            previousEntry = previousManifest.get(relativePath)
+            manifest[relativePath] = {
+                "size": fileStat.st_size,
+                "mtime": fileStat.st_mtime_ns,
+                "hash": None,
+            }
+            if not verify and previousEntry is not None and previousEntry["size"] == fileStat.st_size and previousEntry["mtime"] == fileStat.st_mtime_ns:
+                manifest[relativePath]["hash"] = previousEntry["hash"]
+            else:
+                pathsToHash[relativePath] = filePath
+
+    # Hash the changed files.
+    relativePaths = list(pathsToHash.keys())
+    if threads > 1 and len(relativePaths) > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            fileHashes = list(executor.map(_hashFileIfExists, [pathsToHash[relativePath] for relativePath in relativePaths]))
+    else:
+        fileHashes = [_hashFileIfExists(pathsToHash[relativePath]) for relativePath in relativePaths]
+    for relativePath, fileHash in zip(relativePaths, fileHashes):
+        if fileHash is None:
+            del manifest[relativePath]
+        else:
+            manifest[relativePath]["hash"] = fileHash
+
+    # Return the manifest.
+    if statistics is not None:
+        statistics["filesHashed"] = len(relativePaths)
+    return manifest
+
+
+def loadManifest(path: str) -> Optional[Dict[str, Dict]]:
+    """Loads a stored manifest. Returns None if there is no valid manifest.
+
+    :param path: Path of the manifest.
+    """
+
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as file:
+            return json.loads(file.read())
+    except ValueError:
+        return None
+
+
+def saveManifest(manifest: Dict[str, Dict], path: str) -> None:
+    """Stores a manifest.
+
+    :param manifest: Manifest to store.
+    :param path: Path to store the manifest to.
+    """
+
+    writeAtomic(path, lambda temporaryPath: _writeText(temporaryPath, json.dumps(manifest)))
+
+
+def _writeText(path: str, text: str) -> None:
+    """Writes text to a file.
+
+    :param path: Path of the file to write.
+    :param text: Text to write.
+    """
+
+    with open(path, "w") as file:
+        file.write(text)
+
+
+def writeAtomic(destinationPath: str, write: Callable[[str], None]) -> None:
+    """Writes a file atomically by writing to a temporary file in the same directory
+    and replacing the destination, so the destination is never partially written.
+
+    :param destinationPath: Path of the file to write.
+    :param write: Function that writes the contents to the temporary path it is given.
+    """
+
+    # Create the directory if it doesn't exist.
+    destinationDirectory = os.path.dirname(destinationPath)
+    if not os.path.exists(destinationDirectory):
+        os.makedirs(destinationDirectory)
+
+    # Write the temporary file and replace the destination.
+    fileDescriptor, temporaryPath = tempfile.mkstemp(prefix=".sandbox-", dir=destinationDirectory)
+    os.close(fileDescriptor)
+    try:
+        write(temporaryPath)
+        os.replace(temporaryPath, destinationPath)
+    except BaseException:
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
+        raise
+
+
+def applyManifest(sourceManifest: Dict[str, Dict], targetDirectory: str, targetManifest: Dict[str, Dict], copyFile: Callable[[str, Dict, str], Dict], mirror: bool = True) -> Dict:
+    """Updates a target settings directory to match a manifest. Only the files with
+    different hashes are written, and only the files missing from the manifest are removed.
+
+    :param sourceManifest: Manifest to match.
+    :param targetDirectory: Settings directory to update.
+    :param targetManifest: Manifest of the target directory.
+    :param copyFile: Function that writes a file of the manifest to the temporary path it is given
+    and returns the entry of the written file.
+    :param mirror: If true, all files not in the manifest are removed. Otherwise, only files in
+    top level directories that exist in the manifest are removed.
+    :return: The statistics of the update, the new manifest of the target directory, and the
+    paths of the files that couldn't be written because their source is missing. The missing
+    files are removed from the target directory so Cura uses the defaults instead.
+    """
+
+    newManifest = {}
+    filesWritten = 0
+    filesRemoved = 0
+    missingFiles = []
+
+    # Write the changed files.
+    for relativePath, sourceEntry in sourceManifest.items():
+        targetEntry = targetManifest.get(relativePath)
+        destinationPath = os.path.join(targetDirectory, *relativePath.split("/"))
+        if targetEntry is None or targetEntry["hash"] != sourceEntry["hash"] or not os.path.exists(destinationPath):
+            writtenEntries = []
+            try:
+                writeAtomic(destinationPath, lambda temporaryPath: writtenEntries.append(copyFile(relativePath, sourceEntry, temporaryPath)))
+            except FileNotFoundError:
+                # Remove the existing file so it doesn't mix with the files of the manifest.
+                missingFiles.append(relativePath)
+                if os.path.exists(destinationPath):
+                    os.remove(destinationPath)
+                    filesRemoved += 1
+                    _removeEmptyDirectories(os.path.dirname(destinationPath), targetDirectory)
+                continue
+            filesWritten += 1
+            newManifest[relativePath] = writtenEntries[0]
+        else:
+            newManifest[relativePath] = dict(sourceEntry)
+
+    # Remove the files that don't exist in the source.
+    sourceTopLevelDirectories = set(relativePath.split("/")[0] for relativePath in sourceManifest.keys() if "/" in relativePath)
+    for relativePath in targetManifest.keys():
+        if relativePath in sourceManifest.keys():
+            continue
+        if not mirror and ("/" not in relativePath or relativePath.split("/")[0] not in sourceTopLevelDirectories):
+            newManifest[relativePath] = targetManifest[relativePath]
+            continue
+        destinationPath = os.path.join(targetDirectory, *relativePath.split("/"))
+        if os.path.exists(destinationPath):
+            os.remove(destinationPath)
+            filesRemoved += 1
+            _removeEmptyDirectories(os.path.dirname(destinationPath), targetDirectory)
+
+    # Return the statistics.
+    return {
+        "filesWritten": filesWritten,
+        "filesRemoved": filesRemoved,
+        "missingFiles": missingFiles,
+        "manifest": newManifest,
+    }
+
+
+def _removeEmptyDirectories(directory: str, rootDirectory: str) -> None:
+    """Removes a directory and its parents if they are empty, stopping at the root directory.
+
+    :param directory: Directory to remove if empty.
+    :param rootDirectory: Directory to stop at.
+    """
+
+    rootDirectory = os.path.realpath(rootDirectory)
+    while os.path.realpath(directory) != rootDirectory and len(os.listdir(directory)) == 0:
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
+
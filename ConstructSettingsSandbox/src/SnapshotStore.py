@@ -0,0 +1,259 @@
+"""
+Zachary Cook
+
+Content-addressed store for named snapshots of the sandbox settings.
+"""
+
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional
+from .SettingsManifest import applyManifest, buildManifest, hashFile, loadManifest, saveManifest, writeAtomic
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Linux ioctl for cloning a file with copy-on-write (reflink).
+FICLONE = 0x40049409
+
+# Pattern for valid snapshot names.
+SNAPSHOT_NAME_PATTERN = re.compile(r"^[\w\- ]+$")
+
+
+def isValidSnapshotName(name: str) -> bool:
+    """Returns if a name can be used for a snapshot.
+
+    :param name: Name of the snapshot.
+    """
+
+    return SNAPSHOT_NAME_PATTERN.match(name) is not None
+
+
+def reflinkFile(sourcePath: str, destinationPath: str) -> bool:
+    """Attempts to clone a file with copy-on-write. Returns if the file was cloned.
+
+    :param sourcePath: Path of the file to clone.
+    :param destinationPath: Path to clone the file to.
+    """
+
+    if fcntl is None:
+        return False
+    try:
+        with open(sourcePath, "rb") as sourceFile, open(destinationPath, "wb") as destinationFile:
+            fcntl.ioctl(destinationFile.fileno(), FICLONE, sourceFile.fileno())
+        return True
+    except OSError:
+        return False
+
+
+class SnapshotStore:
+    """Store for named snapshots of the sandbox settings. File contents are stored once as
+    blobs named by their hash, and each snapshot is a manifest referencing the blobs, so
+    snapshots share the files that are the same. Storing, restoring, and removing
+    snapshots and blobs hold a lock so blobs aren't removed while a snapshot is stored.
+    """
+
+    def __init__(self, directory: str, useHardlinks: bool = False):
+        """Creates the snapshot store.
+
+        :param directory: Directory of the store.
+        :param useHardlinks: If true, files are restored as hardlinks to the blobs when copy-on-write
+        cloning is not supported. Only safe if the restored files are replaced instead of modified.
+        """
+
+        self.directory = directory
+        self.objectsDirectory = os.path.join(directory, "objects")
+        self.snapshotsDirectory = os.path.join(directory, "snapshots")
+        self.useHardlinks = useHardlinks
+        self.lock = threading.RLock()
+
+    def getObjectPath(self, fileHash: str) -> str:
+        """Returns the path of a blob.
+
+        :param fileHash: Hash of the blob.
+        """
+
+        return os.path.join(self.objectsDirectory, fileHash[0:2], fileHash)
+
+    def getSnapshotPath(self, name: str) -> str:
+        """Returns the path of the manifest of a snapshot.
+
+        :param name: Name of the snapshot.
+        """
+
+        if not isValidSnapshotName(name):
+            raise ValueError("Invalid snapshot name: " + name)
+        return os.path.join(self.snapshotsDirectory, name + ".json")
+
+    def getSnapshotNames(self) -> List[str]:
+        """Returns the names of the stored snapshots.
+        """
+
+        if not os.path.exists(self.snapshotsDirectory):
+            return []
+        return sorted(fileName[:-5] for fileName in os.listdir(self.snapshotsDirectory) if fileName.endswith(".json"))
+
+    def hasSnapshot(self, name: str) -> bool:
+        """Returns if a snapshot exists.
+
+        :param name: Name of the snapshot.
+        """
+
+        return os.path.exists(self.getSnapshotPath(name))
+
+    def getManifest(self, name: str) -> Optional[Dict[str, Dict]]:
+        """Returns the manifest of a snapshot, or None if it doesn't exist.
+
+        :param name: Name of the snapshot.
+        """
+
+        return loadManifest(self.getSnapshotPath(name))
+
+    def saveSnapshot(self, name: str, sourceDirectory: str, previousManifest: Optional[Dict[str, Dict]] = None) -> Dict:
+        """Stores a snapshot of a settings directory. Only the files not already stored are copied.
+
+        :param name: Name of the snapshot.
+        :param sourceDirectory: Settings directory to store.
+        :param previousManifest: Previous manifest of the settings directory for reusing hashes.
+        If None, the existing snapshot's manifest is used.
+        :return: The statistics of the snapshot and the manifest of the settings directory.
+        """
+
+        with self.lock:
+            # Determine the files of the settings directory.
+            if previousManifest is None:
+                previousManifest = self.getManifest(name)
+            sourceManifest = buildManifest(sourceDirectory, previousManifest)
+
+            # Store the files that aren't stored.
+            snapshotManifest = {}
+            filesStored = 0
+            for relativePath, entry in sourceManifest.items():
+                if not os.path.exists(self.getObjectPath(entry["hash"])):
+                    # Copy the file and hash the copy, since the file may have changed after the manifest was built.
+                    sourcePath = os.path.join(sourceDirectory, *relativePath.split("/"))
+                    temporaryPath = os.path.join(self.objectsDirectory, "incoming")
+                    try:
+                        writeAtomic(temporaryPath, lambda path: shutil.copy2(sourcePath, path))
+                    except FileNotFoundError:
+                        continue
+                    fileStat = os.stat(temporaryPath)
+                    entry = {"size": fileStat.st_size, "mtime": fileStat.st_mtime_ns, "hash": hashFile(temporaryPath)}
+                    objectPath = self.getObjectPath(entry["hash"])
+                    if not os.path.exists(os.path.dirname(objectPath)):
+                        os.makedirs(os.path.dirname(objectPath))
+                    os.replace(temporaryPath, objectPath)
+                    filesStored += 1
+                snapshotManifest[relativePath] = entry
+
+            # Store the manifest.
+            saveManifest(snapshotManifest, self.getSnapshotPath(name))
+            return {
+                "filesStored": filesStored,
+                "filesShared": len(snapshotManifest) - filesStored,
+                "manifest": snapshotManifest,
+            }
+
+    def _restoreFile(self, relativePath: str, entry: Dict, temporaryPath: str) -> Dict:
+        """Restores a file of a snapshot from its blob.
+
+        :param relativePath: Path of the file relative to the settings directory.
+        :param entry: Manifest entry of the file.
+        :param temporaryPath: Path to write the file to.
+        :return: The manifest entry of the written file.
+        """
+
+        # Clone, link, or copy the blob.
+        objectPath = self.getObjectPath(entry["hash"])
+        if not reflinkFile(objectPath, temporaryPath):
+            if self.useHardlinks:
+                os.remove(temporaryPath)
+                os.link(objectPath, temporaryPath)
+            else:
+                shutil.copyfile(objectPath, temporaryPath)
+
+        # Restore the modified time so unchanged files aren't hashed again.
+        os.utime(temporaryPath, ns=(entry["mtime"], entry["mtime"]))
+        return dict(entry)
+
+    def restoreSnapshot(self, name: str, targetDirectory: str, targetManifest: Optional[Dict[str, Dict]] = None, mirror: bool = False, verify: bool = False, threads: int = 1) -> Dict:
+        """Restores a snapshot to a settings directory. Only the files that are different are written.
+
+        :param name: Name of the snapshot.
+        :param targetDirectory: Settings directory to restore to.
+        :param targetManifest: Manifest of the settings directory. If None, it is built.
+        :param mirror: If true, all files not in the snapshot are removed. Otherwise, only files in
+        top level directories that exist in the snapshot are removed.
+        :param verify: If true and the manifest of the settings directory isn't given, all the
+        files are hashed instead of assuming files with the same size and modified time are unchanged.
+        :param threads: Amount of threads to hash the settings directory with.
+        :return: The statistics of the restore, the new manifest of the settings directory, and
+        the paths of the files whose blobs are missing from the store.
+        """
+
+        with self.lock:
+            # Determine the differences between the snapshot and the settings directory.
+            startTime = time.perf_counter()
+            snapshotManifest = self.getManifest(name)
+            if snapshotManifest is None:
+                raise KeyError("Snapshot does not exist: " + name)
+            statistics = {"filesHashed": 0}
+            if targetManifest is None:
+                targetManifest = buildManifest(targetDirectory, snapshotManifest, verify, threads, statistics)
+
+            # Write the different files.
+            result = applyManifest(snapshotManifest, targetDirectory, targetManifest, self._restoreFile, mirror)
+            result["filesHashed"] = statistics["filesHashed"]
+            result["duration"] = time.perf_counter() - startTime
+            return result
+
+    def deleteSnapshot(self, name: str) -> None:
+        """Deletes a snapshot. The blobs are not removed until garbage is collected.
+
+        :param name: Name of the snapshot.
+        """
+
+        with self.lock:
+            if self.hasSnapshot(name):
+                os.remove(self.getSnapshotPath(name))
+
+    def collectGarbage(self) -> int:
+        """Removes the blobs that are not used by any snapshot.
+
+        :return: The amount of blobs removed.
+        """
+
+        with self.lock:
+            # Determine the used blobs.
+            usedHashes = set()
+            for name in self.getSnapshotNames():
+                for entry in (self.getManifest(name) or {}).values():
+                    usedHashes.add(entry["hash"])
+
+            # Remove the unused blobs.
+            removedBlobs = 0
+            if os.path.exists(self.objectsDirectory):
+                for prefix in os.listdir(self.objectsDirectory):
+                    prefixDirectory = os.path.join(self.objectsDirectory, prefix)
+                    if not os.path.isdir(prefixDirectory):
+                        continue
+                    for fileHash in os.listdir(prefixDirectory):
+                        if fileHash not in usedHashes:
+                            os.remove(os.path.join(prefixDirectory, fileHash))
+                            removedBlobs += 1
+            return removedBlobs
+
+    def getDiskUsage(self) -> int:
+        """Returns the total size in bytes of the stored blobs and manifests.
+        """
+
+        totalSize = 0
+        for parentDirectory, _, fileNames in os.walk(self.directory):
+            for fileName in fileNames:
+                totalSize += os.path.getsize(os.path.join(parentDirectory, fileName))
+        return totalSize
@@ -0,0 +1,177 @@
+"""
+Zachary Cook
+
+Background worker for storing snapshots of the sandbox settings.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class SnapshotWorker:
+    """Worker that stores snapshots in a background thread. Requests made within the
+    delay of the previous request are combined into a single snapshot.
+    """
+
+    def __init__(self, snapshot: Callable[[], None], delay: float, maxDelay: Optional[float] = None, onError: Optional[Callable[[Exception], None]] = None):
+        """Creates the snapshot worker.
+
+        :param snapshot: Function that stores a snapshot.
+        :param delay: Seconds to wait after the last request before storing a snapshot.
+        :param maxDelay: Maximum seconds to wait after the first request before storing a snapshot,
+        so constant requests still store snapshots. Defaults to 5 times the delay.
+        :param onError: Function to call if storing a snapshot fails.
+        """
+
+        self.snapshot = snapshot
+        self.delay = delay
+        self.maxDelay = maxDelay if maxDelay is not None else delay * 5
+        self.onError = onError
+        self.condition = threading.Condition()
+        self.running = True
+        self.flushRequested = False
+        self.snapshotRunning = False
+        self.firstRequestTime = None
+        self.lastRequestTime = None
+
+        # Set up the metrics.
+        self.requestedSnapshots = 0
+        self.coalescedSnapshots = 0
+        self.completedSnapshots = 0
+        self.failedSnapshots = 0
+        self.totalDuration = 0.0
+        self.lastDuration = None
+        self.maxDuration = None
+        self.lastQueueTime = None
+
+        # Start the worker thread.
+        self.thread = threading.Thread(target=self._run, name="SandboxSnapshotWorker", daemon=True)
+        self.thread.start()
+
+    def requestSnapshot(self) -> None:
+        """Requests a snapshot to be stored.
+        """
+
+        with self.condition:
+            currentTime = time.monotonic()
+            if self.firstRequestTime is None:
+                self.firstRequestTime = currentTime
+            else:
+                self.coalescedSnapshots += 1
+            self.lastRequestTime = currentTime
+            self.requestedSnapshots += 1
+            self.condition.notify_all()
+
+    def isIdle(self) -> bool:
+        """Returns if no snapshots are pending or being stored.
+        """
+
+        with self.condition:
+            return self.firstRequestTime is None and not self.snapshotRunning
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Stores the pending snapshot without waiting for the delay and waits for it to complete.
+
+        :param timeout: Maximum seconds to wait. If None, there is no limit.
+        :return: Whether all the snapshots were stored before the timeout.
+        """
+
+        with self.condition:
+            self.flushRequested = True
+            self.condition.notify_all()
+            flushed = self.condition.wait_for(lambda: self.firstRequestTime is None and not self.snapshotRunning, timeout)
+            self.flushRequested = False
+            return flushed
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """Stores the pending snapshot and stops the worker.
+
+        :param timeout: Maximum seconds to wait for the pending snapshot. If None, there is no limit.
+        :return: Whether all the snapshots were stored before the timeout.
+        """
+
+        flushed = self.flush(timeout)
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if threading.current_thread() is not self.thread:
+            self.thread.join(timeout)
+        return flushed
+
+    def getMetrics(self) -> Dict:
+        """Returns the metrics of the worker.
+        """
+
+        with self.condition:
+            return {
+                "pendingSnapshots": 0 if self.firstRequestTime is None else 1,
+                "snapshotRunning": self.snapshotRunning,
+                "requestedSnapshots": self.requestedSnapshots,
+                "coalescedSnapshots": self.coalescedSnapshots,
+                "completedSnapshots": self.completedSnapshots,
+                "failedSnapshots": self.failedSnapshots,
+                "lastQueueTime": self.lastQueueTime,
+                "lastDuration": self.lastDuration,
+                "averageDuration": self.totalDuration / self.completedSnapshots if self.completedSnapshots > 0 else None,
+                "maxDuration": self.maxDuration,
+            }
+
+    def _waitForSnapshot(self) -> bool:
+        """Waits until a snapshot should be stored. Must be called with the condition held.
+
+        :return: Whether a snapshot should be stored. False is returned if the worker stopped.
+        """
+
+        while True:
+            # Wait for a request.
+            if self.firstRequestTime is None:
+                if not self.running:
+                    return False
+                self.condition.wait()
+                continue
+
+            # Return if the snapshot should be stored now, or wait for more requests.
+            if self.flushRequested or not self.running:
+                return True
+            remainingTime = min(self.lastRequestTime + self.delay, self.firstRequestTime + self.maxDelay) - time.monotonic()
+            if remainingTime <= 0:
+                return True
+            self.condition.wait(remainingTime)
+
+    def _run(self) -> None:
+        """Stores the requested snapshots until the worker is stopped.
+        """
+
+        while True:
+            # Wait for a snapshot and take the pending requests.
+            with self.condition:
+                if not self._waitForSnapshot():
+                    return
+                self.lastQueueTime = time.monotonic() - self.firstRequestTime
+                self.firstRequestTime = None
+                self.lastRequestTime = None
+                self.snapshotRunning = True
+
+            # Store the snapshot.
+            startTime = time.perf_counter()
+            failed = False
+            try:
+                self.snapshot()
+            except Exception as error:
+                failed = True
+                if self.onError is not None:
+                    self.onError(error)
+            duration = time.perf_counter() - startTime
+
+            # Update the metrics and notify the snapshot completing.
+            with self.condition:
+                self.snapshotRunning = False
+                if failed:
+                    self.failedSnapshots += 1
+                else:
+                    self.completedSnapshots += 1
+                    self.totalDuration += duration
+                    self.lastDuration = duration
+                    self.maxDuration = duration if self.maxDuration is None else max(self.maxDuration, duration)
+                self.condition.notify_all()
@@ -6,6 +6,11 @@ State for the settings sandbox plugin.
 
 import json
 import os
+from typing import Optional
+
+
+# Name of the snapshot used when none was chosen.
+DEFAULT_SNAPSHOT_NAME = "default"
 
 
 class State:
@@ -29,6 +34,10 @@ class State:
             self.state = {}
         if "saveSettings" not in self.state.keys():
             self.state["saveSettings"] = False
+        if "activeSnapshot" not in self.state.keys():
+            self.state["activeSnapshot"] = DEFAULT_SNAPSHOT_NAME
+        if "pendingSnapshot" not in self.state.keys():
+            self.state["pendingSnapshot"] = None
 
     def canSaveSettings(self) -> bool:
         """Returns if the settings can save.
@@ -45,6 +54,36 @@ class State:
         self.state["saveSettings"] = saveSettings
         self.save()
 
+    def getActiveSnapshot(self) -> str:
+        """Returns the name of the snapshot of the settings being used.
+        """
+
+        return self.state["activeSnapshot"]
+
+    def setActiveSnapshot(self, name: str) -> None:
+        """Sets the name of the snapshot of the settings being used.
+
+        :param name: Name of the snapshot.
+        """
+
+        self.state["activeSnapshot"] = name
+        self.save()
+
+    def getPendingSnapshot(self) -> Optional[str]:
+        """Returns the name of the snapshot to switch to when Cura starts, if any.
+        """
+
+        return self.state["pendingSnapshot"]
+
+    def setPendingSnapshot(self, name: Optional[str]) -> None:
+        """Sets the name of the snapshot to switch to when Cura starts.
+
+        :param name: Name of the snapshot, or None to not switch.
+        """
+
+        self.state["pendingSnapshot"] = name
+        self.save()
+
     def save(self) -> None:
         """Saves the state.
         """